@@ -1,17 +1,68 @@
 """
 Supabase Database Client
-Handles all database operations using Supabase client
+Handles all database operations through an async PostgREST client
+
+All requests share one pooled httpx.AsyncClient (keep-alive, optional
+HTTP/2 multiplexing, per-request timeouts), so awaiting a query never blocks
+the event loop and concurrent requests reuse warm connections.
 """
-from supabase import create_client, Client
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from app.config.settings import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class QueryCounter:
+    """Number of PostgREST round-trips made inside a `count_queries()` block"""
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+
+_query_counter: ContextVar[QueryCounter | None] = ContextVar("db_query_counter", default=None)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Count database round-trips made in the current context
+
+    Tasks spawned inside the block (e.g. asyncio.gather) share the counter.
+    Used per request by QueryCountMiddleware and directly by benchmarks.
+    """
+    counter = QueryCounter()
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+
+async def _count_query(request: httpx.Request) -> None:
+    counter = _query_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
 class SupabaseDB:
-    """Supabase database client wrapper"""
-    
+    """Async Supabase (PostgREST) client wrapper"""
+
     def __init__(self):
         """Initialize Supabase client"""
         if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_ROLE_KEY:
@@ -19,22 +70,62 @@ class SupabaseDB:
                 "Supabase credentials not configured. "
                 "Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in environment variables."
             )
-        
-        self.client: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_ROLE_KEY
-        )
+
+        self.client: AsyncPostgrestClient = self._create_client()
         logger.info("Supabase database client initialized")
-    
-    def get_client(self) -> Client:
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """
+        Build the pooled HTTP client shared by every query
+
+        PostgREST sets its base URL and schema/auth headers on it.
+        """
+        http2 = settings.DB_HTTP2
+        if http2 and not _http2_available():
+            logger.warning("⚠️ DB_HTTP2 enabled but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            follow_redirects=True,
+            event_hooks={"request": [_count_query]},
+            limits=httpx.Limits(
+                max_connections=settings.DB_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DB_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.DB_POOL_KEEPALIVE_SECONDS
+            ),
+            timeout=httpx.Timeout(
+                settings.DB_TIMEOUT_SECONDS,
+                connect=settings.DB_CONNECT_TIMEOUT_SECONDS,
+                pool=settings.DB_POOL_TIMEOUT_SECONDS
+            )
+        )
+
+    def _create_client(self) -> AsyncPostgrestClient:
+        service_key = settings.SUPABASE_SERVICE_ROLE_KEY
+        return AsyncPostgrestClient(
+            f"{settings.SUPABASE_URL}/rest/v1",
+            headers={
+                **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                "apikey": service_key,
+                "Authorization": f"Bearer {service_key}"
+            },
+            http_client=self._create_http_client()
+        )
+
+    def get_client(self) -> AsyncPostgrestClient:
         """Get the Supabase client instance"""
         return self.client
 
+    async def close(self):
+        """Close pooled connections"""
+        await self.client.session.aclose()
+
 
 # Global database instance
 supabase_db = SupabaseDB()
 
 
-def get_db():
+async def get_db() -> AsyncPostgrestClient:
     """Get Supabase client (for FastAPI dependency injection)"""
     return supabase_db.get_client()
@@ -1,33 +1,210 @@
 """
 Logging configuration for Recrux backend
+
+Records are handed to a bounded in-memory queue by the calling thread and
+written to stdout / the rotating log file by a single background listener
+thread, so request handlers never wait on console or disk I/O.
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
+from app.config.settings import settings
+
+# Attributes every LogRecord carries; anything else was passed via `extra=`
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "suppressed"
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """Render log records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Suppress repetitive messages
+
+    Records are grouped by (logger, level, message template). Each group may
+    emit `burst` records per `window` seconds; the rest are dropped and the
+    number dropped is attached to the first record of the next window as
+    `record.suppressed`. Keying on the template (not the rendered message) is
+    what makes lazy `%s` formatting in call sites collapse into one group.
+    """
+
+    def __init__(self, window: float, burst: int, max_keys: int = 4096):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: dict = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.window <= 0:
+            return True
+
+        key = (record.name, record.levelno, record.msg if isinstance(record.msg, str) else id(record.msg))
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or now - bucket[0] >= self.window:
+                suppressed = bucket[2] if bucket else 0
+                if bucket is None and len(self._buckets) >= self.max_keys:
+                    self._buckets.clear()
+                self._buckets[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            if bucket[1] < self.burst:
+                bucket[1] += 1
+                return True
+
+            bucket[2] += 1
+            return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message once on the caller side so mutable args can't
+        # change before the listener thread gets to it, but keep exception
+        # text separate for the JSON formatter.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _build_file_handler(log_dir: Path) -> logging.Handler:
+    """Create the size- or time-rotating file handler"""
+    log_file = log_dir / "recrux.log"
+    if settings.LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file,
+            when=settings.LOG_ROTATION_WHEN,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            utc=True,
+        )
+    return logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+
+
 def setup_logging():
     """Configure application logging"""
-    
+    global _listener
+
+    if _listener is not None:
+        return logging.getLogger("recrux")
+
     # Create logs directory
-    log_dir = Path("logs")
+    log_dir = Path(settings.LOG_DIR)
     log_dir.mkdir(exist_ok=True)
-    
-    # Configure root logger
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            # Console handler
-            logging.StreamHandler(sys.stdout),
-            # File handler with UTF-8 encoding
-            logging.FileHandler(log_dir / "recrux.log", encoding='utf-8')
-        ]
+
+    if settings.LOG_JSON:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # Console and file output happen on the listener thread only
+    console_handler = logging.StreamHandler(sys.stdout)
+    file_handler = _build_file_handler(log_dir)
+    for handler in (console_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(
+        window=settings.LOG_RATE_LIMIT_SECONDS,
+        burst=settings.LOG_RATE_LIMIT_BURST,
+    ))
+
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
     )
-    
+    _listener.start()
+    atexit.register(shutdown_logging)
+
     # Set specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("fastapi").setLevel(logging.INFO)
-    
+
     return logging.getLogger("recrux")
 
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+
 logger = setup_logging()
@@ -10,6 +10,13 @@ class Settings(BaseSettings):
     # Supabase
     SUPABASE_URL: str
     SUPABASE_SERVICE_ROLE_KEY: str
+    DB_HTTP2: bool = True
+    DB_POOL_MAX_CONNECTIONS: int = 100
+    DB_POOL_MAX_KEEPALIVE: int = 20
+    DB_POOL_KEEPALIVE_SECONDS: float = 30.0
+    DB_TIMEOUT_SECONDS: float = 10.0
+    DB_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0
     
     # S3 Storage
     S3_ENDPOINT: str
@@ -22,6 +29,19 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    AUTH_TOKEN_CACHE_SIZE: int = 4096
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 300
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Login throttling
+    LOGIN_IP_MAX_ATTEMPTS: int = 20
+    LOGIN_IP_WINDOW_SECONDS: int = 60
+    LOGIN_EMAIL_MAX_FAILURES: int = 5
+    LOGIN_EMAIL_WINDOW_SECONDS: int = 900
     
     # Groq LLM
     GROQ_API_KEY: str
@@ -31,9 +51,133 @@ class Settings(BaseSettings):
     PINECONE_ENVIRONMENT: str = "us-east-1-aws"
     PINECONE_INDEX_NAME: str = "resume-embeddings"
     
+    # Embedding inference ("torch", "onnx" or "onnx-int8"; 0 threads = runtime default)
+    EMBEDDING_MODEL_VERSION: str = "minilm-l6-v2"  # see app/services/embedding_models.py
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_THREADS: int = 0
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_MAX_SEQ_LENGTH: int = 256
+    EMBEDDING_LENGTH_BUCKET: int = 32
+    EMBEDDING_CACHE_DIR: str = ""
+    EMBEDDING_VERIFY_BACKEND: bool = True
+    EMBEDDING_PARITY_MIN_COSINE: float = 0.99
+    
+    # Vector store ("pinecone" or "local"; local precision: float32, float16, int8)
+    VECTOR_STORE_BACKEND: str = "pinecone"
+    VECTOR_STORE_PRECISION: str = "int8"
+    # int8 shortlist size (x top_k) rescored against the unquantized query
+    VECTOR_RESCORE_FACTOR: int = 4
+    VECTOR_STORE_PATH: str = ""
+    
+    # Embedding model versioning / background re-embedding
+    EMBEDDING_SERVING_CACHE_SECONDS: int = 30
+    REEMBED_BATCH_SIZE: int = 50
+    REEMBED_MAX_PER_SECOND: float = 10.0
+    
+    # Vector write outbox (retries failed upserts/deletes in the background)
+    VECTOR_OUTBOX_ENABLED: bool = True
+    VECTOR_OUTBOX_INTERVAL_SECONDS: int = 30
+    VECTOR_OUTBOX_BATCH_SIZE: int = 50
+    VECTOR_OUTBOX_MAX_ATTEMPTS: int = 8
+    VECTOR_OUTBOX_BASE_DELAY_SECONDS: int = 30
+    VECTOR_OUTBOX_MAX_DELAY_SECONDS: int = 3600
+    
+    # Multi-vector resume embeddings
+    EMBEDDING_MAX_CHUNKS: int = 12
+    EMBEDDING_CHUNK_OVERSAMPLE: int = 4
+    EMBEDDING_AGGREGATION: str = "max"  # "max" or "topk_mean"
+    EMBEDDING_AGGREGATION_K: int = 2
+    
+    # Duplicate candidate detection (SimHash distance is in bits, at most 3)
+    DEDUP_ENABLED: bool = True
+    DEDUP_SIMHASH_MAX_DISTANCE: int = 3
+    DEDUP_REUSE_PARSED_DATA: bool = True
+    
+    # Skill canonicalization: optional JSON file extending or overriding the
+    # built-in alias dictionary, {"skill_id": {"label": ..., "aliases": [...]}}
+    SKILL_ALIASES_PATH: str = ""
+    
+    # Re-scoring when a job's requirements change (LLM re-evaluation limited
+    # to the top N candidates whose local score moved at least MIN_DELTA)
+    RESCORE_LLM_TOP_N: int = 50
+    RESCORE_LLM_MIN_DELTA: int = 5
+    RESCORE_LLM_CONCURRENCY: int = 4
+    RESCORE_LLM_MAX_PER_MINUTE: int = 60
+    RESCORE_PROGRESS_EVERY: int = 10
+    
+    # Upload limits
+    UPLOAD_MAX_FILES: int = 500
+    UPLOAD_MAX_FILE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_BYTES: int = 500 * 1024 * 1024
+    UPLOAD_SPOOL_MAX_MEMORY_BYTES: int = 64 * 1024
+    
+    # Resume text extraction budgets
+    RESUME_TEXT_CHAR_BUDGET: int = 12000
+    PDF_MAX_BYTES: int = 10 * 1024 * 1024
+    PDF_MAX_PAGES: int = 30
+    PDF_EXTRACT_TIMEOUT_SECONDS: float = 20.0
+    PDF_PARALLEL_PAGE_THRESHOLD: int = 12
+    PDF_PARALLEL_WORKERS: int = 2
+    PDF_PAGES_PER_TASK: int = 4
+    DOCX_MAX_XML_BYTES: int = 20 * 1024 * 1024
+    
+    # Prompt / embedding token budgets
+    LLM_TOKENIZER_ENCODING: str = "cl100k_base"
+    PARSE_PROMPT_TOKEN_BUDGET: int = 900
+    SCORE_PROMPT_TOKEN_BUDGET: int = 450
+    JOB_DESCRIPTION_TOKEN_BUDGET: int = 120
+    
+    # Invalid JSON/schema replies get this many targeted correction requests
+    LLM_OUTPUT_MAX_RETRIES: int = 1
+    
+    # Batched LLM scoring (SCORE_BATCH_SIZE=1 scores one candidate per prompt)
+    SCORE_BATCH_SIZE: int = 5
+    SCORE_BATCH_CONCURRENCY: int = 2
+    SCORE_BATCH_PROFILE_TOKEN_BUDGET: int = 300
+    
+    # Job cache
+    JOB_CACHE_MAX_ENTRIES: int = 5000
+    JOB_CACHE_TTL_SECONDS: int = 300
+    JOB_LIST_DESCRIPTION_PREVIEW_CHARS: int = 300
+    
+    # Talent pool search result cache (ranked IDs per query, paged from memory)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_MAX_ENTRIES: int = 2000
+    SEARCH_CACHE_TTL_SECONDS: int = 120
+    # Candidates ranked (and cached) per query; pages end there
+    SEARCH_RESULT_DEPTH: int = 200
+    SEARCH_MAX_PAGE_SIZE: int = 100
+    
+    # Talent pool facets (per-tenant bitmap index, see app/services/facet_index.py)
+    FACET_INDEX_TTL_SECONDS: int = 600
+    FACET_INDEX_PAGE_SIZE: int = 1000
+    FACET_INDEX_MAX_TENANTS: int = 100
+    # Values returned per facet
+    FACET_MAX_VALUES: int = 20
+    # Larger filtered pools are post-filtered (Pinecone caps $in at 10,000 values)
+    FACET_PREFILTER_MAX_IDS: int = 10000
+    
+    # Candidate card summaries kept in memory (see app/services/summary_store.py)
+    SUMMARY_STORE_ENABLED: bool = True
+    SUMMARY_STORE_TTL_SECONDS: int = 120
+    # Across tenants; least recently used tenants are evicted beyond it
+    SUMMARY_STORE_MAX_RECORDS: int = 200000
+    
     # CORS
     ALLOWED_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:3000"]
-    
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_DIR: str = "logs"
+    LOG_JSON: bool = True
+    LOG_ROTATION: str = "size"  # "size" or "time"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_ROTATION_WHEN: str = "midnight"
+    LOG_BACKUP_COUNT: int = 7
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_RATE_LIMIT_SECONDS: float = 5.0
+    LOG_RATE_LIMIT_BURST: int = 20
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,8 +1,18 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import auth, jobs, dashboard, candidates, talent_pool_search
 from app.config.settings import settings
 from app.config.logging_config import logger
+from app.config.database import supabase_db
+from app.services.embedding_service import embedding_service
+from app.services.embedding_models import serving_model
+from app.services.vector_store import vector_store, LocalVectorStore
+from app.services.vector_sync import vector_outbox
+from app.services.rescoring import rescore_service
+from app.services.resume_parser import extractor_registry
+from app.middleware.query_count import QueryCountMiddleware
+from app.middleware.upload_limits import UploadLimitMiddleware
 
 app = FastAPI(
     title="Recrux API",
@@ -17,8 +27,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-DB-Query-Count"],
 )
 
+# Database round-trips per request
+app.add_middleware(QueryCountMiddleware)
+
+# Bounded-memory uploads
+app.add_middleware(UploadLimitMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
@@ -29,10 +46,39 @@ app.include_router(talent_pool_search.router, prefix="/api/talent-pool", tags=["
 @app.on_event("startup")
 async def startup_event():
     logger.info("Recrux API starting up...")
+    # Load the embedding model now rather than on the first upload or search
+    try:
+        model = await serving_model.get(supabase_db.get_client())
+        await asyncio.to_thread(embedding_service.warm_up, model)
+    except Exception as e:
+        logger.error("❌ Embedding warm-up failed: %s", e)
+    
+    # PDF worker processes, spawned before any upload needs them
+    try:
+        await asyncio.to_thread(extractor_registry.get("pdf").start)
+    except Exception as e:
+        logger.error("❌ PDF worker start failed: %s", e)
+    
+    # Retry vector writes that failed during requests
+    if settings.VECTOR_OUTBOX_ENABLED and vector_store.enabled:
+        app.state.vector_outbox_task = asyncio.create_task(
+            vector_outbox.run_forever(supabase_db.get_client())
+        )
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Recrux API shutting down...")
+    outbox_task = getattr(app.state, "vector_outbox_task", None)
+    if outbox_task is not None:
+        outbox_task.cancel()
+    try:
+        await rescore_service.shutdown(supabase_db.get_client())
+    except Exception as e:
+        logger.error("❌ Could not mark re-scoring runs interrupted: %s", e)
+    extractor_registry.get("pdf").shutdown()
+    await supabase_db.close()
+    if isinstance(vector_store, LocalVectorStore):
+        vector_store.save()
 
 @app.get("/")
 def root():
@@ -0,0 +1,32 @@
+"""
+Per-request database round-trip counter
+"""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.database import count_queries
+
+
+class QueryCountMiddleware:
+    """
+    Report the number of database queries a request made
+
+    Adds an `X-DB-Query-Count` response header so load tests and benchmarks
+    can assert that endpoints don't regress to extra round-trips.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as counter:
+            async def send_with_count(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Query-Count", str(counter.count))
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
@@ -0,0 +1,52 @@
+"""
+Request size limit for multipart uploads
+"""
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.settings import settings
+
+
+class UploadLimitMiddleware:
+    """
+    Cap multipart request bodies at UPLOAD_MAX_REQUEST_BYTES
+
+    A declared Content-Length over the limit is rejected before any of the
+    body is read or spooled. Bodies without one (chunked transfer encoding)
+    or that send more than they declared are counted as they stream in,
+    and reading fails with 413 as soon as the limit is passed.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.UPLOAD_MAX_REQUEST_BYTES
+        detail = f"Upload exceeds {limit} bytes"
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the endpoint's body parsing, rendered as a 413 response
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
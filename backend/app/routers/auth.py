@@ -1,14 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from supabase import Client
+import math
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from postgrest import AsyncPostgrestClient
 from app.config.database import get_db
+from app.config.logging_config import logger
 from app.schemas.auth import RegisterRequest, LoginRequest, TokenResponse
-from app.utils.password import hash_password, verify_password
+from app.utils.password import (
+    PasswordHasherBusy,
+    hash_password_async,
+    verify_password_async,
+    needs_rehash
+)
 from app.utils.jwt import create_access_token
+from app.utils.rate_limit import login_ip_limiter, login_email_limiter
 
 router = APIRouter()
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please try again shortly",
+        headers={"Retry-After": "1"}
+    )
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(data: RegisterRequest, db: Client = Depends(get_db)):
+async def register(data: RegisterRequest, db: AsyncPostgrestClient = Depends(get_db)):
     """
     Register new company and user
     
@@ -21,15 +36,21 @@ def register(data: RegisterRequest, db: Client = Depends(get_db)):
     """
     
     # Check if email already exists
-    existing_user = db.table("users").select("*").eq("email", data.email).execute()
+    existing_user = await db.table("users").select("*").eq("email", data.email).execute()
     if existing_user.data:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
+    # Hash before creating anything so a busy hasher doesn't leave an orphan company
+    try:
+        password_hash = await hash_password_async(data.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    
     # Create company
-    company_result = db.table("companies").insert({
+    company_result = await db.table("companies").insert({
         "name": data.company_name
     }).execute()
     
@@ -43,10 +64,10 @@ def register(data: RegisterRequest, db: Client = Depends(get_db)):
     company_id = company["id"]
     
     # Create user with hashed password
-    user_result = db.table("users").insert({
+    user_result = await db.table("users").insert({
         "tenant_id": company_id,
         "email": data.email,
-        "password_hash": hash_password(data.password),
+        "password_hash": password_hash,
         "role": "admin"
     }).execute()
     
@@ -79,21 +100,42 @@ def register(data: RegisterRequest, db: Client = Depends(get_db)):
     }
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Client = Depends(get_db)):
+async def login(data: LoginRequest, request: Request, db: AsyncPostgrestClient = Depends(get_db)):
     """
     Login user
     
     Steps:
-    1. Find user by email
-    2. Verify password
-    3. Generate JWT token
-    4. Return token and user info
+    1. Throttle by client IP and by email
+    2. Find user by email
+    3. Verify password (rehash if the cost factor changed)
+    4. Generate JWT token
+    5. Return token and user info
     """
     
-    # Find user by email
-    user_result = db.table("users").select("*").eq("email", data.email).execute()
+    # Throttle before any DB or bcrypt work
+    client_ip = request.client.host if request.client else "unknown"
+    email_key = data.email.lower()
+    retry_after = max(
+        login_ip_limiter.retry_after(client_ip),
+        login_email_limiter.retry_after(email_key)
+    )
+    if retry_after > 0:
+        logger.warning("Login throttled for %s from %s", email_key, client_ip)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+    login_ip_limiter.record(client_ip)
+    
+    # Find user by email, with the company name joined in (one round-trip)
+    user_result = await db.table("users")\
+        .select("*, companies(name)")\
+        .eq("email", data.email)\
+        .execute()
     
     if not user_result.data:
+        login_email_limiter.record(email_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -102,15 +144,30 @@ def login(data: LoginRequest, db: Client = Depends(get_db)):
     user = user_result.data[0]
     
     # Verify password
-    if not verify_password(data.password, user["password_hash"]):
+    try:
+        password_ok = await verify_password_async(data.password, user["password_hash"])
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    
+    if not password_ok:
+        login_email_limiter.record(email_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
     
-    # Get company
-    company_result = db.table("companies").select("*").eq("id", user["tenant_id"]).execute()
-    company = company_result.data[0] if company_result.data else None
+    login_email_limiter.reset(email_key)
+    
+    # Transparently upgrade hashes made with an old cost factor
+    if needs_rehash(user["password_hash"]):
+        try:
+            new_hash = await hash_password_async(data.password)
+            await db.table("users").update({"password_hash": new_hash}).eq("id", user["id"]).execute()
+            logger.info("Rehashed password for user %s", user["id"])
+        except Exception as e:
+            logger.warning("Password rehash failed for user %s: %s", user["id"], e)
+    
+    company = user.get("companies")
     
     # Create JWT token
     token_data = {
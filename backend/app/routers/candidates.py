@@ -1,108 +1,102 @@
 """
 Candidates management endpoints
 """
+import asyncio
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from typing import List
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 from app.config.database import get_db
+from app.config.settings import settings
 from app.config.logging_config import logger
-from app.utils.jwt import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.services.resume_parser import resume_parser
+from app.utils.auth import get_current_user
+from app.utils.uploads import UploadRoute, upload_size
+from app.services.resume_parser import resume_parser, UnsupportedFormatError
 from app.services.scoring_service import scoring_service
+from app.services.local_scorer import local_scorer
+from app.services.skill_taxonomy import skill_taxonomy
 from app.services.embedding_service import embedding_service
-from app.services.pinecone_service import pinecone_service
+from app.services.embedding_models import serving_model
+from app.services.vector_store import vector_store
+from app.services.vector_sync import vector_outbox
+from app.services.job_cache import job_cache
+from app.services.dedup_service import dedup_service
+from app.services.facet_index import facet_index
+from app.services.search_cache import search_cache
+from app.services.summary_store import summary_store
+from app.services.text_preparation import normalize_text
+from app.utils.vectors import candidate_metadata
+from app.utils.fingerprints import fingerprint_resume
 
-router = APIRouter()
-security = HTTPBearer()
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Extract user info from JWT token"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(401, "Invalid token")
-    return payload
+# Upload parts spool to disk early (see app.utils.uploads)
+router = APIRouter(route_class=UploadRoute)
 
 @router.post("/jobs/{job_id}/upload-resumes")
 async def upload_resumes(
     job_id: str,
     resumes: List[UploadFile] = File(...),
-    db: Client = Depends(get_db),
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Upload and process multiple resumes for a job with AI parsing and scoring
+    
+    Files are extracted and parsed one by one. Every SCORE_BATCH_SIZE parsed
+    candidates are scored in one LLM prompt, then embedded and stored, while
+    the next files are parsed; only the groups in flight are held in memory.
     """
     tenant_id = current_user["tenant_id"]
     
-    logger.info(f"Uploading {len(resumes)} resumes for job {job_id}")
+    logger.info("Uploading %s resumes for job %s", len(resumes), job_id)
     
-    # Verify job exists and belongs to tenant
-    job = db.table("job_postings")\
-        .select("*")\
-        .eq("id", job_id)\
-        .eq("tenant_id", tenant_id)\
-        .single()\
-        .execute()
+    if len(resumes) > settings.UPLOAD_MAX_FILES:
+        raise HTTPException(413, f"Too many files. Maximum is {settings.UPLOAD_MAX_FILES} per upload")
+    
+    # Verify job exists and belongs to tenant (served from the job cache)
+    cached_job = await job_cache.get_job(db, tenant_id, int(job_id))
     
-    if not job.data:
+    if cached_job is None:
         raise HTTPException(404, "Job not found")
     
-    job_requirements = job.data
+    job_requirements, _ = cached_job
     
-    results = []
-    success_count = 0
-    failed_count = 0
+    # Embed with the serving model version for the whole batch
+    embedding_model = await serving_model.get(db)
     
-    for resume_file in resumes:
+    results: List[dict | None] = [None] * len(resumes)
+    # Parsed candidates waiting for their scoring group
+    pending: List[dict] = []
+    groups: List[asyncio.Task] = []
+    # Shared by all groups, so the upload has at most SCORE_BATCH_CONCURRENCY prompts in flight
+    semaphore = asyncio.Semaphore(settings.SCORE_BATCH_CONCURRENCY)
+    
+    async def store(item: dict, evaluation: dict | Exception) -> None:
+        """Embed and store one scored candidate"""
+        parsed_data = item["parsed_data"]
+        duplicate = item["duplicate"]
         try:
-            # Validate file type
-            if not resume_file.filename.lower().endswith(('.pdf', '.doc', '.docx')):
-                results.append({
-                    "filename": resume_file.filename,
-                    "status": "error",
-                    "error": "Invalid file type. Only PDF, DOC, DOCX allowed"
-                })
-                failed_count += 1
-                continue
-            
-            # Read file content
-            content = await resume_file.read()
+            if isinstance(evaluation, Exception):
+                raise evaluation
+            # Skill lists by skill ID rather than in the LLM's wording
+            evaluation.update(local_scorer.skill_match(item["skill_ids"], item["resume_text"], job_requirements))
             
-            # Step 1: Extract text from PDF
-            logger.info(f"Extracting text from {resume_file.filename}")
-            resume_text = await resume_parser.extract_text_from_pdf(content)
-            
-            if not resume_text or len(resume_text) < 50:
-                raise Exception("Could not extract sufficient text from resume")
-            
-            # Step 2: Parse resume with AI
-            logger.info(f"Parsing resume with AI: {resume_file.filename}")
-            parsed_data = await resume_parser.parse_resume(resume_text)
-            
-            # Step 3: Score candidate with AI
-            logger.info(f"Scoring candidate: {parsed_data.get('name', 'Unknown')}")
-            evaluation = await scoring_service.score_candidate(
-                resume_text,
-                parsed_data,
-                job_requirements
+            # Step 4: Generate one embedding per resume section chunk
+            logger.info("Generating embeddings for %s", parsed_data.get('name', 'Unknown'))
+            # Encoding and the vector store client are blocking; keep them off the event loop
+            _, chunk_embeddings = await asyncio.to_thread(
+                embedding_service.generate_resume_chunk_embeddings, item["resume_text"], embedding_model
             )
             
-            # Step 4: Generate embedding for vector search
-            logger.info(f"Generating embedding for {parsed_data.get('name', 'Unknown')}")
-            embedding = embedding_service.generate_embedding(resume_text)
-            
             # Step 5: Create candidate record
-            candidate = db.table("candidates").insert({
+            candidate = await db.table("candidates").insert({
                 "tenant_id": tenant_id,
                 "job_posting_id": job_id,
                 "name": parsed_data.get("name", "Unknown"),
                 "email": parsed_data.get("email"),
                 "phone": parsed_data.get("phone"),
                 "location": parsed_data.get("location"),
-                "resume_text": resume_text,
+                "resume_text": item["resume_text"],
                 "parsed_data": parsed_data,
+                "skill_ids": item["skill_ids"],
                 "match_score": evaluation["overall_score"],
                 "skills_matched": evaluation["skills_matched"],
                 "skills_missing": evaluation["skills_missing"],
@@ -111,57 +105,170 @@ async def upload_resumes(
                 "strengths": evaluation["strengths"],
                 "concerns": evaluation.get("concerns", []),
                 "recommendation": evaluation["recommendation"],
-                "status": "screened"
+                "status": "screened",
+                **item["fingerprint"].columns(),
+                "canonical_candidate_id": duplicate.canonical_id if duplicate else None
             }).execute()
             
             candidate_id = candidate.data[0]["id"]
+            facet_index.add(tenant_id, candidate.data)
+            summary_store.add(tenant_id, candidate.data)
             
-            # Step 6: Store embedding in Pinecone
-            # Prepare metadata (Pinecone doesn't accept null values)
-            skills_list = parsed_data.get("skills", [])
-            if skills_list:
-                skills_list = skills_list[:10]  # Limit to 10 skills
-            
-            pinecone_success = pinecone_service.upsert_resume(
+            # Step 6: Store embeddings in the vector store
+            pinecone_success = await asyncio.to_thread(
+                vector_store.upsert_resume_chunks,
                 candidate_id=candidate_id,
-                embedding=embedding,
-                metadata={
-                    "tenant_id": tenant_id,
-                    "job_posting_id": int(job_id),
-                    "name": parsed_data.get("name") or "Unknown",
-                    "skills": skills_list if skills_list else ["none"],
-                    "experience_years": parsed_data.get("experience_years") or 0,
-                    "match_score": float(evaluation["overall_score"]),
-                    "recommendation": evaluation.get("recommendation") or "pending"
-                }
+                embeddings=chunk_embeddings,
+                metadata=candidate_metadata(candidate.data[0]),
+                model=embedding_model
             )
             
             if pinecone_success:
-                logger.info(f"✅ Stored embedding in Pinecone for candidate {candidate_id}")
+                logger.info("✅ Stored embeddings for candidate %s", candidate_id)
             else:
-                logger.warning(f"⚠️ Failed to store embedding in Pinecone for candidate {candidate_id}")
+                logger.warning("⚠️ Failed to store embeddings for candidate %s", candidate_id)
+                if vector_store.enabled:
+                    await vector_outbox.enqueue(db, candidate_id, tenant_id, "upsert", embedding_model)
             
-            results.append({
-                "filename": resume_file.filename,
+            results[item["index"]] = {
+                "filename": item["filename"],
                 "candidate_id": candidate_id,
                 "name": parsed_data.get("name", "Unknown"),
                 "score": evaluation["overall_score"],
                 "recommendation": evaluation["recommendation"],
                 "status": "success",
-                "pinecone_stored": pinecone_success
-            })
-            success_count += 1
+                "pinecone_stored": pinecone_success,
+                "duplicate_of": duplicate.canonical_id if duplicate else None,
+                "duplicate_match": duplicate.kind if duplicate else None
+            }
             
-            logger.info(f"✅ Processed: {resume_file.filename} - Score: {evaluation['overall_score']}/100")
+            logger.info("✅ Processed: %s - Score: %s/100", item["filename"], evaluation['overall_score'])
             
         except Exception as e:
-            logger.error(f"❌ Error processing {resume_file.filename}: {str(e)}")
-            results.append({
-                "filename": resume_file.filename,
+            logger.error("❌ Error processing %s: %s", item["filename"], e)
+            results[item["index"]] = {
+                "filename": item["filename"],
                 "status": "error",
                 "error": str(e)
+            }
+    
+    async def score_group(group: List[dict]) -> None:
+        logger.info("Scoring %s candidates for job %s", len(group), job_id)
+        try:
+            evaluations = await scoring_service.score_candidates(
+                [(item["resume_text"], item["parsed_data"]) for item in group],
+                job_requirements,
+                semaphore
+            )
+        except Exception as e:
+            evaluations = [e] * len(group)
+        for item, evaluation in zip(group, evaluations):
+            await store(item, evaluation)
+    
+    async def start_group() -> None:
+        # Wait for a running group first, so only SCORE_BATCH_CONCURRENCY groups of texts are held
+        running = [group for group in groups if not group.done()]
+        if len(running) >= settings.SCORE_BATCH_CONCURRENCY:
+            await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        groups.append(asyncio.create_task(score_group(list(pending))))
+        pending.clear()
+    
+    # Extract, dedup and parse each file; every SCORE_BATCH_SIZE parsed
+    # candidates are scored (one prompt) and stored while parsing goes on.
+    # Files stay in Starlette's spooled temp files (on disk past a small
+    # in-memory threshold); each is read by its extractor as a stream and
+    # closed as soon as it's processed, so memory doesn't grow with the batch
+    for index, resume_file in enumerate(resumes):
+        try:
+            # The request as a whole is capped by UploadLimitMiddleware
+            if upload_size(resume_file) > settings.UPLOAD_MAX_FILE_BYTES:
+                results[index] = {
+                    "filename": resume_file.filename,
+                    "status": "error",
+                    "error": "File size limit exceeded"
+                }
+                continue
+            
+            # Step 1: Extract text (format detected from content, not extension)
+            logger.info("Extracting text from %s", resume_file.filename)
+            try:
+                resume_text = await resume_parser.extract_text(resume_file.file)
+            except UnsupportedFormatError as e:
+                results[index] = {
+                    "filename": resume_file.filename,
+                    "status": "error",
+                    "error": str(e)
+                }
+                continue
+            
+            # Normalized once here so the stored text, prompts and embedding agree
+            resume_text = normalize_text(resume_text)
+            
+            if not resume_text or len(resume_text) < 50:
+                raise Exception("Could not extract sufficient text from resume")
+            
+            # Step 2: Look for an earlier upload of the same person
+            fingerprint = fingerprint_resume(resume_text)
+            duplicate = await dedup_service.find_duplicate(db, tenant_id, fingerprint, job_id)
+            
+            if duplicate and duplicate.kind == "exact" and str(duplicate.candidate["job_posting_id"]) == str(job_id):
+                # Same resume already uploaded to this job: nothing to do
+                logger.info("Skipping %s: already uploaded as candidate %s", resume_file.filename, duplicate.candidate["id"])
+                results[index] = {
+                    "filename": resume_file.filename,
+                    "candidate_id": duplicate.candidate["id"],
+                    "name": (duplicate.candidate.get("parsed_data") or {}).get("name", "Unknown"),
+                    "status": "duplicate",
+                    "duplicate_of": duplicate.candidate["id"]
+                }
+                continue
+            
+            # Step 3: Parse resume with AI, unless the same content was parsed before
+            if duplicate and duplicate.same_content and settings.DEDUP_REUSE_PARSED_DATA and duplicate.candidate.get("parsed_data"):
+                logger.info("Reusing parsed data of candidate %s (%s duplicate)", duplicate.candidate["id"], duplicate.kind)
+                parsed_data = duplicate.candidate["parsed_data"]
+                fingerprint = fingerprint.with_contacts(parsed_data)
+            else:
+                logger.info("Parsing resume with AI: %s", resume_file.filename)
+                parsed_data = await resume_parser.parse_resume(resume_text)
+                
+                # The parsed email/phone can link a different resume version
+                with_contacts = fingerprint.with_contacts(parsed_data)
+                if duplicate is None and with_contacts != fingerprint:
+                    duplicate = await dedup_service.find_duplicate(db, tenant_id, with_contacts, job_id)
+                fingerprint = with_contacts
+            
+            pending.append({
+                "index": index,
+                "filename": resume_file.filename,
+                "resume_text": resume_text,
+                "parsed_data": parsed_data,
+                # Listed skills plus dictionary skills mentioned in the text
+                "skill_ids": skill_taxonomy.skill_ids(parsed_data.get("skills"), resume_text),
+                "fingerprint": fingerprint,
+                "duplicate": duplicate
             })
-            failed_count += 1
+            
+        except Exception as e:
+            logger.error("❌ Error processing %s: %s", resume_file.filename, e)
+            results[index] = {
+                "filename": resume_file.filename,
+                "status": "error",
+                "error": str(e)
+            }
+        finally:
+            await resume_file.close()
+        
+        if len(pending) >= max(settings.SCORE_BATCH_SIZE, 1):
+            await start_group()
+    
+    if pending:
+        await start_group()
+    await asyncio.gather(*groups)
+    
+    # New candidates change every cached talent pool ranking
+    if any(result["status"] == "success" for result in results):
+        search_cache.invalidate(tenant_id)
     
     return {
         "message": f"Processed {len(resumes)} resumes",
@@ -169,42 +276,64 @@ async def upload_resumes(
         "results": results,
         "summary": {
             "total": len(resumes),
-            "success": success_count,
-            "failed": failed_count
+            "success": sum(result["status"] == "success" for result in results),
+            "failed": sum(result["status"] == "error" for result in results),
+            "duplicates": sum(result["status"] == "duplicate" for result in results)
         }
     }
 
 @router.get("/jobs/{job_id}/candidates")
 async def get_job_candidates(
     job_id: str,
-    db: Client = Depends(get_db),
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all candidates for a specific job"""
+    """
+    Get all candidates for a specific job
+    
+    Returns card summaries (app.services.summary_store); the full row of a
+    candidate is served by GET /{candidate_id}.
+    """
     tenant_id = current_user["tenant_id"]
     
-    # Get job title
-    job = db.table("job_postings").select("title").eq("id", job_id).eq("tenant_id", tenant_id).single().execute()
+    # Job title and candidate summaries are independent, fetch them concurrently
+    cached_job, candidates = await asyncio.gather(
+        job_cache.get_job(db, tenant_id, int(job_id)),
+        summary_store.job_candidates(db, tenant_id, int(job_id))
+    )
+    
+    return {
+        "job_id": job_id,
+        "job_title": cached_job[0]["title"] if cached_job else "Job Candidates",
+        "total": len(candidates),
+        "candidates": candidates
+    }
+
+@router.get("/{candidate_id}")
+async def get_candidate(
+    candidate_id: int,
+    db: AsyncPostgrestClient = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a candidate's full record, including the AI evaluation"""
+    tenant_id = current_user["tenant_id"]
     
-    candidates = db.table("candidates")\
+    result = await db.table("candidates")\
         .select("*")\
-        .eq("job_posting_id", job_id)\
+        .eq("id", candidate_id)\
         .eq("tenant_id", tenant_id)\
-        .order("match_score", desc=True)\
         .execute()
     
-    return {
-        "job_id": job_id,
-        "job_title": job.data["title"] if job.data else "Job Candidates",
-        "total": len(candidates.data),
-        "candidates": candidates.data
-    }
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    
+    return result.data[0]
 
 @router.patch("/{candidate_id}/status")
 async def update_candidate_status(
     candidate_id: int,
     status_update: dict,
-    db: Client = Depends(get_db),
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -223,7 +352,7 @@ async def update_candidate_status(
         raise HTTPException(status_code=400, detail="Invalid status")
     
     # Update candidate status
-    result = db.table("candidates")\
+    result = await db.table("candidates")\
         .update({"status": new_status})\
         .eq("id", candidate_id)\
         .eq("tenant_id", tenant_id)\
@@ -232,7 +361,8 @@ async def update_candidate_status(
     if not result.data:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    logger.info(f"Updated candidate {candidate_id} status to {new_status}")
+    summary_store.update(tenant_id, candidate_id, {"status": new_status})
+    logger.info("Updated candidate %s status to %s", candidate_id, new_status)
     
     return {
         "message": f"Candidate status updated to {new_status}",
@@ -243,11 +373,11 @@ async def update_candidate_status(
 @router.delete("/{candidate_id}")
 async def delete_candidate(
     candidate_id: int,
-    db: Client = Depends(get_db),
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Delete candidate from both Supabase and Pinecone
+    Delete candidate from both Supabase and the vector store
     
     This permanently removes the candidate from the system.
     """
@@ -255,7 +385,7 @@ async def delete_candidate(
     
     try:
         # Delete from Supabase
-        result = db.table("candidates")\
+        result = await db.table("candidates")\
             .delete()\
             .eq("id", candidate_id)\
             .eq("tenant_id", tenant_id)\
@@ -264,13 +394,27 @@ async def delete_candidate(
         if not result.data:
             raise HTTPException(status_code=404, detail="Candidate not found")
         
-        # Delete from Pinecone
-        pinecone_deleted = pinecone_service.delete_resume(candidate_id)
+        search_cache.invalidate(tenant_id)
+        facet_index.remove(tenant_id, candidate_id)
+        summary_store.remove(tenant_id, candidate_id)
+        
+        # Hand the person over to the next-oldest duplicate, if any
+        if result.data[0].get("canonical_candidate_id") is None:
+            await dedup_service.release(db, tenant_id, candidate_id)
+        
+        # Delete from the vector store, in every namespace still in use;
+        # failures are queued so no ghost vectors are left behind
+        pinecone_deleted = True
+        for model in await serving_model.live(db):
+            if not await asyncio.to_thread(vector_store.delete_resume, candidate_id, model):
+                pinecone_deleted = False
+                if vector_store.enabled:
+                    await vector_outbox.enqueue(db, candidate_id, tenant_id, "delete", model)
         
         if pinecone_deleted:
-            logger.info(f"✅ Deleted candidate {candidate_id} from both Supabase and Pinecone")
+            logger.info("✅ Deleted candidate %s from both Supabase and the vector store", candidate_id)
         else:
-            logger.warning(f"⚠️ Deleted candidate {candidate_id} from Supabase, but Pinecone deletion failed")
+            logger.warning("⚠️ Deleted candidate %s from Supabase, but vector deletion failed (queued for retry)", candidate_id)
         
         return {
             "message": "Candidate deleted successfully",
@@ -281,5 +425,5 @@ async def delete_candidate(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting candidate {candidate_id}: {e}")
+        logger.error("Error deleting candidate %s: %s", candidate_id, e)
         raise HTTPException(status_code=500, detail=str(e))
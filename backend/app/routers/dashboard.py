@@ -1,58 +1,48 @@
 """
 Dashboard statistics endpoint
 """
+import asyncio
 from fastapi import APIRouter, Depends
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 from app.config.database import get_db
 from app.config.logging_config import logger
-from app.utils.jwt import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.utils.auth import get_current_user
 
 router = APIRouter()
-security = HTTPBearer()
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Extract user info from JWT token"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(401, "Invalid token")
-    return payload
 
 @router.get("/stats")
-def get_dashboard_stats(
-    db: Client = Depends(get_db),
+async def get_dashboard_stats(
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get dashboard statistics for current tenant"""
     tenant_id = current_user["tenant_id"]
     
-    logger.info(f"Fetching dashboard stats for tenant {tenant_id}")
-    
-    # Count active jobs
-    jobs_result = db.table("job_postings")\
-        .select("id", count="exact")\
-        .eq("tenant_id", tenant_id)\
-        .eq("status", "active")\
-        .execute()
+    logger.info("Fetching dashboard stats for tenant %s", tenant_id)
+    
+    # The three counts are independent, so run them concurrently
+    jobs_result, candidates_result, shortlisted_result = await asyncio.gather(
+        # Count active jobs
+        db.table("job_postings")\
+            .select("id", count="exact")\
+            .eq("tenant_id", tenant_id)\
+            .eq("status", "active")\
+            .execute(),
+        # Count total candidates
+        db.table("candidates")\
+            .select("id", count="exact")\
+            .eq("tenant_id", tenant_id)\
+            .execute(),
+        # Count shortlisted candidates
+        db.table("candidates")\
+            .select("id", count="exact")\
+            .eq("tenant_id", tenant_id)\
+            .eq("status", "shortlisted")\
+            .execute()
+    )
     
     active_jobs = jobs_result.count if jobs_result.count else 0
-    
-    # Count total candidates
-    candidates_result = db.table("candidates")\
-        .select("id", count="exact")\
-        .eq("tenant_id", tenant_id)\
-        .execute()
-    
     total_candidates = candidates_result.count if candidates_result.count else 0
-    
-    # Count shortlisted candidates
-    shortlisted_result = db.table("candidates")\
-        .select("id", count="exact")\
-        .eq("tenant_id", tenant_id)\
-        .eq("status", "shortlisted")\
-        .execute()
-    
     shortlisted = shortlisted_result.count if shortlisted_result.count else 0
     
     return {
@@ -1,31 +1,35 @@
 """
 Job management endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from postgrest import AsyncPostgrestClient
 from app.config.database import get_db
 from app.schemas.jobs import (
     JobCreate, 
     JobResponse, 
+    JobSummaryResponse,
     ExtractRequirementsRequest,
     ExtractRequirementsResponse
 )
 from app.services.ai_service import ai_service
+from app.services.job_cache import job_cache
+from app.services.rescoring import rescore_service
+from app.services.summary_store import summary_store
 from app.config.logging_config import logger
-from app.utils.jwt import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.utils.auth import get_current_user
 from typing import List
 
 router = APIRouter()
-security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Extract user info from JWT token"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(401, "Invalid token")
-    return payload
+def _cached_json(body: bytes, etag: str) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
 @router.post("/extract-requirements", response_model=ExtractRequirementsResponse)
 async def extract_requirements(
@@ -33,28 +37,28 @@ async def extract_requirements(
     current_user: dict = Depends(get_current_user)
 ):
     """Extract job requirements using AI"""
-    logger.info(f"User {current_user['email']} extracting requirements")
+    logger.info("User %s extracting requirements", current_user['email'])
     
     try:
         requirements = await ai_service.extract_job_requirements(data.description)
         return requirements
     except Exception as e:
-        logger.error(f"Requirement extraction failed: {str(e)}")
+        logger.error("Requirement extraction failed: %s", e)
         raise HTTPException(500, "Failed to extract requirements")
 
 @router.post("", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
-def create_job(
+async def create_job(
     data: JobCreate,
-    db: Client = Depends(get_db),
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Create new job posting"""
     tenant_id = current_user["tenant_id"]
     
-    logger.info(f"Creating job '{data.title}' for tenant {tenant_id}")
+    logger.info("Creating job '%s' for tenant %s", data.title, tenant_id)
     
     # Insert job
-    result = db.table("job_postings").insert({
+    result = await db.table("job_postings").insert({
         "tenant_id": tenant_id,
         "title": data.title,
         "description": data.description,
@@ -70,118 +74,135 @@ def create_job(
         raise HTTPException(500, "Failed to create job")
     
     job = result.data[0]
-    logger.info(f"Job created with ID {job['id']}")
+    job_cache.invalidate(tenant_id)
+    logger.info("Job created with ID %s", job['id'])
     
     return job
 
-@router.get("", response_model=List[JobResponse])
-def list_jobs(
-    db: Client = Depends(get_db),
+@router.get("", response_model=List[JobSummaryResponse])
+async def list_jobs(
+    request: Request,
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """List all jobs for current tenant"""
+    """List all jobs for current tenant (descriptions trimmed to a preview)"""
     tenant_id = current_user["tenant_id"]
     
-    logger.info(f"Fetching jobs for tenant {tenant_id}")
+    # Unchanged since the client's copy: answer without touching the database
+    etag = job_cache.etag(tenant_id)
+    if job_cache.is_fresh(tenant_id, "list", request.headers.get("if-none-match")):
+        return _not_modified(etag)
     
-    result = db.table("job_postings")\
-        .select("*")\
-        .eq("tenant_id", tenant_id)\
-        .order("created_at", desc=True)\
-        .execute()
+    logger.info("Fetching jobs for tenant %s", tenant_id)
     
-    return result.data
+    body = await job_cache.list_jobs(db, tenant_id)
+    return _cached_json(body, etag)
 
 @router.get("/{job_id}", response_model=JobResponse)
-def get_job(
+async def get_job(
     job_id: int,
-    db: Client = Depends(get_db),
+    request: Request,
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get job details"""
     tenant_id = current_user["tenant_id"]
     
-    result = db.table("job_postings")\
-        .select("*")\
-        .eq("id", job_id)\
-        .eq("tenant_id", tenant_id)\
-        .execute()
+    etag = job_cache.etag(tenant_id)
+    if job_cache.is_fresh(tenant_id, ("job", job_id), request.headers.get("if-none-match")):
+        return _not_modified(etag)
     
-    if not result.data:
+    cached = await job_cache.get_job(db, tenant_id, job_id)
+    if cached is None:
         raise HTTPException(404, "Job not found")
     
-    return result.data[0]
+    _, body = cached
+    return _cached_json(body, etag)
 
 @router.put("/{job_id}", response_model=JobResponse)
-def update_job(
+async def update_job(
     job_id: int,
     data: JobCreate,
-    db: Client = Depends(get_db),
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Update job posting"""
-    tenant_id = current_user["tenant_id"]
-    
-    logger.info(f"Updating job {job_id} for tenant {tenant_id}")
+    """
+    Update job posting
     
-    # Check if job exists and belongs to tenant
-    existing = db.table("job_postings")\
-        .select("*")\
-        .eq("id", job_id)\
-        .eq("tenant_id", tenant_id)\
-        .execute()
+    If skills, minimum experience, title or description changed, the job's
+    candidates are re-scored (locally right away, by the LLM in the background;
+    progress at GET /jobs/{job_id}/rescore).
+    """
+    tenant_id = current_user["tenant_id"]
     
-    if not existing.data:
-        raise HTTPException(404, "Job not found")
+    logger.info("Updating job %s for tenant %s", job_id, tenant_id)
     
-    # Update job
-    result = db.table("job_postings")\
-        .update({
+    # Single statement returning the job before and after: the tenant filter
+    # is the ownership check, no row means the job doesn't exist for this
+    # tenant, and re-scoring gets the old requirements without a prior read
+    result = await db.rpc("update_job_posting", {
+        "p_job_id": job_id,
+        "p_tenant_id": tenant_id,
+        "p_changes": {
             "title": data.title,
             "description": data.description,
             "requirements": data.requirements,
             "must_have_skills": data.must_have_skills,
             "nice_to_have_skills": data.nice_to_have_skills,
             "min_experience": data.min_experience
-        })\
-        .eq("id", job_id)\
-        .eq("tenant_id", tenant_id)\
-        .execute()
+        }
+    }).execute()
     
     if not result.data:
-        logger.error(f"Failed to update job {job_id}")
-        raise HTTPException(500, "Failed to update job")
+        raise HTTPException(404, "Job not found")
+    
+    old_job, new_job = result.data[0]["old_job"], result.data[0]["new_job"]
+    job_cache.invalidate(tenant_id)
+    logger.info("Job %s updated successfully", job_id)
     
-    logger.info(f"Job {job_id} updated successfully")
-    return result.data[0]
+    try:
+        await rescore_service.start(db, tenant_id, old_job, new_job)
+    except Exception as e:
+        # The update itself succeeded; re-scoring is best effort
+        logger.error("❌ Re-scoring job %s failed: %s", job_id, e)
+    
+    return new_job
+
+@router.get("/{job_id}/rescore")
+async def get_rescore_progress(
+    job_id: int,
+    db: AsyncPostgrestClient = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Progress of the latest re-scoring run of a job"""
+    progress = await rescore_service.progress(db, current_user["tenant_id"], job_id)
+    if progress is None:
+        raise HTTPException(404, "No re-scoring run for this job")
+    return progress
 
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_job(
+async def delete_job(
     job_id: int,
-    db: Client = Depends(get_db),
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Delete job posting"""
     tenant_id = current_user["tenant_id"]
     
-    logger.info(f"Deleting job {job_id} for tenant {tenant_id}")
+    logger.info("Deleting job %s for tenant %s", job_id, tenant_id)
     
-    # Check if job exists and belongs to tenant
-    existing = db.table("job_postings")\
-        .select("*")\
+    # Single conditional delete; PostgREST returns the deleted rows, so an
+    # empty result means the job doesn't exist for this tenant
+    result = await db.table("job_postings")\
+        .delete()\
         .eq("id", job_id)\
         .eq("tenant_id", tenant_id)\
         .execute()
     
-    if not existing.data:
+    if not result.data:
         raise HTTPException(404, "Job not found")
     
-    # Delete job
-    result = db.table("job_postings")\
-        .delete()\
-        .eq("id", job_id)\
-        .eq("tenant_id", tenant_id)\
-        .execute()
-    
-    logger.info(f"Job {job_id} deleted successfully")
+    job_cache.invalidate(tenant_id)
+    summary_store.drop_job(tenant_id, job_id)
+    logger.info("Job %s deleted successfully", job_id)
     return None
@@ -1,110 +1,288 @@
 """
 Talent Pool Search endpoints
 """
+import asyncio
+from typing import Dict, Iterable, List, Tuple
 from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 from app.config.database import get_db
+from app.config.settings import settings
 from app.config.logging_config import logger
-from app.utils.jwt import decode_token
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.utils.auth import get_current_user
 from app.services.embedding_service import embedding_service
-from app.services.pinecone_service import pinecone_service
+from app.services.embedding_models import ModelSpec, serving_model
+from app.services.vector_store import vector_store
+from app.services.dedup_service import dedup_service
+from app.services.facet_index import TenantFacets, facet_index, parse_filters
+from app.services.search_cache import search_cache
+from app.services.summary_store import summary_store
+from app.services.job_cache import job_cache
+from app.utils.vectors import VectorSearchError
 
 router = APIRouter()
-security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Extract user info from JWT token"""
-    token = credentials.credentials
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return payload
+
+def _ranking(facets: TenantFacets, entries: List[Dict], cutoff: float | None, complete: bool, partial: bool) -> Dict:
+    return {
+        "entries": entries,
+        # Lowest chunk-aggregated score the vector search returned
+        "cutoff": cutoff,
+        # The search returned every candidate that passed the filters
+        "complete": complete,
+        # Narrowed from a deeper ranking and cut where its order stops being exact
+        "partial": partial,
+        "facets": facets.counts(facets.bitmap(entry["id"] for entry in entries), settings.FACET_MAX_VALUES)
+    }
+
+
+async def _rank(
+    tenant_id: int,
+    query: str,
+    facets: TenantFacets,
+    selection: int | None,
+    embedding_model: ModelSpec,
+    cache_key: Tuple,
+    version: int
+) -> Dict:
+    """
+    Rank the tenant's candidates for a query and cache the ranking
+
+    With a facet `selection`, the vector search only sees the selected
+    candidates; pools too large for a `$in` filter are filtered after.
+    `$in` matches the `candidate_id` metadata of chunk vectors; legacy
+    single vectors lack it until app.tasks.reconcile replaces them.
+    """
+    filter_dict = {"tenant_id": tenant_id}
+    post_filter = False
+    if selection is not None:
+        candidate_ids = facets.candidate_ids(selection)
+        if not candidate_ids:
+            ranking = _ranking(facets, [], None, True, False)
+            search_cache.set(tenant_id, cache_key, ranking, version)
+            return ranking
+        if len(candidate_ids) <= settings.FACET_PREFILTER_MAX_IDS:
+            filter_dict["candidate_id"] = {"$in": candidate_ids}
+        else:
+            post_filter = True
+
+    query_embedding = await asyncio.to_thread(embedding_service.encode_query, query, embedding_model)
+
+    # Search chunk vectors with tenant filter, ranked per candidate.
+    # Raises VectorSearchError if the store fails, so no empty ranking is cached
+    search_results, complete = await asyncio.to_thread(
+        vector_store.search_candidates,
+        query_embedding=query_embedding,
+        top_k=settings.SEARCH_RESULT_DEPTH,
+        filter_dict=filter_dict,
+        model=embedding_model
+    )
+    cutoff = search_results[-1]["score"] if search_results else None
+    if post_filter:
+        search_results = [match for match in search_results if facets.contains(selection, match["candidate_id"])]
+
+    scores = {match["candidate_id"]: match["score"] for match in search_results}
+    rows = [
+        {"id": match["candidate_id"], "canonical_candidate_id": facets.canonical(match["candidate_id"])}
+        for match in search_results
+    ]
+
+    # One entry per person: the best-matching upload, others listed under it
+    groups = dedup_service.group(rows) if settings.DEDUP_ENABLED else [(row, []) for row in rows]
+    entries = [
+        {
+            "id": row["id"],
+            "score": scores[row["id"]],
+            "others": [{"id": other["id"], "score": scores[other["id"]]} for other in others]
+        }
+        for row, others in groups
+    ]
+
+    ranking = _ranking(facets, entries, cutoff, complete, False)
+    search_cache.set(tenant_id, cache_key, ranking, version)
+    return ranking
+
+
+def _narrow(base: Dict, facets: TenantFacets, selection: int) -> Dict:
+    """
+    Filter a cached unfiltered ranking down to a facet selection
+
+    Each person is represented by their best selected upload. Candidates
+    the base search didn't return all scored at most its cutoff, so the
+    narrowed order is exact down to the cutoff; below it, only if the base
+    search returned everyone.
+    """
+    entries = []
+    for entry in base["entries"]:
+        members = [
+            member for member in [{"id": entry["id"], "score": entry["score"]}, *entry["others"]]
+            if facets.contains(selection, member["id"])
+        ]
+        if members:
+            entries.append({**members[0], "others": members[1:]})
+    entries.sort(key=lambda entry: entry["score"], reverse=True)
+
+    partial = not base["complete"]
+    if partial:
+        entries = [entry for entry in entries if entry["score"] >= base["cutoff"]]
+    return _ranking(facets, entries, base["cutoff"], base["complete"], partial)
+
+
+async def _job_titles(db: AsyncPostgrestClient, tenant_id: int, job_ids: Iterable[int]) -> Dict[int, str]:
+    job_ids = list({job_id for job_id in job_ids if job_id is not None})
+    jobs = await asyncio.gather(*(job_cache.get_job(db, tenant_id, job_id) for job_id in job_ids))
+    return {job_id: job[0]["title"] for job_id, job in zip(job_ids, jobs) if job}
+
+
+async def _page_results(db: AsyncPostgrestClient, tenant_id: int, page: List[Dict]) -> List[Dict]:
+    """Candidate summaries for one page of a ranking, in rank order"""
+    if not page:
+        return []
+
+    ids = [entry["id"] for entry in page] + [other["id"] for entry in page for other in entry["others"]]
+    rows = await summary_store.get_many(db, tenant_id, ids)
+    titles = await _job_titles(db, tenant_id, (row["job_posting_id"] for row in rows.values()))
+    for row in rows.values():
+        row["job_title"] = titles.get(row["job_posting_id"])
+
+    results = []
+    for entry in page:
+        # Deleted by another worker since the ranking was cached
+        if entry["id"] not in rows:
+            continue
+        result = {**rows[entry["id"]], "similarity_score": entry["score"]}
+        if settings.DEDUP_ENABLED:
+            result["other_applications"] = [
+                dedup_service.application(rows[other["id"]]) for other in entry["others"] if other["id"] in rows
+            ]
+        results.append(result)
+    return results
+
+
+def _filters(request: dict) -> Tuple[Dict, int]:
+    try:
+        return parse_filters(request.get("filters")), max(int(request.get("min_experience") or 0), 0)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _page(request: dict) -> Tuple[int, int]:
+    """(offset, page size) of a search request"""
+    try:
+        top_k = min(max(int(request.get("top_k", 20)), 1), settings.SEARCH_MAX_PAGE_SIZE)
+        return max(int(request.get("offset", 0)), 0), top_k
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid top_k or offset: {e}")
+
 
 @router.post("/search")
 async def search_talent_pool(
     search_request: dict,
-    db: Client = Depends(get_db),
+    db: AsyncPostgrestClient = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Search talent pool using semantic search with Pinecone
-    
+    Search talent pool using semantic search over resume chunk vectors
+
+    Facet filters select candidates from the tenant's facet index (see
+    app.services.facet_index) before the vector search. Within a facet,
+    values are alternatives; across facets, all must match. The ranking
+    for a query is cached per tenant (see app.services.search_cache), so
+    later pages and repeated searches only look up the candidate summaries
+    they return (app.services.summary_store), and
+    drilling into the facets of a cached search filters it in memory.
+    `facets` counts the ranked candidates per facet value.
+
     Body: {
         "query": "Python developer with AWS experience",
+        "filters": {"skill": ["Python"], "location": [...], "experience": ["3-5", "6-10"], "recommendation": ["hire"]},
         "min_experience": 2,
-        "top_k": 20
+        "top_k": 20,      # page size
+        "offset": 0
     }
     """
     tenant_id = current_user["tenant_id"]
-    
+
     query = search_request.get("query", "").strip()
-    min_experience = search_request.get("min_experience", 0)
-    top_k = search_request.get("top_k", 20)
-    
+    filters, min_experience = _filters(search_request)
+    offset, top_k = _page(search_request)
+    end = offset + top_k
+
     if not query:
         raise HTTPException(status_code=400, detail="Query is required")
-    
+
     try:
-        # Generate embedding for search query
-        logger.info(f"Searching talent pool for: {query}")
-        query_embedding = embedding_service.generate_embedding(query)
-        
-        # Search Pinecone with tenant filter
-        search_results = pinecone_service.search_resumes(
-            query_embedding=query_embedding,
-            top_k=top_k,
-            filter_dict={"tenant_id": tenant_id}
-        )
-        
-        if not search_results:
-            return {"query": query, "total": 0, "results": []}
-        
-        # Extract candidate IDs from Pinecone results
-        candidate_ids = [int(match["id"].replace("candidate_", "")) for match in search_results]
-        
-        # Fetch full candidate data from Supabase
-        candidates = db.table("candidates")\
-            .select("*, job_postings(title)")\
-            .in_("id", candidate_ids)\
-            .eq("tenant_id", tenant_id)\
-            .execute()
-        
-        # Filter by experience if specified
-        filtered_candidates = candidates.data
-        if min_experience > 0:
-            filtered_candidates = [
-                c for c in filtered_candidates 
-                if c.get("experience_years", 0) >= min_experience
-            ]
-        
-        # Merge with similarity scores from Pinecone
-        results = []
-        for candidate in filtered_candidates:
-            # Find matching Pinecone result
-            pinecone_match = next(
-                (m for m in search_results if m["id"] == f"candidate_{candidate['id']}"),
-                None
-            )
-            
-            if pinecone_match:
-                results.append({
-                    **candidate,
-                    "similarity_score": pinecone_match["score"],
-                    "job_title": candidate.get("job_postings", {}).get("title") if candidate.get("job_postings") else None
-                })
-        
-        # Sort by similarity score
-        results.sort(key=lambda x: x.get("similarity_score", 0), reverse=True)
-        
-        logger.info(f"Found {len(results)} candidates for query: {query}")
-        
+        embedding_model = await serving_model.get(db)
+        facets = await facet_index.get(db, tenant_id)
+        filtered = bool(filters) or min_experience > 0
+        selection = facets.select(filters, min_experience) if filtered else None
+        version = search_cache.version(tenant_id)
+        cache_key = search_cache.key(query, filters, min_experience, embedding_model.version)
+
+        ranking = search_cache.get(tenant_id, cache_key)
+        if ranking is not None and ranking["partial"] and end > len(ranking["entries"]):
+            ranking = None
+
+        if ranking is None and filtered:
+            base = search_cache.get(tenant_id, search_cache.key(query, {}, 0, embedding_model.version))
+            if base is not None:
+                narrowed = _narrow(base, facets, selection)
+                if not narrowed["partial"] or end <= len(narrowed["entries"]):
+                    logger.info("Narrowing cached ranking for: %s", query)
+                    ranking = narrowed
+                    search_cache.set(tenant_id, cache_key, ranking, version)
+
+        if ranking is None:
+            logger.info("Searching talent pool for: %s", query)
+            ranking = await _rank(tenant_id, query, facets, selection, embedding_model, cache_key, version)
+        else:
+            logger.info("Serving cached ranking for: %s", query)
+
+        entries = ranking["entries"]
+        results = await _page_results(db, tenant_id, entries[offset:end])
+
+        logger.info("Found %s candidates for query: %s", len(results), query)
+
         return {
             "query": query,
+            "filters": filters,
             "total": len(results),
+            "offset": offset,
+            # A lower bound while the ranking is partial
+            "total_matches": len(entries),
+            "has_more": end < len(entries) or ranking["partial"],
+            "facets": ranking["facets"],
             "results": results
         }
-        
+
+    except VectorSearchError as e:
+        raise HTTPException(status_code=503, detail=f"Vector search unavailable: {e}")
+    except Exception as e:
+        logger.error("Talent pool search failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/facets")
+async def talent_pool_facets(
+    facet_request: dict,
+    db: AsyncPostgrestClient = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Facet counts over the whole talent pool, before any query
+
+    Body: {"filters": {...}, "min_experience": 0}  (as in /search, optional)
+    """
+    tenant_id = current_user["tenant_id"]
+    filters, min_experience = _filters(facet_request)
+
+    try:
+        facets = await facet_index.get(db, tenant_id)
+        selection = facets.select(filters, min_experience)
+        return {
+            "filters": filters,
+            "total": selection.bit_count(),
+            "facets": facets.counts(selection, settings.FACET_MAX_VALUES)
+        }
     except Exception as e:
-        logger.error(f"Talent pool search failed: {e}")
+        logger.error("Talent pool facets failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -39,3 +39,16 @@ class JobResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class JobSummaryResponse(BaseModel):
+    """Response schema for the jobs list: the fields a job card shows, description trimmed to a preview"""
+    id: int
+    title: str
+    description: str
+    must_have_skills: List[str]
+    min_experience: int
+    status: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
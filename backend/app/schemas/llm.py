@@ -0,0 +1,142 @@
+"""
+Pydantic schemas for structured LLM output
+
+Validators coerce the small slips models make ("5+ years", a skills string
+instead of a list, null lists, "Hire") so only genuinely unusable output
+fails validation.
+"""
+import re
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in re.split(r"[,;\n]", value) if part.strip()]
+    return list(value)
+
+
+def _as_int(value) -> int:
+    if value is None or value == "":
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return round(value)
+    match = re.search(r"\d+(?:\.\d+)?", str(value))
+    if match is None:
+        raise ValueError(f"no number in {value!r}")
+    return round(float(match.group(0)))
+
+
+def _as_optional_str(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value and value.lower() not in ("null", "none", "n/a") else None
+
+
+class _LLMOutput(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+
+class Education(_LLMOutput):
+    degree: Optional[str] = None
+    institution: Optional[str] = None
+    year: Optional[str] = None
+
+    _strings = field_validator("degree", "institution", "year", mode="before")(_as_optional_str)
+
+
+class WorkExperience(_LLMOutput):
+    title: Optional[str] = None
+    company: Optional[str] = None
+    duration: Optional[str] = None
+    description: Optional[str] = None
+
+    _strings = field_validator("title", "company", "duration", "description", mode="before")(_as_optional_str)
+
+
+class ParsedResume(_LLMOutput):
+    """Output of the resume parsing prompt"""
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    location: Optional[str] = None
+    summary: Optional[str] = None
+    skills: List[str] = []
+    experience_years: int = 0
+    education: List[Education] = []
+    work_experience: List[WorkExperience] = []
+    certifications: List[str] = []
+
+    _strings = field_validator("name", "email", "phone", "location", "summary", mode="before")(_as_optional_str)
+    _lists = field_validator("skills", "certifications", "education", "work_experience", mode="before")(_as_list)
+    _years = field_validator("experience_years", mode="before")(_as_int)
+
+
+class ScoreBreakdown(_LLMOutput):
+    skills: int = 0
+    experience: int = 0
+    relevance: int = 0
+    growth: int = 0
+
+    _points = field_validator("skills", "experience", "relevance", "growth", mode="before")(_as_int)
+
+
+class CandidateEvaluation(_LLMOutput):
+    """Output of the scoring prompt (one candidate)"""
+    overall_score: int
+    skills_matched: List[str] = []
+    skills_missing: List[str] = []
+    experience_match: bool = False
+    strengths: List[str] = []
+    concerns: List[str] = []
+    recommendation: Literal["hire", "maybe", "reject"]
+    detailed_explanation: str = ""
+    score_breakdown: ScoreBreakdown = ScoreBreakdown()
+
+    _lists = field_validator("skills_matched", "skills_missing", "strengths", "concerns", mode="before")(_as_list)
+
+    @field_validator("overall_score", mode="before")
+    @classmethod
+    def _score(cls, value) -> int:
+        return min(max(_as_int(value), 0), 100)
+
+    @field_validator("recommendation", mode="before")
+    @classmethod
+    def _recommendation(cls, value):
+        value = str(value or "").strip().lower()
+        if value in ("strong hire", "yes", "strong yes"):
+            return "hire"
+        if value in ("no", "no hire", "strong no"):
+            return "reject"
+        return value
+
+    @field_validator("score_breakdown", mode="before")
+    @classmethod
+    def _breakdown(cls, value):
+        return value or {}
+
+
+class BatchEvaluation(CandidateEvaluation):
+    """One entry of a batched scoring response"""
+    candidate_id: str
+
+
+class JobRequirements(_LLMOutput):
+    """Output of the requirement extraction prompt"""
+    must_have_skills: List[str] = []
+    nice_to_have_skills: List[str] = []
+    min_experience: int = 0
+    summary: str = ""
+
+    _lists = field_validator("must_have_skills", "nice_to_have_skills", mode="before")(_as_list)
+    _years = field_validator("min_experience", mode="before")(_as_int)
+
+    @field_validator("summary", mode="before")
+    @classmethod
+    def _summary(cls, value) -> str:
+        return str(value or "")
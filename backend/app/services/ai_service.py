@@ -5,7 +5,8 @@ from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 from app.config.settings import settings
 from app.config.logging_config import logger
-import json
+from app.schemas.llm import JobRequirements
+from app.services.structured_output import generate
 
 class AIService:
     def __init__(self):
@@ -30,7 +31,7 @@ class AIService:
                 "summary": "..."
             }
         """
-        logger.info(f"Extracting requirements from JD (length: {len(job_description)} chars)")
+        logger.info("Extracting requirements from JD (length: %s chars)", len(job_description))
         
         prompt = ChatPromptTemplate.from_template("""
         Analyze this job description and extract structured requirements.
@@ -50,30 +51,23 @@ class AIService:
         """)
         
         try:
-            response = await self.llm.ainvoke(
-                prompt.format(job_description=job_description)
-            )
-            
-            # Parse JSON from response
-            content = response.content.strip()
-            
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content.split("```json")[1].split("```")[0]
-            elif content.startswith("```"):
-                content = content.split("```")[1].split("```")[0]
-            
-            requirements = json.loads(content)
+            requirements = (await generate(
+                self.llm,
+                prompt.format(job_description=job_description),
+                JobRequirements,
+                "Requirement extraction"
+            )).model_dump()
             
             logger.info(
-                f"Extracted {len(requirements.get('must_have_skills', []))} must-have, "
-                f"{len(requirements.get('nice_to_have_skills', []))} nice-to-have skills"
+                "Extracted %s must-have, %s nice-to-have skills",
+                len(requirements.get('must_have_skills', [])),
+                len(requirements.get('nice_to_have_skills', []))
             )
             
             return requirements
             
         except Exception as e:
-            logger.error(f"Failed to extract requirements: {str(e)}")
+            logger.error("Failed to extract requirements: %s", e)
             raise
 
 ai_service = AIService()
@@ -0,0 +1,177 @@
+"""
+Duplicate candidate detection
+
+Every candidates row stores its resume fingerprint (app.utils.fingerprints)
+and, when it duplicates an earlier upload of the same person, the ID of the
+canonical row (`canonical_candidate_id`; NULL means the row is canonical).
+A single tenant-scoped query finds possible matches by content hash,
+SimHash band or normalized email/phone; they are then ranked:
+
+- "exact": same normalized text
+- "near": SimHash within DEDUP_SIMHASH_MAX_DISTANCE bits
+- "contact": same email or phone, different resume version
+
+Exact and near matches reuse the earlier row's parsed_data instead of
+calling the LLM parser again.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from postgrest import AsyncPostgrestClient
+from app.config.settings import settings
+from app.services.facet_index import facet_index
+from app.utils.fingerprints import ResumeFingerprint, SIMHASH_BANDS, hamming_distance, to_signed64
+import logging
+
+logger = logging.getLogger(__name__)
+
+MATCH_KINDS = ("exact", "near", "contact")
+
+_MATCH_COLUMNS = (
+    "id, job_posting_id, canonical_candidate_id, content_hash, simhash, "
+    "email_normalized, phone_normalized, parsed_data"
+)
+_MAX_MATCH_ROWS = 50
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    kind: str
+    candidate: Dict
+
+    @property
+    def canonical_id(self) -> int:
+        return self.candidate.get("canonical_candidate_id") or self.candidate["id"]
+
+    @property
+    def same_content(self) -> bool:
+        return self.kind in ("exact", "near")
+
+
+def _quoted(value: str) -> str:
+    """PostgREST filter value, quoted so '.', ',' and '@' are taken literally"""
+    return '"' + value.replace('"', '') + '"'
+
+
+class DedupService:
+    """Finds earlier uploads of the same person within a tenant"""
+
+    def _classify(self, fingerprint: ResumeFingerprint, row: Dict) -> Optional[str]:
+        if row.get("content_hash") == fingerprint.content_hash:
+            return "exact"
+        if row.get("simhash") is not None and hamming_distance(
+            row["simhash"], to_signed64(fingerprint.simhash)
+        ) <= min(settings.DEDUP_SIMHASH_MAX_DISTANCE, SIMHASH_BANDS - 1):
+            return "near"
+        if fingerprint.email and row.get("email_normalized") == fingerprint.email:
+            return "contact"
+        if fingerprint.phone and row.get("phone_normalized") == fingerprint.phone:
+            return "contact"
+        # Shared band but too far apart
+        return None
+
+    async def find_duplicate(
+        self,
+        db: AsyncPostgrestClient,
+        tenant_id: int,
+        fingerprint: ResumeFingerprint,
+        job_posting_id: int | None = None,
+        before_id: int | None = None
+    ) -> Optional[DuplicateMatch]:
+        """
+        Best earlier match for a fingerprint
+
+        Args:
+            job_posting_id: Prefer matches uploaded to this job
+            before_id: Only consider rows with a lower ID (backfills)
+
+        Returns:
+            The strongest match (exact > near > contact, then same job,
+            then oldest), or None
+        """
+        if not settings.DEDUP_ENABLED:
+            return None
+
+        conditions = [
+            f"content_hash.eq.{fingerprint.content_hash}",
+            f"simhash_bands.ov.{{{','.join(str(band) for band in fingerprint.simhash_bands)}}}"
+        ]
+        if fingerprint.email:
+            conditions.append(f"email_normalized.eq.{_quoted(fingerprint.email)}")
+        if fingerprint.phone:
+            conditions.append(f"phone_normalized.eq.{fingerprint.phone}")
+
+        query = db.table("candidates")\
+            .select(_MATCH_COLUMNS)\
+            .eq("tenant_id", tenant_id)\
+            .or_(",".join(conditions))
+        if before_id is not None:
+            query = query.lt("id", before_id)
+
+        try:
+            result = await query.order("id").limit(_MAX_MATCH_ROWS).execute()
+        except Exception as e:
+            # Dedup is an optimization; never block an upload on it
+            logger.warning("⚠️ Duplicate lookup failed: %s", e)
+            return None
+
+        matches = []
+        for row in result.data:
+            kind = self._classify(fingerprint, row)
+            if kind:
+                other_job = job_posting_id is None or str(row["job_posting_id"]) != str(job_posting_id)
+                matches.append(((MATCH_KINDS.index(kind), other_job, row["id"]), DuplicateMatch(kind, row)))
+        return min(matches, key=lambda match: match[0])[1] if matches else None
+
+    async def release(self, db: AsyncPostgrestClient, tenant_id: int, candidate_id: int) -> None:
+        """
+        Re-link duplicates of a deleted canonical row to the oldest remaining one
+        """
+        result = await db.table("candidates")\
+            .select("id")\
+            .eq("tenant_id", tenant_id)\
+            .eq("canonical_candidate_id", candidate_id)\
+            .order("id")\
+            .execute()
+        if not result.data:
+            return
+
+        new_canonical = result.data[0]["id"]
+        await db.table("candidates")\
+            .update({"canonical_candidate_id": None})\
+            .eq("id", new_canonical)\
+            .execute()
+        if len(result.data) > 1:
+            await db.table("candidates")\
+                .update({"canonical_candidate_id": new_canonical})\
+                .eq("tenant_id", tenant_id)\
+                .eq("canonical_candidate_id", candidate_id)\
+                .execute()
+        for row in result.data:
+            facet_index.update(tenant_id, row["id"], {
+                "canonical_candidate_id": None if row["id"] == new_canonical else new_canonical
+            })
+        logger.info("Candidate %s is now canonical for %s duplicates", new_canonical, len(result.data) - 1)
+
+    def group(self, results: List[Dict]) -> List[Tuple[Dict, List[Dict]]]:
+        """Ranked rows grouped per person: (best-ranked row, the person's other rows)"""
+        groups: Dict[int, Tuple[Dict, List[Dict]]] = {}
+        for row in results:
+            person = row.get("canonical_candidate_id") or row["id"]
+            if person in groups:
+                groups[person][1].append(row)
+            else:
+                groups[person] = (row, [])
+        return list(groups.values())
+
+    def application(self, row: Dict) -> Dict:
+        """Entry of `other_applications` for a duplicate upload"""
+        return {
+            "candidate_id": row["id"],
+            "job_posting_id": row.get("job_posting_id"),
+            "job_title": row.get("job_title"),
+            "match_score": row.get("match_score"),
+            "status": row.get("status")
+        }
+
+# Singleton instance
+dedup_service = DedupService()
@@ -0,0 +1,217 @@
+"""
+Inference backends for EmbeddingService
+
+- "torch": SentenceTransformer in PyTorch eager mode (reference)
+- "onnx": the model's ONNX export on ONNX Runtime
+- "onnx-int8": the same export with weights dynamically quantized to int8
+
+Every backend returns unit-length float32 vectors from mean pooling, so
+they are interchangeable for search. The ONNX backends tokenize with the
+model's fast tokenizer, group texts of similar length and pad each group
+only up to its length bucket, which removes most padding compute.
+"""
+import hashlib
+import os
+from typing import List
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Probe sentences for the parity check against the torch model
+PARITY_PROBES = (
+    "Senior Python developer with 6 years of AWS and Django experience",
+    "SKILLS\nReact, TypeScript, GraphQL, Node.js, PostgreSQL",
+    "Registered nurse, ICU, patient care, BLS and ACLS certified",
+    "EXPERIENCE\nData Engineer - Acme Corp (2019-2024)\n- Built Spark pipelines processing 2TB/day",
+    "Looking for a backend engineer who knows Kubernetes",
+)
+
+
+class TorchBackend:
+    """SentenceTransformer on PyTorch"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str, batch_size: int, threads: int = 0):
+        from sentence_transformers import SentenceTransformer
+        if threads > 0:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name)
+        self.batch_size = batch_size
+
+    @property
+    def max_seq_length(self) -> int:
+        return self.model.max_seq_length
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.model.tokenizer.encode(text, add_special_tokens=False))
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+
+
+class OnnxBackend:
+    """
+    ONNX Runtime inference with length bucketing
+
+    Texts are tokenized once, sorted by length and batched; each batch is
+    padded to the next multiple of `bucket_size` rather than to
+    max_seq_length, which also keeps the set of input shapes small.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool,
+        threads: int,
+        batch_size: int,
+        max_seq_length: int,
+        bucket_size: int,
+        cache_dir: str
+    ):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.batch_size = batch_size
+        self.max_seq_length = max_seq_length
+        self.bucket_size = max(bucket_size, 1)
+
+        model_path = hf_hub_download(model_name, "onnx/model.onnx", cache_dir=cache_dir or None)
+        if quantize:
+            model_path = self._quantized(model_name, model_path, cache_dir)
+
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(model_name, "tokenizer.json", cache_dir=cache_dir or None))
+        self.tokenizer.no_truncation()
+        self.tokenizer.no_padding()
+        self.sep_id = self.tokenizer.token_to_id("[SEP]")
+        self.pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    @staticmethod
+    def quantized_path(model_name: str, model_path: str, cache_dir: str) -> str:
+        """
+        Where the int8 copy of a model export is cached
+
+        The file is named after the model and the export it was made from
+        (the Hugging Face cache links each revision to a content-addressed
+        blob), so several models, or revisions of one, can share a cache dir.
+        """
+        source = hashlib.sha1(os.path.realpath(model_path).encode()).hexdigest()[:12]
+        return os.path.join(
+            cache_dir or os.path.dirname(model_path),
+            "int8",
+            f"{model_name.replace('/', '--')}-{source}.onnx"
+        )
+
+    @staticmethod
+    def _quantized(model_name: str, model_path: str, cache_dir: str) -> str:
+        """Dynamically quantize weights to int8 once and cache the result"""
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        target = OnnxBackend.quantized_path(model_name, model_path, cache_dir)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            logger.info("Quantizing %s to int8", model_name)
+            # Written aside and renamed, so another worker never loads a partial file
+            partial = f"{target}.{os.getpid()}.partial"
+            quantize_dynamic(model_path, partial, weight_type=QuantType.QInt8)
+            os.replace(partial, target)
+        return target
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def _token_ids(self, texts: List[str]) -> List[List[int]]:
+        limit = self.max_seq_length
+        ids = []
+        for encoding in self.tokenizer.encode_batch(list(texts)):
+            token_ids = encoding.ids
+            if len(token_ids) > limit:
+                token_ids = token_ids[:limit - 1] + [self.sep_id]
+            ids.append(token_ids)
+        return ids
+
+    def _run(self, batch: List[List[int]]) -> np.ndarray:
+        longest = max(len(token_ids) for token_ids in batch)
+        width = min(-(-longest // self.bucket_size) * self.bucket_size, self.max_seq_length)
+
+        input_ids = np.full((len(batch), width), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(batch), width), dtype=np.int64)
+        for row, token_ids in enumerate(batch):
+            input_ids[row, :len(token_ids)] = token_ids
+            attention_mask[row, :len(token_ids)] = 1
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalization
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        token_ids = self._token_ids(texts)
+        order = sorted(range(len(token_ids)), key=lambda i: len(token_ids[i]))
+        output = None
+        for start in range(0, len(order), self.batch_size):
+            positions = order[start:start + self.batch_size]
+            vectors = self._run([token_ids[i] for i in positions])
+            if output is None:
+                output = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            output[positions] = vectors
+        return output if output is not None else np.empty((0, 0), dtype=np.float32)
+
+
+def parity(candidate, reference, probes=PARITY_PROBES) -> float:
+    """Lowest cosine similarity between two backends' vectors on `probes`"""
+    left = candidate.encode(list(probes))
+    right = reference.encode(list(probes))
+    return float(np.min(np.sum(left * right, axis=1)))
+
+
+def create_backend(
+    name: str,
+    model_name: str,
+    threads: int,
+    batch_size: int,
+    max_seq_length: int,
+    bucket_size: int,
+    cache_dir: str
+):
+    """Instantiate a backend by name (see BACKENDS)"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name}")
+    if name == "torch":
+        return TorchBackend(model_name, batch_size, threads)
+    return OnnxBackend(
+        model_name,
+        quantize=name == "onnx-int8",
+        threads=threads,
+        batch_size=batch_size,
+        max_seq_length=max_seq_length,
+        bucket_size=bucket_size,
+        cache_dir=cache_dir
+    )
+
@@ -0,0 +1,117 @@
+"""
+Embedding model versions and the serving version
+
+Every embedding model gets a version tag and its own vector namespace, so
+vectors from different models never mix. The version used for uploads and
+searches ("serving") is the newest `active` row in `embedding_migrations`,
+falling back to EMBEDDING_MODEL_VERSION. The re-embedding job
+(app.tasks.reembed) fills a new namespace in the background and flips the
+serving version once every candidate is covered.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+from postgrest import AsyncPostgrestClient
+from app.config.settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    version: str
+    model_name: str
+    dimension: int
+    # Pinecone namespace / local partition; "" is the default namespace,
+    # where vectors written before versioning live
+    namespace: str
+
+
+EMBEDDING_MODELS: Dict[str, ModelSpec] = {
+    spec.version: spec for spec in (
+        ModelSpec("minilm-l6-v2", "sentence-transformers/all-MiniLM-L6-v2", 384, ""),
+        ModelSpec("minilm-l12-v2", "sentence-transformers/all-MiniLM-L12-v2", 384, "minilm-l12-v2"),
+        ModelSpec("mpnet-base-v2", "sentence-transformers/all-mpnet-base-v2", 768, "mpnet-base-v2"),
+    )
+}
+
+
+def get_model_spec(version: str) -> ModelSpec:
+    """Spec for a known model version"""
+    try:
+        return EMBEDDING_MODELS[version]
+    except KeyError:
+        raise ValueError(
+            f"Unknown embedding model version '{version}'. "
+            f"Known versions: {', '.join(EMBEDDING_MODELS)}"
+        ) from None
+
+
+def default_model_spec() -> ModelSpec:
+    return get_model_spec(settings.EMBEDDING_MODEL_VERSION)
+
+
+class ServingModel:
+    """
+    Process-wide view of which model versions are serving / being built
+
+    Read from the database at most every EMBEDDING_SERVING_CACHE_SECONDS so
+    every worker picks up a switch-over shortly after the job makes it.
+    """
+
+    def __init__(self):
+        self._active: ModelSpec | None = None
+        self._building: List[ModelSpec] = []
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self, db: AsyncPostgrestClient) -> None:
+        try:
+            result = await db.table("embedding_migrations")\
+                .select("model_version, status")\
+                .in_("status", ["active", "running", "paused", "failed"])\
+                .order("completed_at", desc=True)\
+                .execute()
+            rows = result.data
+        except Exception as e:
+            logger.warning("⚠️ Could not read embedding_migrations, using default model: %s", e)
+            rows = []
+
+        active = next((row for row in rows if row["status"] == "active"), None)
+        self._active = default_model_spec()
+        if active:
+            try:
+                self._active = get_model_spec(active["model_version"])
+            except ValueError as e:
+                # e.g. switched over by a newer deploy; its namespace is still there for that build
+                logger.warning("⚠️ Serving %s instead of the active model: %s", self._active.version, e)
+        self._building = [
+            get_model_spec(row["model_version"]) for row in rows
+            if row["status"] in ("running", "paused", "failed") and row["model_version"] in EMBEDDING_MODELS
+        ]
+        self._loaded_at = time.monotonic()
+
+    async def _ensure(self, db: AsyncPostgrestClient) -> None:
+        if self._active is not None and time.monotonic() - self._loaded_at < settings.EMBEDDING_SERVING_CACHE_SECONDS:
+            return
+        async with self._lock:
+            if self._active is None or time.monotonic() - self._loaded_at >= settings.EMBEDDING_SERVING_CACHE_SECONDS:
+                await self._refresh(db)
+
+    async def get(self, db: AsyncPostgrestClient) -> ModelSpec:
+        """The model version uploads and searches should use"""
+        await self._ensure(db)
+        return self._active
+
+    async def live(self, db: AsyncPostgrestClient) -> List[ModelSpec]:
+        """Serving plus in-progress versions (deletes must reach all of them)"""
+        await self._ensure(db)
+        return [self._active] + [spec for spec in self._building if spec != self._active]
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+
+# Singleton instance
+serving_model = ServingModel()
@@ -1,56 +1,155 @@
 """
 Embedding service for generating vector embeddings from text
+
+Models are identified by ModelSpec (see embedding_models); every method
+takes an optional `model` and defaults to EMBEDDING_MODEL_VERSION. Each
+model's inference backend (PyTorch, ONNX Runtime or int8-quantized ONNX) is
+chosen with EMBEDDING_BACKEND and loaded on first use. A non-torch backend
+is checked against the reference model once at load time when PyTorch is
+available; if its vectors drift below EMBEDDING_PARITY_MIN_COSINE, or it
+can't be loaded at all, the service falls back to torch.
 """
-from sentence_transformers import SentenceTransformer
-from typing import List
+import threading
+from typing import Dict, List, Tuple
+import numpy as np
+from app.config.settings import settings
+from app.services.embedding_backends import create_backend, parity
+from app.services.embedding_models import ModelSpec, default_model_spec
+from app.services.text_preparation import chunk_sections
 import logging
 
 logger = logging.getLogger(__name__)
 
 class EmbeddingService:
     def __init__(self):
-        """Initialize embedding model"""
+        """Configure embedding backends (each model is loaded lazily)"""
+        self._backends: Dict[str, object] = {}
+        self._lock = threading.Lock()
+    
+    def _create(self, name: str, model: ModelSpec):
+        return create_backend(
+            name,
+            model_name=model.model_name,
+            threads=settings.EMBEDDING_THREADS,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_seq_length=settings.EMBEDDING_MAX_SEQ_LENGTH,
+            bucket_size=settings.EMBEDDING_LENGTH_BUCKET,
+            cache_dir=settings.EMBEDDING_CACHE_DIR
+        )
+    
+    def _load_backend(self, model: ModelSpec):
+        name = settings.EMBEDDING_BACKEND
+        if name == "torch":
+            return self._create("torch", model)
+        
         try:
-            # Load all-MiniLM-L6-v2 model (384 dimensions)
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("✅ Embedding model loaded successfully")
+            backend = self._create(name, model)
         except Exception as e:
-            logger.error(f"❌ Failed to load embedding model: {e}")
-            raise
+            logger.error("❌ Failed to load %s embedding backend, falling back to torch: %s", name, e)
+            return self._create("torch", model)
+        
+        if settings.EMBEDDING_VERIFY_BACKEND:
+            try:
+                reference = self._create("torch", model)
+            except ImportError:
+                logger.warning("⚠️ PyTorch not installed, skipping %s parity check", name)
+                reference = None
+            if reference is not None:
+                min_cosine = parity(backend, reference)
+                if min_cosine < settings.EMBEDDING_PARITY_MIN_COSINE:
+                    logger.error(
+                        "❌ %s embeddings differ from torch (min cosine %.4f < %.4f), using torch",
+                        name, min_cosine, settings.EMBEDDING_PARITY_MIN_COSINE
+                    )
+                    return reference
+                logger.info("✅ %s embeddings match torch (min cosine %.4f)", name, min_cosine)
+        return backend
+    
+    def _load(self, model: ModelSpec):
+        backend = self._load_backend(model)
+        dimension = backend.encode(["dimension check"]).shape[1]
+        if dimension != model.dimension:
+            raise ValueError(
+                f"Model {model.version} produces {dimension}-dim vectors, spec says {model.dimension}"
+            )
+        logger.info("✅ Embedding model %s loaded successfully (%s)", model.version, getattr(backend, "name", "torch"))
+        return backend
+    
+    def backend(self, model: ModelSpec | None = None):
+        """The loaded inference backend for a model version"""
+        model = model or default_model_spec()
+        backend = self._backends.get(model.version)
+        if backend is None:
+            with self._lock:
+                if model.version not in self._backends:
+                    try:
+                        self._backends[model.version] = self._load(model)
+                    except Exception as e:
+                        logger.error("❌ Failed to load embedding model: %s", e)
+                        raise
+                backend = self._backends[model.version]
+        return backend
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def warm_up(self, model: ModelSpec | None = None) -> None:
+        """Load a model ahead of the first request"""
+        self.encode(["warm up"], model)
+    
+    def encode(self, texts: List[str], model: ModelSpec | None = None) -> np.ndarray:
         """
-        Generate 384-dimensional embedding for text
+        Encode texts to a float32 matrix of unit-length vectors
+        
+        Stays a NumPy buffer so vector stores can quantize or ship it
+        without a Python-list round-trip.
         
-        Args:
-            text: Input text (resume, query, etc.)
-            
         Returns:
-            List of 384 floats representing the embedding
+            float32 array of shape [len(texts), dimension]
         """
         try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
-            return embedding.tolist()
+            return np.ascontiguousarray(self.backend(model).encode(list(texts)), dtype=np.float32)
         except Exception as e:
-            logger.error(f"❌ Embedding generation failed: {e}")
+            logger.error("❌ Embedding generation failed: %s", e)
             raise
     
-    def generate_batch_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def encode_query(self, text: str, model: ModelSpec | None = None) -> np.ndarray:
+        """float32 vector for a search query"""
+        return self.encode([text], model)[0]
+    
+    def max_tokens(self, model: ModelSpec | None = None) -> int:
+        """Tokens the model actually reads (excluding [CLS]/[SEP])"""
+        return self.backend(model).max_seq_length - 2
+    
+    def count_tokens(self, text: str, model: ModelSpec | None = None) -> int:
+        """Count tokens with the model's own tokenizer"""
+        return self.backend(model).count_tokens(text)
+    
+    def generate_resume_chunk_embeddings(
+        self,
+        resume_text: str,
+        model: ModelSpec | None = None
+    ) -> Tuple[List[str], np.ndarray]:
         """
-        Generate embeddings for multiple texts
+        Embed a resume as several section-aware chunks
+        
+        Each chunk fits within the model's sequence length, so the whole
+        resume (up to EMBEDDING_MAX_CHUNKS chunks) contributes to search.
         
         Args:
-            texts: List of input texts
+            resume_text: Full extracted resume text
+            model: Embedding model version (default: configured model)
             
         Returns:
-            List of embeddings
+            (chunks, float32 embedding matrix) in the same order
         """
-        try:
-            embeddings = self.model.encode(texts, convert_to_numpy=True)
-            return embeddings.tolist()
-        except Exception as e:
-            logger.error(f"❌ Batch embedding generation failed: {e}")
-            raise
+        backend = self.backend(model)
+        chunks = chunk_sections(
+            resume_text,
+            backend.count_tokens,
+            backend.max_seq_length - 2,
+            settings.EMBEDDING_MAX_CHUNKS
+        )
+        if not chunks:
+            chunks = [resume_text]
+        return chunks, self.encode(chunks, model)
 
 # Singleton instance
 embedding_service = EmbeddingService()
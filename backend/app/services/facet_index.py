@@ -0,0 +1,356 @@
+"""
+Per-tenant facet index over the talent pool
+
+Each of a tenant's candidates gets a dense ordinal, and every facet value
+keeps a posting bitmap (a Python int with one bit per candidate). A filter
+is an AND across facets of the ORs within each facet, and a facet count is
+`(posting & selection).bit_count()`, so narrowing and counting never touch
+the database. Facets:
+- skill: skill IDs (app.services.skill_taxonomy), so "JS" and "JavaScript" are one value
+- location: the parsed location, case- and whitespace-insensitive
+- experience: bands of experience_years (EXPERIENCE_BANDS)
+- recommendation: hire / maybe / reject / pending
+
+Experience years also get a posting per year, so `min_experience` is a
+prefilter like the facets.
+
+A tenant's index is built from the database on its first search, with one
+paged scan of a few small columns. After that it is kept current in
+process: uploads add candidates, deletes remove them (re-linking their
+duplicates) and LLM re-evaluations move their recommendation. It also
+remembers each candidate's canonical_candidate_id, so grouping duplicates
+in search results needs no row reads. Writes made by other workers show up when the
+index is rebuilt in the background after FACET_INDEX_TTL_SECONDS. The stale
+index keeps serving until the rebuild finishes.
+
+Memory is roughly (distinct values x candidates) / 8 bytes per tenant. At
+most FACET_INDEX_MAX_TENANTS indexes are kept, evicting the least recently
+used first.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from postgrest import AsyncPostgrestClient
+from app.config.settings import settings
+from app.services.skill_taxonomy import skill_taxonomy
+import logging
+
+logger = logging.getLogger(__name__)
+
+FACETS = ("skill", "location", "experience", "recommendation")
+
+# (label, lowest year, highest year or None)
+EXPERIENCE_BANDS = (("0-2", 0, 2), ("3-5", 3, 5), ("6-10", 6, 10), ("11+", 11, None))
+
+# parsed_data is large; the JSON path reads only the skills (labels of skills outside the dictionary)
+_INDEX_COLUMNS = (
+    "id, skill_ids, skills:parsed_data->skills, location, experience_years, recommendation, canonical_candidate_id"
+)
+
+
+def experience_band(years: Optional[int]) -> str:
+    years = years or 0
+    for band, _, highest in EXPERIENCE_BANDS:
+        if highest is None or years <= highest:
+            return band
+
+
+def normalize_value(facet: str, value) -> str:
+    """Posting key of a facet value; labels and keys both normalize to the key"""
+    if facet == "skill":
+        return skill_taxonomy.canonical(str(value))
+    return " ".join(str(value).lower().split())
+
+
+def parse_filters(raw: Optional[Dict]) -> Dict[str, Tuple[str, ...]]:
+    """
+    Validate and normalize a request's facet filters
+
+    Args:
+        raw: {facet: value or [values]}, e.g. {"skill": ["Python", "AWS"], "experience": "3-5"}
+
+    Returns:
+        {facet: sorted normalized values}, empty facets dropped
+
+    Raises:
+        ValueError: Unknown facet or malformed values
+    """
+    if not raw:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError("filters must be an object of facet: [values]")
+
+    filters = {}
+    for facet, values in raw.items():
+        if facet not in FACETS:
+            raise ValueError(f"Unknown facet '{facet}', expected one of {', '.join(FACETS)}")
+        if isinstance(values, (str, int)):
+            values = [values]
+        if not isinstance(values, list):
+            raise ValueError(f"Values of facet '{facet}' must be a list")
+        keys = {normalize_value(facet, value) for value in values if str(value).strip()}
+        if keys:
+            filters[facet] = tuple(sorted(keys))
+    return filters
+
+
+def _listed_skills(row: Dict) -> List:
+    """parsed_data.skills of a full row or of an index scan row"""
+    return (row["skills"] if "skills" in row else (row.get("parsed_data") or {}).get("skills")) or []
+
+
+def _facet_values(row: Dict) -> Iterable[Tuple[str, str, str]]:
+    """(facet, key, label) of a candidates row"""
+    listed = {}
+    for skill in _listed_skills(row):
+        if isinstance(skill, str) and skill_taxonomy.canonical(skill):
+            listed.setdefault(skill_taxonomy.canonical(skill), skill.strip())
+    # Rows ingested before skill IDs were stored: the listed skills only
+    skill_ids = row.get("skill_ids")
+    for skill_id in listed if skill_ids is None else skill_ids:
+        label = skill_taxonomy.label(skill_id) if skill_taxonomy.known(skill_id) else listed.get(skill_id, skill_id)
+        yield "skill", skill_id, label
+    location = (row.get("location") or "").strip()
+    if location:
+        yield "location", normalize_value("location", location), location
+    band = experience_band(row.get("experience_years"))
+    yield "experience", band, band
+    recommendation = row.get("recommendation") or "pending"
+    yield "recommendation", normalize_value("recommendation", recommendation), recommendation
+
+
+class TenantFacets:
+    """Bitmap postings for one tenant's candidates"""
+
+    def __init__(self):
+        self.built_at = time.monotonic()
+        self.all = 0
+        self._ordinals: Dict[int, int] = {}
+        self._ids: List[int] = []
+        # Candidate ID -> what it was indexed with, to take it out again
+        self._entries: Dict[int, Dict] = {}
+        self._postings: Dict[Tuple[str, str], int] = {}
+        self._labels: Dict[Tuple[str, str], str] = {}
+        self._years: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def fragmented(self) -> bool:
+        """More ordinals of deleted candidates than live ones"""
+        return len(self._ids) > 2 * len(self._entries) + 1024
+
+    def _unindex(self, candidate_id: int) -> None:
+        entry = self._entries.pop(candidate_id, None)
+        if entry is None:
+            return
+        keep = ~(1 << self._ordinals[candidate_id])
+        for key in entry["keys"]:
+            posting = self._postings[key] & keep
+            if posting:
+                self._postings[key] = posting
+            else:
+                del self._postings[key]
+                del self._labels[key]
+        posting = self._years[entry["experience_years"]] & keep
+        if posting:
+            self._years[entry["experience_years"]] = posting
+        else:
+            del self._years[entry["experience_years"]]
+        self.all &= keep
+
+    def add(self, row: Dict) -> None:
+        """Index a candidates row, replacing what it was indexed with before"""
+        candidate_id = row["id"]
+        self._unindex(candidate_id)
+        ordinal = self._ordinals.get(candidate_id)
+        if ordinal is None:
+            ordinal = self._ordinals[candidate_id] = len(self._ids)
+            self._ids.append(candidate_id)
+        bit = 1 << ordinal
+
+        keys = []
+        for facet, key, label in _facet_values(row):
+            self._postings[(facet, key)] = self._postings.get((facet, key), 0) | bit
+            self._labels.setdefault((facet, key), label)
+            keys.append((facet, key))
+        years = row.get("experience_years") or 0
+        self._years[years] = self._years.get(years, 0) | bit
+        self.all |= bit
+        self._entries[candidate_id] = {
+            "keys": keys,
+            "skills": _listed_skills(row),
+            "skill_ids": row.get("skill_ids"),
+            "location": row.get("location"),
+            "experience_years": years,
+            "recommendation": row.get("recommendation"),
+            "canonical_candidate_id": row.get("canonical_candidate_id")
+        }
+
+    def update(self, candidate_id: int, changes: Dict) -> None:
+        """Re-index an indexed candidate with some columns changed"""
+        entry = self._entries.get(candidate_id)
+        if entry is not None:
+            self.add({**entry, **changes, "id": candidate_id})
+
+    def remove(self, candidate_id: int) -> None:
+        # The ordinal stays reserved until the next rebuild
+        self._unindex(candidate_id)
+
+    def canonical(self, candidate_id: int) -> Optional[int]:
+        """canonical_candidate_id of an indexed candidate, for duplicate grouping"""
+        entry = self._entries.get(candidate_id)
+        return entry["canonical_candidate_id"] if entry else None
+
+    def select(self, filters: Dict[str, Tuple[str, ...]], min_experience: int = 0) -> int:
+        """Bitmap of the candidates matching every facet filter"""
+        selection = self.all
+        for facet, keys in filters.items():
+            union = 0
+            for key in keys:
+                union |= self._postings.get((facet, key), 0)
+            selection &= union
+        if min_experience > 0:
+            union = 0
+            for years, posting in self._years.items():
+                if years >= min_experience:
+                    union |= posting
+            selection &= union
+        return selection
+
+    def contains(self, selection: int, candidate_id: int) -> bool:
+        ordinal = self._ordinals.get(candidate_id)
+        return ordinal is not None and bool(selection >> ordinal & 1)
+
+    def bitmap(self, candidate_ids: Iterable[int]) -> int:
+        selection = 0
+        for candidate_id in candidate_ids:
+            ordinal = self._ordinals.get(candidate_id)
+            if ordinal is not None:
+                selection |= 1 << ordinal
+        return selection
+
+    def candidate_ids(self, selection: int) -> List[int]:
+        if not selection:
+            return []
+        bits = np.unpackbits(
+            np.frombuffer(selection.to_bytes((selection.bit_length() + 7) // 8, "little"), dtype=np.uint8),
+            bitorder="little"
+        )
+        return [self._ids[ordinal] for ordinal in np.flatnonzero(bits)]
+
+    def counts(self, selection: int, limit: int) -> Dict[str, List[Dict]]:
+        """
+        Facet value counts within a selection
+
+        Returns:
+            {facet: [{"value", "label", "count"}]}, most frequent first
+            (experience in band order), at most `limit` values per facet
+        """
+        counts: Dict[str, List[Dict]] = {facet: [] for facet in FACETS}
+        for (facet, key), posting in self._postings.items():
+            count = (posting & selection).bit_count()
+            if count:
+                counts[facet].append({"value": key, "label": self._labels[(facet, key)], "count": count})
+
+        bands = [band for band, _, _ in EXPERIENCE_BANDS]
+        for facet, values in counts.items():
+            if facet == "experience":
+                values.sort(key=lambda value: bands.index(value["value"]))
+            else:
+                values.sort(key=lambda value: (-value["count"], value["label"].lower()))
+            del values[limit:]
+        return counts
+
+
+class FacetIndex:
+    def __init__(self):
+        self._tenants: "OrderedDict[int, TenantFacets]" = OrderedDict()
+        # Indexes being built, so writes made meanwhile aren't lost
+        self._building: Dict[int, TenantFacets] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._refreshes: Dict[int, asyncio.Task] = {}
+
+    def _expired(self, facets: TenantFacets) -> bool:
+        return time.monotonic() - facets.built_at > settings.FACET_INDEX_TTL_SECONDS or facets.fragmented
+
+    async def _build(self, db: AsyncPostgrestClient, tenant_id: int) -> TenantFacets:
+        facets = self._building[tenant_id] = TenantFacets()
+        started = time.perf_counter()
+        try:
+            last_id = 0
+            while True:
+                result = await db.table("candidates")\
+                    .select(_INDEX_COLUMNS)\
+                    .eq("tenant_id", tenant_id)\
+                    .gt("id", last_id)\
+                    .order("id")\
+                    .limit(settings.FACET_INDEX_PAGE_SIZE)\
+                    .execute()
+                for row in result.data:
+                    facets.add(row)
+                if len(result.data) < settings.FACET_INDEX_PAGE_SIZE:
+                    break
+                last_id = result.data[-1]["id"]
+        finally:
+            self._building.pop(tenant_id, None)
+
+        self._tenants[tenant_id] = facets
+        self._tenants.move_to_end(tenant_id)
+        while len(self._tenants) > settings.FACET_INDEX_MAX_TENANTS:
+            self._tenants.popitem(last=False)
+        logger.info(
+            "Built facet index of tenant %s: %s candidates in %.0fms",
+            tenant_id, len(facets), (time.perf_counter() - started) * 1000
+        )
+        return facets
+
+    async def _refresh(self, db: AsyncPostgrestClient, tenant_id: int) -> None:
+        try:
+            async with self._locks.setdefault(tenant_id, asyncio.Lock()):
+                await self._build(db, tenant_id)
+        except Exception as e:
+            logger.warning("⚠️ Facet index rebuild failed for tenant %s: %s", tenant_id, e)
+        finally:
+            self._refreshes.pop(tenant_id, None)
+
+    async def get(self, db: AsyncPostgrestClient, tenant_id: int) -> TenantFacets:
+        """
+        The tenant's facet index, built on first use
+
+        An expired index is returned as is while a rebuild runs in the background.
+        """
+        facets = self._tenants.get(tenant_id)
+        if facets is None:
+            async with self._locks.setdefault(tenant_id, asyncio.Lock()):
+                facets = self._tenants.get(tenant_id)
+                if facets is None:
+                    facets = await self._build(db, tenant_id)
+        elif self._expired(facets) and tenant_id not in self._refreshes:
+            self._refreshes[tenant_id] = asyncio.create_task(self._refresh(db, tenant_id))
+
+        self._tenants.move_to_end(tenant_id)
+        return facets
+
+    def _targets(self, tenant_id: int) -> List[TenantFacets]:
+        return [facets for facets in (self._tenants.get(tenant_id), self._building.get(tenant_id)) if facets]
+
+    def add(self, tenant_id: int, rows: List[Dict]) -> None:
+        """Index new candidates rows (no-op until the tenant's index is built)"""
+        for facets in self._targets(tenant_id):
+            for row in rows:
+                facets.add(row)
+
+    def update(self, tenant_id: int, candidate_id: int, changes: Dict) -> None:
+        for facets in self._targets(tenant_id):
+            facets.update(candidate_id, changes)
+
+    def remove(self, tenant_id: int, candidate_id: int) -> None:
+        for facets in self._targets(tenant_id):
+            facets.remove(candidate_id)
+
+# Singleton instance
+facet_index = FacetIndex()
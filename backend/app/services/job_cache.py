@@ -0,0 +1,110 @@
+"""
+Per-tenant job posting cache
+
+Job lists and job rows are read on nearly every navigation (and once per
+upload batch) but change rarely. Entries are keyed by the tenant's cache
+version; create/update/delete bump it. Serialized response bodies are cached
+alongside rows so hits skip validation and JSON encoding too.
+"""
+from typing import List
+from pydantic import TypeAdapter
+from postgrest import AsyncPostgrestClient
+from app.config.settings import settings
+from app.schemas.jobs import JobResponse, JobSummaryResponse
+from app.utils.cache import TenantVersionedCache
+
+# Columns a job card shows (JobSummaryResponse); the full row is read per job
+JOB_LIST_COLUMNS = "id, title, description, must_have_skills, min_experience, status, created_at"
+
+_job_list_adapter = TypeAdapter(List[JobSummaryResponse])
+
+
+class JobCache:
+    def __init__(self):
+        self._cache = TenantVersionedCache(
+            max_entries=settings.JOB_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.JOB_CACHE_TTL_SECONDS
+        )
+
+    def etag(self, tenant_id: int) -> str:
+        """Weak ETag for everything job-related the tenant can see"""
+        return f'W/"jobs-{tenant_id}-{self._cache.tag(tenant_id)}"'
+
+    def is_fresh(self, tenant_id: int, key, if_none_match: str | None) -> bool:
+        """
+        True when the client's If-None-Match matches and the entry is still
+        cached in this process (so we know nothing changed since it was served)
+        """
+        if not if_none_match or self._cache.get(tenant_id, key) is None:
+            return False
+        etag = self.etag(tenant_id)
+        return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
+    def invalidate(self, tenant_id: int) -> None:
+        """Call after any write to the tenant's job postings"""
+        self._cache.bump(tenant_id)
+
+    async def list_jobs(self, db: AsyncPostgrestClient, tenant_id: int) -> bytes:
+        """
+        Serialized job list for a tenant (newest first)
+
+        Returns:
+            JSON body matching List[JobSummaryResponse]
+        """
+        body = self._cache.get(tenant_id, "list")
+        if body is not None:
+            return body
+
+        version = self._cache.version(tenant_id)
+        result = await db.table("job_postings")\
+            .select(JOB_LIST_COLUMNS)\
+            .eq("tenant_id", tenant_id)\
+            .order("created_at", desc=True)\
+            .execute()
+
+        preview_chars = settings.JOB_LIST_DESCRIPTION_PREVIEW_CHARS
+        rows = []
+        for row in result.data:
+            description = row.get("description") or ""
+            if len(description) > preview_chars:
+                row = {**row, "description": description[:preview_chars].rstrip() + "…"}
+            rows.append(row)
+
+        body = _job_list_adapter.dump_json(_job_list_adapter.validate_python(rows))
+        self._cache.set(tenant_id, "list", body, version=version)
+        return body
+
+    async def get_job(
+        self,
+        db: AsyncPostgrestClient,
+        tenant_id: int,
+        job_id: int
+    ) -> tuple[dict, bytes] | None:
+        """
+        Full job row plus its serialized JobResponse body
+
+        Returns:
+            (row, body) or None if the job doesn't exist for this tenant
+        """
+        key = ("job", int(job_id))
+        cached = self._cache.get(tenant_id, key)
+        if cached is not None:
+            return cached
+
+        version = self._cache.version(tenant_id)
+        result = await db.table("job_postings")\
+            .select("*")\
+            .eq("id", job_id)\
+            .eq("tenant_id", tenant_id)\
+            .execute()
+
+        if not result.data:
+            return None
+
+        row = result.data[0]
+        body = JobResponse.model_validate(row).model_dump_json().encode("utf-8")
+        self._cache.set(tenant_id, key, (row, body), version=version)
+        return row, body
+
+# Singleton instance
+job_cache = JobCache()
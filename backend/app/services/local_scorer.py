@@ -0,0 +1,154 @@
+"""
+Fast local scoring of the requirement-dependent parts of an evaluation
+
+The LLM rubric gives 40 points for skills and 30 for experience. Both can be
+recomputed without the LLM from the candidate's skill IDs (see
+app.services.skill_taxonomy) and parsed experience, so when a
+job's skills or minimum experience change, each candidate's LLM score is
+shifted by how much these two components change. The relevance and growth
+points the LLM gave are kept as they are.
+"""
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+from app.services.skill_taxonomy import skill_taxonomy
+
+SKILLS_POINTS = 40
+EXPERIENCE_POINTS = 30
+# Share of the skills points for must-haves when nice-to-haves are listed too
+MUST_HAVE_SHARE = 0.75
+
+
+class LocalScorer:
+    """Deterministic skills/experience scoring, microseconds per candidate"""
+
+    def skill_ids(self, candidate: Dict) -> Set[str]:
+        """Stored skill IDs of a candidates row, computed for rows that predate them"""
+        if candidate.get("skill_ids") is not None:
+            return set(candidate["skill_ids"])
+        parsed_data = candidate.get("parsed_data") or {}
+        return set(skill_taxonomy.skill_ids(parsed_data.get("skills"), candidate.get("resume_text") or ""))
+
+    def match_skills(self, required: List[str], skill_ids: Set[str], resume_text: str) -> List[str]:
+        """
+        Required skills the candidate has, compared by skill ID
+
+        Dictionary skills mentioned in the resume are already in `skill_ids`;
+        skills outside the dictionary are also looked for in the text as written.
+        """
+        matched = []
+        for skill in required:
+            skill_id = skill_taxonomy.canonical(skill)
+            if skill_id in skill_ids or not skill_taxonomy.known(skill_id) and re.search(
+                rf"(?<![\w+#]){re.escape(skill.lower())}(?![\w+#])", (resume_text or "").lower()
+            ):
+                matched.append(skill)
+        return matched
+
+    def skill_match(self, skill_ids: Iterable[str], resume_text: str, requirements: Dict) -> Dict:
+        """
+        skills_matched / skills_missing of an evaluation, by skill ID
+
+        Replaces the LLM's free-text lists, so every evaluation names the
+        job's skills the same way.
+        """
+        skill_ids = set(skill_ids)
+        must_have = requirements.get("must_have_skills") or []
+        must_matched = self.match_skills(must_have, skill_ids, resume_text)
+        return {
+            "skills_matched": must_matched + self.match_skills(
+                requirements.get("nice_to_have_skills") or [], skill_ids, resume_text
+            ),
+            "skills_missing": [skill for skill in must_have if skill not in must_matched]
+        }
+
+    def components(
+        self,
+        parsed_data: Dict,
+        resume_text: str,
+        requirements: Dict,
+        skill_ids: Set[str] | None = None
+    ) -> Dict:
+        """
+        Skills (0-40) and experience (0-30) points against one set of requirements
+
+        Args:
+            skill_ids: The candidate's skill IDs (computed from parsed_data and resume_text if omitted)
+
+        Returns:
+            {skills, experience, skills_matched, skills_missing, experience_match}
+        """
+        must_have = requirements.get("must_have_skills") or []
+        nice_to_have = requirements.get("nice_to_have_skills") or []
+        min_experience = requirements.get("min_experience") or 0
+        years = parsed_data.get("experience_years") or 0
+        if skill_ids is None:
+            skill_ids = set(skill_taxonomy.skill_ids(parsed_data.get("skills"), resume_text))
+
+        must_matched = self.match_skills(must_have, skill_ids, resume_text)
+        nice_matched = self.match_skills(nice_to_have, skill_ids, resume_text)
+
+        if must_have and nice_to_have:
+            must_points, nice_points = SKILLS_POINTS * MUST_HAVE_SHARE, SKILLS_POINTS * (1 - MUST_HAVE_SHARE)
+        else:
+            must_points = nice_points = SKILLS_POINTS
+        skills = SKILLS_POINTS
+        if must_have or nice_to_have:
+            skills = (
+                (must_points * len(must_matched) / len(must_have) if must_have else 0)
+                + (nice_points * len(nice_matched) / len(nice_to_have) if nice_to_have else 0)
+            )
+
+        experience = EXPERIENCE_POINTS if min_experience <= 0 else EXPERIENCE_POINTS * min(years / min_experience, 1.0)
+
+        return {
+            "skills": skills,
+            "experience": experience,
+            "skills_matched": must_matched + nice_matched,
+            "skills_missing": [skill for skill in must_have if skill not in must_matched],
+            "experience_match": years >= min_experience
+        }
+
+    def rescore(self, candidate: Dict, old_requirements: Dict, new_requirements: Dict) -> Tuple[Dict, float]:
+        """
+        Shift a candidate's evaluation to new requirements
+
+        Args:
+            candidate: candidates row (parsed_data, resume_text, skill_ids, match_score, ai_evaluation)
+
+        Returns:
+            (column updates, score delta)
+        """
+        parsed_data = candidate.get("parsed_data") or {}
+        resume_text = candidate.get("resume_text") or ""
+        skill_ids = self.skill_ids(candidate)
+        old = self.components(parsed_data, resume_text, old_requirements, skill_ids)
+        new = self.components(parsed_data, resume_text, new_requirements, skill_ids)
+        delta = (new["skills"] - old["skills"]) + (new["experience"] - old["experience"])
+
+        evaluation = dict(candidate.get("ai_evaluation") or {})
+        breakdown = dict(evaluation.get("score_breakdown") or {})
+        if "skills" in breakdown:
+            breakdown["skills"] = round(min(max(breakdown["skills"] + new["skills"] - old["skills"], 0), SKILLS_POINTS))
+        if "experience" in breakdown:
+            breakdown["experience"] = round(min(max(
+                breakdown["experience"] + new["experience"] - old["experience"], 0
+            ), EXPERIENCE_POINTS))
+
+        score = round(min(max((candidate.get("match_score") or 0) + delta, 0), 100))
+        evaluation.update({
+            "overall_score": score,
+            "skills_matched": new["skills_matched"],
+            "skills_missing": new["skills_missing"],
+            "experience_match": new["experience_match"],
+            "score_breakdown": breakdown,
+            "scored_by": "local"
+        })
+        return {
+            "match_score": score,
+            "skills_matched": new["skills_matched"],
+            "skills_missing": new["skills_missing"],
+            "ai_evaluation": evaluation
+        }, delta
+
+# Singleton instance
+local_scorer = LocalScorer()
@@ -2,12 +2,29 @@
 Pinecone service for vector storage and similarity search
 """
 from pinecone import Pinecone, ServerlessSpec
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
+import threading
 from app.config.settings import settings
+from app.services.embedding_models import ModelSpec, default_model_spec
+from app.utils.vectors import (
+    VECTOR_ID_PREFIX,
+    VectorSearchError,
+    candidate_vector_ids,
+    chunk_vector_id,
+    legacy_vector_id,
+    parse_vector_id,
+    rank_candidates
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _as_list(vector) -> List[float]:
+    """Pinecone's wire format is a JSON list; NumPy buffers are converted only here"""
+    return vector.tolist() if hasattr(vector, "tolist") else vector
+
+
 class PineconeService:
     def __init__(self):
         """Initialize Pinecone client and index"""
@@ -20,43 +37,60 @@ class PineconeService:
             self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
             self.index_name = settings.PINECONE_INDEX_NAME
             self.enabled = True
+            self._lock = threading.Lock()
             
-            # Check if index exists, create if not
-            existing_indexes = self.pc.list_indexes().names()
-            
-            if self.index_name not in existing_indexes:
-                logger.info(f"Creating Pinecone index: {self.index_name}")
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=384,  # all-MiniLM-L6-v2 dimension
-                    metric="cosine",
-                    spec=ServerlessSpec(
-                        cloud="aws",
-                        region=settings.PINECONE_ENVIRONMENT
-                    )
-                )
-                logger.info(f"✅ Pinecone index '{self.index_name}' created")
-            
-            self.index = self.pc.Index(self.index_name)
-            logger.info(f"✅ Connected to Pinecone index: {self.index_name}")
+            # An index has a fixed dimension; models of another dimension
+            # get a sibling index, and each model version its own namespace
+            self.index = self._open_index(self.index_name, default_model_spec().dimension)
+            dimension = self.pc.describe_index(self.index_name).dimension
+            self._indexes = {dimension: self.index}
+            logger.info("✅ Connected to Pinecone index: %s", self.index_name)
             
         except Exception as e:
-            logger.error(f"❌ Pinecone initialization failed: {e}")
+            logger.error("❌ Pinecone initialization failed: %s", e)
             self.enabled = False
     
-    def upsert_resume(
+    def _open_index(self, name: str, dimension: int):
+        """Connect to an index, creating it if needed"""
+        if name not in self.pc.list_indexes().names():
+            logger.info("Creating Pinecone index: %s (%s dims)", name, dimension)
+            self.pc.create_index(
+                name=name,
+                dimension=dimension,
+                metric="cosine",
+                spec=ServerlessSpec(
+                    cloud="aws",
+                    region=settings.PINECONE_ENVIRONMENT
+                )
+            )
+            logger.info("✅ Pinecone index '%s' created", name)
+        return self.pc.Index(name)
+    
+    def _index_for(self, model: ModelSpec):
+        index = self._indexes.get(model.dimension)
+        if index is None:
+            with self._lock:
+                if model.dimension not in self._indexes:
+                    name = f"{self.index_name}-{model.dimension}d"
+                    self._indexes[model.dimension] = self._open_index(name, model.dimension)
+                index = self._indexes[model.dimension]
+        return index
+    
+    def upsert_resume_chunks(
         self,
         candidate_id: int,
-        embedding: List[float],
-        metadata: Dict
+        embeddings: List[List[float]],
+        metadata: Dict,
+        model: ModelSpec | None = None
     ) -> bool:
         """
-        Store resume embedding in Pinecone
+        Store one vector per resume chunk, grouped under the candidate
         
         Args:
             candidate_id: Unique candidate ID
-            embedding: 384-dim vector
-            metadata: {tenant_id, job_id, name, skills, etc.}
+            embeddings: One vector per chunk, in chunk order
+            metadata: {tenant_id, job_id, name, skills, etc.} copied to every chunk
+            model: Embedding model that produced the vectors (default: configured model)
             
         Returns:
             True if successful, False otherwise
@@ -65,108 +99,156 @@ class PineconeService:
             logger.warning("Pinecone not enabled, skipping upsert")
             return False
         
+        model = model or default_model_spec()
         try:
-            vector_id = f"candidate_{candidate_id}"
-            
-            self.index.upsert(
-                vectors=[{
-                    "id": vector_id,
-                    "values": embedding,
-                    "metadata": metadata
-                }]
+            self._index_for(model).upsert(
+                namespace=model.namespace,
+                vectors=[
+                    {
+                        "id": chunk_vector_id(candidate_id, chunk),
+                        "values": _as_list(embedding),
+                        "metadata": {**metadata, "candidate_id": candidate_id, "chunk": chunk}
+                    }
+                    for chunk, embedding in enumerate(embeddings)
+                ]
             )
             
-            logger.info(f"✅ Upserted candidate {candidate_id} to Pinecone")
+            logger.info("✅ Upserted %s chunks for candidate %s to Pinecone", len(embeddings), candidate_id)
             return True
             
         except Exception as e:
-            logger.error(f"❌ Pinecone upsert failed for candidate {candidate_id}: {e}")
+            logger.error("❌ Pinecone upsert failed for candidate %s: %s", candidate_id, e)
             return False
     
-    def search_similar(
-        self,
-        query_embedding: List[float],
-        top_k: int = 20,
-        filter_dict: Optional[Dict] = None
-    ) -> List[Dict]:
-        """
-        Search for similar resumes
-        
-        Args:
-            query_embedding: Query vector
-            top_k: Number of results
-            filter_dict: Metadata filters (e.g., {"tenant_id": 1})
-            
-        Returns:
-            List of {candidate_id, similarity_score, metadata}
-        """
+    def delete_resume(self, candidate_id: int, model: ModelSpec | None = None) -> bool:
+        """Delete a resume's legacy vector and all of its chunk vectors"""
+        return self.delete_resumes([candidate_id], model)
+    
+    def delete_resumes(self, candidate_ids: Iterable[int], model: ModelSpec | None = None) -> bool:
+        """Delete every vector of several candidates, batched per request"""
         if not self.enabled:
-            logger.warning("Pinecone not enabled, returning empty results")
-            return []
+            return False
         
+        model = model or default_model_spec()
+        candidate_ids = list(candidate_ids)
         try:
-            results = self.index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                filter=filter_dict,
-                include_metadata=True
-            )
-            
-            matches = []
-            for match in results.get("matches", []):
-                candidate_id = int(match["id"].replace("candidate_", ""))
-                matches.append({
-                    "candidate_id": candidate_id,
-                    "similarity_score": match["score"],
-                    "metadata": match.get("metadata", {})
-                })
-            
-            logger.info(f"✅ Found {len(matches)} similar candidates")
-            return matches
-            
+            # Deleting IDs that don't exist is a no-op, so cover every possible chunk
+            per_request = max(1, 1000 // (settings.EMBEDDING_MAX_CHUNKS + 1))
+            index = self._index_for(model)
+            for start in range(0, len(candidate_ids), per_request):
+                vector_ids = [
+                    vector_id
+                    for candidate_id in candidate_ids[start:start + per_request]
+                    for vector_id in candidate_vector_ids(candidate_id, settings.EMBEDDING_MAX_CHUNKS)
+                ]
+                index.delete(ids=vector_ids, namespace=model.namespace)
+            logger.info("✅ Deleted %s candidates from Pinecone", len(candidate_ids))
+            return True
         except Exception as e:
-            logger.error(f"❌ Pinecone search failed: {e}")
-            return []
+            logger.error("❌ Pinecone delete failed: %s", e)
+            return False
     
-    def delete_resume(self, candidate_id: int) -> bool:
-        """Delete resume from Pinecone"""
+    def delete_legacy_vectors(self, candidate_ids: Iterable[int], model: ModelSpec | None = None) -> bool:
+        """Delete the legacy single vectors (`candidate_{id}`) of candidates now stored as chunks"""
         if not self.enabled:
             return False
         
+        model = model or default_model_spec()
+        candidate_ids = list(candidate_ids)
         try:
-            vector_id = f"candidate_{candidate_id}"
-            self.index.delete(ids=[vector_id])
-            logger.info(f"✅ Deleted candidate {candidate_id} from Pinecone")
+            index = self._index_for(model)
+            for start in range(0, len(candidate_ids), 1000):
+                index.delete(
+                    ids=[legacy_vector_id(candidate_id) for candidate_id in candidate_ids[start:start + 1000]],
+                    namespace=model.namespace
+                )
             return True
         except Exception as e:
-            logger.error(f"❌ Pinecone delete failed: {e}")
+            logger.error("❌ Pinecone legacy vector delete failed: %s", e)
             return False
     
+    def existing_candidates(self, candidate_ids: Iterable[int], model: ModelSpec | None = None) -> Set[int]:
+        """
+        Which of these candidates have chunk vectors
+        
+        A legacy single vector doesn't count: it has no `candidate_id`
+        metadata, so facet prefilters (`candidate_id $in`) never match it and
+        reconciliation replaces it with chunk vectors.
+        
+        Raises on Pinecone errors so reconciliation never mistakes an outage
+        for missing vectors.
+        """
+        if not self.enabled:
+            raise RuntimeError("Pinecone not enabled")
+        
+        model = model or default_model_spec()
+        index = self._index_for(model)
+        candidate_ids = list(candidate_ids)
+        found: Set[int] = set()
+        for start in range(0, len(candidate_ids), 500):
+            vector_ids = [chunk_vector_id(candidate_id, 0) for candidate_id in candidate_ids[start:start + 500]]
+            result = index.fetch(ids=vector_ids, namespace=model.namespace)
+            found.update(parse_vector_id(vector_id) for vector_id in result.vectors)
+        return found
+    
+    def list_candidate_ids(self, model: ModelSpec | None = None, page_size: int = 100) -> Iterator[List[int]]:
+        """
+        Candidate IDs present in the model's namespace, one page at a time
+        
+        Uses ID listing (serverless indexes, pinecone-client >= 3.1).
+        """
+        if not self.enabled:
+            raise RuntimeError("Pinecone not enabled")
+        
+        model = model or default_model_spec()
+        index = self._index_for(model)
+        token = None
+        while True:
+            page = index.list_paginated(
+                prefix=VECTOR_ID_PREFIX,
+                limit=page_size,
+                pagination_token=token,
+                namespace=model.namespace
+            )
+            candidate_ids = sorted({parse_vector_id(vector.id) for vector in page.vectors})
+            if candidate_ids:
+                yield candidate_ids
+            token = page.pagination.next if page.pagination else None
+            if not token:
+                return
+    
     def search_resumes(
         self, 
         query_embedding: list, 
         top_k: int = 20,
-        filter_dict: dict = None
+        filter_dict: dict = None,
+        model: ModelSpec | None = None
     ) -> list:
         """
         Search for similar resumes using vector similarity
         
         Args:
-            query_embedding: The query vector (384-dim)
+            query_embedding: The query vector
             top_k: Number of results to return
             filter_dict: Metadata filters (e.g., {"tenant_id": 5})
+            model: Embedding model of the query (selects index and namespace)
         
         Returns:
             List of matches with id, score, and metadata
+        
+        Raises:
+            VectorSearchError: the query failed (an empty list means nothing matched)
         """
         if not self.enabled:
             logger.warning("Pinecone not enabled, returning empty results")
             return []
 
+        model = model or default_model_spec()
         try:
             # Query Pinecone
-            results = self.index.query(
-                vector=query_embedding,
+            results = self._index_for(model).query(
+                namespace=model.namespace,
+                vector=_as_list(query_embedding),
                 top_k=top_k,
                 filter=filter_dict,
                 include_metadata=True
@@ -181,12 +263,54 @@ class PineconeService:
                     "metadata": match.metadata
                 })
             
-            logger.info(f"✅ Found {len(matches)} matches in Pinecone")
+            logger.info("✅ Found %s matches in Pinecone", len(matches))
             return matches
             
         except Exception as e:
-            logger.error(f"❌ Pinecone search failed: {e}")
-            return []
+            logger.error("❌ Pinecone search failed: %s", e)
+            raise VectorSearchError(str(e)) from e
+    
+    def search_candidates(
+        self,
+        query_embedding: List[float],
+        top_k: int = 20,
+        filter_dict: Optional[Dict] = None,
+        model: ModelSpec | None = None
+    ) -> Tuple[List[Dict], bool]:
+        """
+        Search chunk vectors and rank candidates by aggregated similarity
+        
+        Oversamples chunk matches so `top_k` distinct candidates survive
+        grouping (see rank_candidates), then aggregates per candidate with
+        EMBEDDING_AGGREGATION.
+        
+        Args:
+            query_embedding: The query vector
+            top_k: Number of candidates to return
+            filter_dict: Metadata filters (e.g., {"tenant_id": 5})
+            model: Embedding model of the query
+        
+        Returns:
+            (list of {candidate_id, score, chunk_scores, metadata}, best first;
+            whether every candidate passing the filter is in it)
+        
+        Raises:
+            VectorSearchError: the query failed
+        """
+        return rank_candidates(
+            lambda chunk_top_k: self.search_resumes(
+                query_embedding=query_embedding,
+                top_k=chunk_top_k,
+                filter_dict=filter_dict,
+                model=model
+            ),
+            top_k,
+            settings.EMBEDDING_AGGREGATION,
+            settings.EMBEDDING_AGGREGATION_K,
+            settings.EMBEDDING_CHUNK_OVERSAMPLE,
+            # Pinecone's limit for queries that include metadata
+            1000
+        )
     
     def get_stats(self) -> Dict:
         """Get index statistics"""
@@ -198,10 +322,14 @@ class PineconeService:
             return {
                 "enabled": True,
                 "total_vectors": stats.get("total_vector_count", 0),
-                "dimension": stats.get("dimension", 384)
+                "dimension": stats.get("dimension"),
+                "namespaces": {
+                    name or "default": summary.get("vector_count", 0)
+                    for name, summary in (stats.get("namespaces") or {}).items()
+                }
             }
         except Exception as e:
-            logger.error(f"❌ Failed to get Pinecone stats: {e}")
+            logger.error("❌ Failed to get Pinecone stats: %s", e)
             return {"enabled": True, "error": str(e)}
 
 # Singleton instance
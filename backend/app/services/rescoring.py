@@ -0,0 +1,251 @@
+"""
+Incremental re-scoring after a job's requirements change
+
+1. Immediately: every candidate of the job is re-scored with the local
+   scorer (app.services.local_scorer) and written back in bulk, so rankings
+   reflect the new skills / minimum experience as soon as the update returns.
+2. In the background: candidates whose ranking could change get a full LLM
+   re-evaluation: those whose local score moved by at least
+   RESCORE_LLM_MIN_DELTA and that rank in the top RESCORE_LLM_TOP_N before or
+   after the change (every top-N candidate if the title or description
+   changed, which the local scorer can't judge). Calls run with
+   RESCORE_LLM_CONCURRENCY in flight, paced to RESCORE_LLM_MAX_PER_MINUTE.
+
+Progress is recorded in `job_rescores`; a newer update of the same job
+supersedes a running re-score.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List
+from postgrest import AsyncPostgrestClient
+from app.config.settings import settings
+from app.services.facet_index import facet_index
+from app.services.local_scorer import local_scorer
+from app.services.scoring_service import scoring_service
+from app.services.search_cache import search_cache
+from app.services.summary_store import summary_store
+from app.utils.rate_limit import AsyncRateLimiter
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCORING_FIELDS = ("must_have_skills", "nice_to_have_skills", "min_experience")
+CONTEXT_FIELDS = ("title", "description")
+
+_RESCORE_COLUMNS = "id, tenant_id, name, resume_text, parsed_data, skill_ids, match_score, ai_evaluation, recommendation"
+_UPDATE_CHUNK = 500
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _ranks(candidates: List[Dict], scores: Dict[int, float]) -> Dict[int, int]:
+    ordered = sorted(candidates, key=lambda candidate: scores[candidate["id"]], reverse=True)
+    return {candidate["id"]: rank for rank, candidate in enumerate(ordered)}
+
+
+class RescoreService:
+    def __init__(self):
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._limiter = AsyncRateLimiter(settings.RESCORE_LLM_MAX_PER_MINUTE)
+
+    def changed(self, old_job: Dict, new_job: Dict) -> tuple[bool, bool]:
+        """(scoring requirements changed, title/description changed)"""
+        return (
+            any(old_job.get(field) != new_job.get(field) for field in SCORING_FIELDS),
+            any(old_job.get(field) != new_job.get(field) for field in CONTEXT_FIELDS)
+        )
+
+    def _select_for_llm(self, candidates: List[Dict], old_scores: Dict, new_scores: Dict, context_changed: bool) -> List[Dict]:
+        old_ranks = _ranks(candidates, old_scores)
+        new_ranks = _ranks(candidates, new_scores)
+        top_n = settings.RESCORE_LLM_TOP_N
+        selected = []
+        for candidate in candidates:
+            candidate_id = candidate["id"]
+            in_top = old_ranks[candidate_id] < top_n or new_ranks[candidate_id] < top_n
+            moved = abs(new_scores[candidate_id] - old_scores[candidate_id]) >= settings.RESCORE_LLM_MIN_DELTA
+            if in_top and (moved or context_changed):
+                selected.append(candidate)
+        # Best first, so the top of the list settles before the tail
+        return sorted(selected, key=lambda candidate: new_ranks[candidate["id"]])
+
+    async def start(
+        self,
+        db: AsyncPostgrestClient,
+        tenant_id: int,
+        old_job: Dict,
+        new_job: Dict
+    ) -> Dict | None:
+        """
+        Re-score a job's candidates after an update
+
+        Returns:
+            The job_rescores progress row, or None if nothing affecting scores changed
+        """
+        scoring_changed, context_changed = self.changed(old_job, new_job)
+        if not scoring_changed and not context_changed:
+            return None
+        job_id = new_job["id"]
+
+        previous = self._tasks.pop(job_id, None)
+        if previous is not None:
+            previous.cancel()
+        await db.table("job_rescores")\
+            .update({"status": "superseded", "updated_at": _now()})\
+            .eq("job_posting_id", job_id)\
+            .eq("status", "running")\
+            .execute()
+
+        result = await db.table("candidates")\
+            .select(_RESCORE_COLUMNS)\
+            .eq("job_posting_id", job_id)\
+            .eq("tenant_id", tenant_id)\
+            .execute()
+        candidates = result.data
+
+        # Step 1: local re-score, written back in bulk
+        old_scores = {candidate["id"]: candidate.get("match_score") or 0 for candidate in candidates}
+        new_scores = dict(old_scores)
+        if scoring_changed and candidates:
+            updates = []
+            for candidate in candidates:
+                columns, _ = local_scorer.rescore(candidate, old_job, new_job)
+                new_scores[candidate["id"]] = columns["match_score"]
+                updates.append({"id": candidate["id"], **columns})
+            # Update-only: a candidate deleted meanwhile must not come back
+            for start in range(0, len(updates), _UPDATE_CHUNK):
+                await db.rpc("rescore_candidates", {
+                    "p_tenant_id": tenant_id,
+                    "p_updates": updates[start:start + _UPDATE_CHUNK]
+                }).execute()
+            for columns in updates:
+                summary_store.update(tenant_id, columns["id"], columns)
+
+        # Step 2: queue LLM re-evaluation where the ranking could change
+        queued = self._select_for_llm(candidates, old_scores, new_scores, context_changed)
+        run = (await db.table("job_rescores").insert({
+            "tenant_id": tenant_id,
+            "job_posting_id": job_id,
+            "status": "running" if queued else "completed",
+            "total_count": len(candidates),
+            "local_count": len(candidates) if scoring_changed else 0,
+            "llm_queued": len(queued),
+            "completed_at": None if queued else _now()
+        }).execute()).data[0]
+
+        logger.info(
+            "Re-scored %s candidates of job %s locally, %s queued for LLM re-evaluation",
+            run["local_count"], job_id, len(queued)
+        )
+        if queued:
+            task = asyncio.create_task(self._evaluate(db, run, queued, new_job))
+            self._tasks[job_id] = task
+            task.add_done_callback(lambda done: self._tasks.pop(job_id, None) if self._tasks.get(job_id) is done else None)
+        return run
+
+    async def _evaluate_one(self, db: AsyncPostgrestClient, candidate: Dict, job: Dict, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            await self._limiter.acquire()
+            try:
+                evaluation = await scoring_service.score_candidate(
+                    candidate.get("resume_text") or "",
+                    candidate.get("parsed_data") or {},
+                    job
+                )
+                evaluation.update(local_scorer.skill_match(
+                    local_scorer.skill_ids(candidate), candidate.get("resume_text") or "", job
+                ))
+                await db.table("candidates")\
+                    .update({
+                        "match_score": evaluation["overall_score"],
+                        "skills_matched": evaluation["skills_matched"],
+                        "skills_missing": evaluation["skills_missing"],
+                        "ai_evaluation": evaluation,
+                        "strengths": evaluation["strengths"],
+                        "concerns": evaluation.get("concerns", []),
+                        "recommendation": evaluation["recommendation"]
+                    })\
+                    .eq("id", candidate["id"])\
+                    .execute()
+                summary_store.update(candidate["tenant_id"], candidate["id"], {
+                    "match_score": evaluation["overall_score"],
+                    "skills_matched": evaluation["skills_matched"],
+                    "strengths": evaluation["strengths"],
+                    "concerns": evaluation.get("concerns", []),
+                    "recommendation": evaluation["recommendation"]
+                })
+                # Moves the candidate between recommendation facets
+                if evaluation["recommendation"] != candidate.get("recommendation"):
+                    facet_index.update(candidate["tenant_id"], candidate["id"], {"recommendation": evaluation["recommendation"]})
+                    search_cache.invalidate(candidate["tenant_id"])
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The local score stays in place
+                logger.warning("⚠️ LLM re-evaluation failed for candidate %s: %s", candidate["id"], e)
+                return False
+
+    async def _still_running(self, db: AsyncPostgrestClient, run_id: int) -> bool:
+        result = await db.table("job_rescores").select("status").eq("id", run_id).execute()
+        return bool(result.data) and result.data[0]["status"] == "running"
+
+    async def _evaluate(self, db: AsyncPostgrestClient, run: Dict, queued: List[Dict], job: Dict) -> None:
+        semaphore = asyncio.Semaphore(settings.RESCORE_LLM_CONCURRENCY)
+        done = failed = 0
+        step = max(settings.RESCORE_PROGRESS_EVERY, 1)
+        try:
+            for start in range(0, len(queued), step):
+                # Another worker may have superseded this run
+                if not await self._still_running(db, run["id"]):
+                    logger.info("Re-score %s of job %s superseded", run["id"], job["id"])
+                    return
+                outcomes = await asyncio.gather(*(
+                    self._evaluate_one(db, candidate, job, semaphore)
+                    for candidate in queued[start:start + step]
+                ))
+                done += sum(outcomes)
+                failed += len(outcomes) - sum(outcomes)
+                await db.table("job_rescores")\
+                    .update({"llm_done": done, "llm_failed": failed, "updated_at": _now()})\
+                    .eq("id", run["id"])\
+                    .execute()
+
+            await db.table("job_rescores")\
+                .update({"status": "completed", "updated_at": _now(), "completed_at": _now()})\
+                .eq("id", run["id"])\
+                .eq("status", "running")\
+                .execute()
+            logger.info("✅ Re-score of job %s complete: %s re-evaluated, %s failed", job["id"], done, failed)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("❌ Re-score of job %s failed: %s", job["id"], e)
+
+    async def progress(self, db: AsyncPostgrestClient, tenant_id: int, job_id: int) -> Dict | None:
+        """Latest re-scoring run of a job"""
+        result = await db.table("job_rescores")\
+            .select("*")\
+            .eq("job_posting_id", job_id)\
+            .eq("tenant_id", tenant_id)\
+            .order("started_at", desc=True)\
+            .limit(1)\
+            .execute()
+        return result.data[0] if result.data else None
+
+    async def shutdown(self, db: AsyncPostgrestClient) -> None:
+        """Cancel in-flight runs and mark them interrupted"""
+        tasks, self._tasks = self._tasks, {}
+        for task in tasks.values():
+            task.cancel()
+        if tasks:
+            await db.table("job_rescores")\
+                .update({"status": "interrupted", "updated_at": _now()})\
+                .in_("job_posting_id", list(tasks))\
+                .eq("status", "running")\
+                .execute()
+
+# Singleton instance
+rescore_service = RescoreService()
@@ -2,12 +2,354 @@
 Resume parsing service using AI
 """
 from langchain_groq import ChatGroq
-from langchain.schema import HumanMessage
 from app.config.settings import settings
 from app.config.logging_config import logger
+from app.schemas.llm import ParsedResume
+from app.services.structured_output import generate
+from app.services.text_preparation import prepare_for_parsing
+from app.utils.pdf_pages import extract_page_range, extract_pages
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, List
+from xml.etree import ElementTree
 import PyPDF2
+import asyncio
 import io
-import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+# Bytes read from the start of a file for format detection
+HEADER_BYTES = 2048
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class ExtractionLimitError(Exception):
+    """Raised when a document exceeds the configured size budget"""
+
+
+class UnsupportedFormatError(Exception):
+    """Raised when no extractor recognises a document"""
+
+
+def _as_stream(source: bytes | BinaryIO) -> BinaryIO:
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+def _source_size(source: bytes | BinaryIO) -> int:
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    size = source.seek(0, io.SEEK_END)
+    source.seek(0)
+    return size
+
+
+class TextExtractor:
+    """
+    Base class for format-specific text extractors
+
+    Subclasses set `name`, recognise their format from the leading bytes in
+    `matches`, and return plain text from `extract`.
+    """
+    name = "unknown"
+
+    def matches(self, header: bytes, source: BinaryIO) -> bool:
+        raise NotImplementedError
+
+    async def extract(self, source: bytes | BinaryIO) -> str:
+        raise NotImplementedError
+
+
+class PdfExtractor(TextExtractor):
+    """
+    PDF extraction within page/byte/time/char budgets
+
+    Only as many pages as needed to fill RESUME_TEXT_CHAR_BUDGET are read,
+    capped at PDF_MAX_PAGES and PDF_EXTRACT_TIMEOUT_SECONDS. Large documents
+    are written to a temporary file once and split into page ranges across
+    worker processes; everything runs off the event loop.
+
+    Workers are spawned rather than forked: the server already runs threads
+    (log listener, password hashing), and a forked child can inherit a lock
+    one of them held.
+    """
+    name = "pdf"
+
+    def __init__(self):
+        self._process_pool: ProcessPoolExecutor | None = None
+
+    def matches(self, header: bytes, source: BinaryIO) -> bool:
+        # The spec allows leading junk before the marker within the first 1 KB
+        return b"%PDF-" in header[:1024]
+
+    def start(self) -> None:
+        """Spawn the worker processes now (at startup) rather than on the first large PDF"""
+        pool = self._get_process_pool()
+        for future in [pool.submit(os.getpid) for _ in range(settings.PDF_PARALLEL_WORKERS)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_PARALLEL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
+
+    def _extract_serial(self, source, deadline: float) -> tuple[str | None, int, int]:
+        """
+        Open the PDF and, if it is small enough, extract it in this thread
+
+        Returns:
+            (text, pages_to_read, total_pages); text is None when the
+            document is large enough to be split across worker processes
+        """
+        reader = PyPDF2.PdfReader(_as_stream(source))
+        total_pages = len(reader.pages)
+        page_count = min(total_pages, settings.PDF_MAX_PAGES)
+
+        if page_count > settings.PDF_PARALLEL_PAGE_THRESHOLD:
+            return None, page_count, total_pages
+
+        parts = extract_pages(reader, 0, page_count, settings.RESUME_TEXT_CHAR_BUDGET, deadline)
+        return "\n".join(parts), page_count, total_pages
+
+    @staticmethod
+    def _spill(source: bytes | BinaryIO) -> str:
+        """Write the PDF to a temporary file the workers can open by path"""
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as pdf_file:
+            shutil.copyfileobj(_as_stream(source), pdf_file)
+            return pdf_file.name
+
+    async def _extract_parallel(self, source: bytes | BinaryIO, page_count: int, deadline: float) -> str:
+        """Extract page ranges in worker processes, keeping document order"""
+        loop = asyncio.get_running_loop()
+        pool = self._get_process_pool()
+        step = settings.PDF_PAGES_PER_TASK
+        budget = settings.RESUME_TEXT_CHAR_BUDGET
+        path = await asyncio.to_thread(self._spill, source)
+
+        futures = [
+            loop.run_in_executor(
+                pool, extract_page_range, path, start, min(start + step, page_count), budget, deadline
+            )
+            for start in range(0, page_count, step)
+        ]
+
+        parts = []
+        collected = 0
+        try:
+            # Consume ranges in page order; once the budget is met, later
+            # ranges that haven't started are cancelled
+            for future in futures:
+                for page_text in await future:
+                    parts.append(page_text)
+                    collected += len(page_text)
+                if collected >= budget:
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+            # Workers that already opened the file keep reading it
+            await asyncio.to_thread(os.unlink, path)
+
+        return "\n".join(parts)
+
+    async def extract(self, source: bytes | BinaryIO) -> str:
+        size = _source_size(source)
+        if size > settings.PDF_MAX_BYTES:
+            raise ExtractionLimitError(f"PDF is {size} bytes, limit is {settings.PDF_MAX_BYTES}")
+
+        timeout = settings.PDF_EXTRACT_TIMEOUT_SECONDS
+        deadline = time.time() + timeout
+
+        text, page_count, total_pages = await asyncio.wait_for(
+            asyncio.to_thread(self._extract_serial, source, deadline),
+            timeout=timeout
+        )
+        if total_pages > page_count:
+            logger.warning("PDF has %s pages, extracting first %s", total_pages, page_count)
+
+        if text is None:
+            text = await asyncio.wait_for(
+                self._extract_parallel(source, page_count, deadline),
+                timeout=max(deadline - time.time(), 0.1)
+            )
+
+        if time.time() >= deadline:
+            logger.warning("PDF extraction hit the %ss time budget, text may be partial", timeout)
+
+        logger.info("Extracted %s characters from PDF (%s pages)", len(text), page_count)
+        return text
+
+
+class DocxExtractor(TextExtractor):
+    """
+    DOCX extraction by streaming word/document.xml out of the zip
+
+    Uses iterparse and clears each element once read, so memory stays flat
+    regardless of document size; no python-docx dependency.
+    """
+    name = "docx"
+
+    def matches(self, header: bytes, source: BinaryIO) -> bool:
+        if not header.startswith(b"PK\x03\x04"):
+            return False
+        try:
+            with zipfile.ZipFile(source) as archive:
+                return "word/document.xml" in archive.namelist()
+        except zipfile.BadZipFile:
+            return False
+
+    def _extract_sync(self, source) -> str:
+        budget = settings.RESUME_TEXT_CHAR_BUDGET
+        with zipfile.ZipFile(_as_stream(source)) as archive:
+            info = archive.getinfo("word/document.xml")
+            if info.file_size > settings.DOCX_MAX_XML_BYTES:
+                raise ExtractionLimitError(
+                    f"DOCX body is {info.file_size} bytes uncompressed, "
+                    f"limit is {settings.DOCX_MAX_XML_BYTES}"
+                )
+
+            paragraphs = []
+            current = []
+            collected = 0
+            with archive.open(info) as document:
+                for _, element in ElementTree.iterparse(document, events=("end",)):
+                    tag = element.tag
+                    if tag == f"{_W_NS}t":
+                        if element.text:
+                            current.append(element.text)
+                    elif tag == f"{_W_NS}tab":
+                        current.append("\t")
+                    elif tag in (f"{_W_NS}br", f"{_W_NS}cr"):
+                        current.append("\n")
+                    elif tag == f"{_W_NS}p":
+                        paragraph = "".join(current)
+                        current = []
+                        paragraphs.append(paragraph)
+                        collected += len(paragraph) + 1
+                        element.clear()
+                        if collected >= budget:
+                            break
+
+        return "\n".join(paragraphs)
+
+    async def extract(self, source: bytes | BinaryIO) -> str:
+        text = await asyncio.to_thread(self._extract_sync, source)
+        logger.info("Extracted %s characters from DOCX", len(text))
+        return text
+
+
+class LegacyDocExtractor(TextExtractor):
+    """Recognises binary Word 97-2003 files so they fail with a clear message"""
+    name = "doc"
+
+    def matches(self, header: bytes, source: BinaryIO) -> bool:
+        return header.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1")
+
+    async def extract(self, source: bytes | BinaryIO) -> str:
+        raise UnsupportedFormatError(
+            "Legacy .doc files are not supported. Please save the resume as PDF or DOCX"
+        )
+
+
+class PlainTextExtractor(TextExtractor):
+    """UTF-8 / UTF-16 plain text; registered last as the fallback"""
+    name = "text"
+
+    def matches(self, header: bytes, source: BinaryIO) -> bool:
+        if header.startswith((b"\xff\xfe", b"\xfe\xff")):
+            return True
+        if b"\x00" in header:
+            return False
+        try:
+            header.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut off at the end of the header is fine
+            if e.start < len(header) - 3:
+                return False
+        return True
+
+    def _extract_sync(self, source) -> str:
+        stream = _as_stream(source)
+        # Worst case 4 bytes per character for UTF-8
+        raw = stream.read(settings.RESUME_TEXT_CHAR_BUDGET * 4)
+        if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+            text = raw.decode("utf-16", errors="replace")
+        else:
+            text = raw.decode("utf-8-sig", errors="replace")
+        return text[:settings.RESUME_TEXT_CHAR_BUDGET]
+
+    async def extract(self, source: bytes | BinaryIO) -> str:
+        text = await asyncio.to_thread(self._extract_sync, source)
+        logger.info("Extracted %s characters from text file", len(text))
+        return text
+
+
+class ExtractorRegistry:
+    """Picks an extractor by sniffing the file's leading bytes"""
+
+    def __init__(self):
+        self._extractors: List[TextExtractor] = []
+
+    def register(self, extractor: TextExtractor) -> None:
+        """Add an extractor; earlier registrations are tried first"""
+        self._extractors.append(extractor)
+
+    def get(self, name: str) -> TextExtractor:
+        for extractor in self._extractors:
+            if extractor.name == name:
+                return extractor
+        raise KeyError(name)
+
+    def detect(self, source: bytes | BinaryIO) -> TextExtractor:
+        """
+        Find the extractor for a document
+
+        Raises:
+            UnsupportedFormatError: if no registered extractor matches
+        """
+        stream = _as_stream(source)
+        header = stream.read(HEADER_BYTES)
+        try:
+            for extractor in self._extractors:
+                stream.seek(0)
+                if extractor.matches(header, stream):
+                    return extractor
+        finally:
+            stream.seek(0)
+        raise UnsupportedFormatError("Unsupported file type. Only PDF, DOCX or plain text allowed")
+
+    async def extract(self, source: bytes | BinaryIO) -> tuple[str, str]:
+        """
+        Detect the format and extract text
+
+        Returns:
+            (text, format name)
+        """
+        extractor = self.detect(source)
+        text = await extractor.extract(source)
+        return text.strip(), extractor.name
+
+
+extractor_registry = ExtractorRegistry()
+extractor_registry.register(PdfExtractor())
+extractor_registry.register(DocxExtractor())
+extractor_registry.register(LegacyDocExtractor())
+extractor_registry.register(PlainTextExtractor())
+
 
 class ResumeParser:
     def __init__(self):
@@ -17,30 +359,43 @@ class ResumeParser:
             temperature=0
         )
     
-    async def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
-        """Extract text from PDF file"""
+    async def extract_text(self, source: bytes | BinaryIO) -> str:
+        """
+        Extract text from a resume in any registered format
+        
+        Args:
+            source: File bytes or a seekable binary file object
+        
+        Returns:
+            Extracted text (possibly partial if a budget was hit)
+        """
         try:
-            pdf_file = io.BytesIO(pdf_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            
-            logger.info(f"Extracted {len(text)} characters from PDF")
-            return text.strip()
+            text, _ = await extractor_registry.extract(source)
+            return text
+        except UnsupportedFormatError:
+            raise
+        except asyncio.TimeoutError:
+            logger.error("Text extraction timed out")
+            raise Exception("Failed to extract text from resume: extraction timed out")
         except Exception as e:
-            logger.error(f"PDF extraction failed: {str(e)}")
-            raise Exception(f"Failed to extract text from PDF: {str(e)}")
+            logger.error("Text extraction failed: %s", e)
+            raise Exception(f"Failed to extract text from resume: {str(e)}")
     
     async def parse_resume(self, resume_text: str) -> dict:
-        """Parse resume text using AI to extract structured information"""
+        """
+        Parse resume text using AI to extract structured information
+        
+        Raises:
+            StructuredOutputError: no valid parse, even after a retry
+        """
+        
+        prepared_text = prepare_for_parsing(resume_text)
         
         prompt = f"""
         Extract structured information from this resume. Be precise and only extract information that is clearly stated.
         
         RESUME TEXT:
-        {resume_text[:4000]}
+        {prepared_text}
         
         Return a JSON object with the following structure:
         {{
@@ -93,32 +448,13 @@ class ResumeParser:
         """
         
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            
-            # Parse JSON response
-            parsed_data = json.loads(response.content)
+            parsed_data = (await generate(self.llm, prompt, ParsedResume, "Resume parsing")).model_dump()
             
-            logger.info(f"Parsed resume for: {parsed_data.get('name', 'Unknown')}")
+            logger.info("Parsed resume for: %s", parsed_data.get('name', 'Unknown'))
             return parsed_data
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {str(e)}")
-            logger.error(f"Response was: {response.content}")
-            # Return minimal data if parsing fails
-            return {
-                "name": "Unknown",
-                "email": None,
-                "phone": None,
-                "location": None,
-                "summary": resume_text[:200],
-                "skills": [],
-                "experience_years": 0,
-                "education": [],
-                "work_experience": [],
-                "certifications": []
-            }
         except Exception as e:
-            logger.error(f"Resume parsing failed: {str(e)}")
+            logger.error("Resume parsing failed: %s", e)
             raise
 
 resume_parser = ResumeParser()
\ No newline at end of file
@@ -1,11 +1,23 @@
 """
 Resume scoring service using Direct LLM approach
+
+`score_candidates` scores a whole upload batch with SCORE_BATCH_SIZE compact
+candidate profiles per prompt, so the job context is sent once per batch
+instead of once per candidate. Evaluations that are missing or malformed in
+a batched response are re-scored one per prompt, concurrently. Replies are parsed and
+validated by app.services.structured_output.
 """
+import asyncio
+from typing import Dict, List, Tuple
 from langchain_groq import ChatGroq
 from langchain.schema import HumanMessage
+from pydantic import ValidationError
 from app.config.settings import settings
 from app.config.logging_config import logger
-import json
+from app.schemas.llm import BatchEvaluation, CandidateEvaluation
+from app.services.structured_output import extract_json, generate
+from app.services.text_preparation import prepare_for_scoring, prepare_job_description
+
 
 class ScoringService:
     def __init__(self):
@@ -24,6 +36,9 @@ class ScoringService:
         """
         Score candidate using Direct LLM approach
         Provides detailed evaluation with match score and explanations
+        
+        Raises:
+            StructuredOutputError: no valid evaluation, even after a retry
         """
         
         # Extract job requirements
@@ -31,19 +46,20 @@ class ScoringService:
         must_have_skills = job_requirements.get('must_have_skills', [])
         nice_to_have_skills = job_requirements.get('nice_to_have_skills', [])
         min_experience = job_requirements.get('min_experience', 0)
-        job_description = job_requirements.get('description', '')
+        job_description = prepare_job_description(job_requirements.get('description') or '')
         
         # Extract candidate info
         candidate_name = parsed_data.get('name', 'Unknown')
         candidate_skills = parsed_data.get('skills', [])
         candidate_experience = parsed_data.get('experience_years', 0)
+        resume_summary = prepare_for_scoring(resume_text)
         
         prompt = f"""
         You are an expert technical recruiter. Evaluate this candidate for the job position.
         
         JOB REQUIREMENTS:
         Title: {job_title}
-        Description: {job_description[:500]}
+        Description: {job_description}
         Must-have skills: {', '.join(must_have_skills)}
         Nice-to-have skills: {', '.join(nice_to_have_skills)}
         Minimum experience: {min_experience} years
@@ -54,7 +70,7 @@ class ScoringService:
         Skills: {', '.join(candidate_skills)}
         
         Resume Summary:
-        {resume_text[:2000]}
+        {resume_summary}
         
         EVALUATION CRITERIA:
         1. Skills Match (40 points): How many required skills does the candidate have?
@@ -92,49 +108,157 @@ class ScoringService:
         """
         
         try:
-            logger.info(f"Scoring candidate: {candidate_name} for {job_title}")
+            logger.info("Scoring candidate: %s for %s", candidate_name, job_title)
             
-            response = self.llm.invoke([HumanMessage(content=prompt)])
+            evaluation = (await generate(self.llm, prompt, CandidateEvaluation, "Scoring")).model_dump()
             
-            # Strip markdown code blocks if present
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content[7:]  # Remove ```json
-            if content.startswith("```"):
-                content = content[3:]  # Remove ```
-            if content.endswith("```"):
-                content = content[:-3]  # Remove trailing ```
-            content = content.strip()
-            
-            evaluation = json.loads(content)
-            
-            logger.info(f"Score: {evaluation['overall_score']}/100 - {evaluation['recommendation']}")
+            logger.info("Score: %s/100 - %s", evaluation['overall_score'], evaluation['recommendation'])
             
             return evaluation
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse scoring response as JSON: {str(e)}")
-            logger.error(f"Response was: {response.content}")
-            
-            # Return default evaluation if parsing fails
-            return {
-                "overall_score": 50,
-                "skills_matched": [],
-                "skills_missing": must_have_skills,
-                "experience_match": candidate_experience >= min_experience,
-                "strengths": ["Resume submitted"],
-                "concerns": ["Unable to fully evaluate"],
-                "recommendation": "maybe",
-                "detailed_explanation": "Automated evaluation encountered an error. Manual review recommended.",
-                "score_breakdown": {
-                    "skills": 20,
-                    "experience": 15,
-                    "relevance": 10,
-                    "growth": 5
-                }
-            }
         except Exception as e:
-            logger.error(f"Scoring failed: {str(e)}")
+            logger.error("Scoring failed: %s", e)
             raise
 
-scoring_service = ScoringService()
\ No newline at end of file
+    
+    def _batch_prompt(self, profiles: List[Tuple[str, str, dict]], job_requirements: dict) -> str:
+        """One job context followed by compact profiles labelled with their IDs"""
+        must_have_skills = job_requirements.get('must_have_skills', [])
+        nice_to_have_skills = job_requirements.get('nice_to_have_skills', [])
+        
+        candidates = "\n\n".join(
+            f"""[{label}]
+Name: {parsed_data.get('name', 'Unknown')}
+Experience: {parsed_data.get('experience_years', 0)} years
+Skills: {', '.join(parsed_data.get('skills', []))}
+Resume Summary:
+{summary}"""
+            for label, summary, parsed_data in profiles
+        )
+        
+        return f"""
+        You are an expert technical recruiter. Evaluate each candidate below for the same job position,
+        independently of the others.
+        
+        JOB REQUIREMENTS:
+        Title: {job_requirements.get('title', 'Unknown Position')}
+        Description: {prepare_job_description(job_requirements.get('description') or '')}
+        Must-have skills: {', '.join(must_have_skills)}
+        Nice-to-have skills: {', '.join(nice_to_have_skills)}
+        Minimum experience: {job_requirements.get('min_experience', 0)} years
+        
+        EVALUATION CRITERIA:
+        1. Skills Match (40 points): How many required skills does the candidate have?
+        2. Experience Level (30 points): Does experience meet minimum requirement?
+        3. Relevance (20 points): Is their background relevant to this role?
+        4. Growth Potential (10 points): Can they grow into the role?
+        
+        CANDIDATES:
+{candidates}
+        
+        Return one evaluation per candidate in JSON format:
+        {{
+            "evaluations": [
+                {{
+                    "candidate_id": "C1",
+                    "overall_score": 0-100,
+                    "skills_matched": ["skill1", ...],
+                    "skills_missing": ["skill1", ...],
+                    "experience_match": true/false,
+                    "strengths": ["Specific strength 1", "Specific strength 2"],
+                    "concerns": ["Specific concern 1"],
+                    "recommendation": "hire" | "maybe" | "reject",
+                    "detailed_explanation": "2-3 sentence explanation of why this score",
+                    "score_breakdown": {{"skills": 0-40, "experience": 0-30, "relevance": 0-20, "growth": 0-10}}
+                }}
+            ]
+        }}
+        
+        Be honest and specific. Provide actionable insights.
+        Return ONLY the JSON object, no additional text.
+        """
+    
+    async def _score_batch(
+        self,
+        batch: List[Tuple[str, dict]],
+        job_requirements: dict
+    ) -> List[dict | None]:
+        """One prompt for the whole batch; None where no valid evaluation came back"""
+        profiles = [
+            (f"C{index + 1}", prepare_for_scoring(resume_text, settings.SCORE_BATCH_PROFILE_TOKEN_BUDGET), parsed_data)
+            for index, (resume_text, parsed_data) in enumerate(batch)
+        ]
+        try:
+            response = await self.llm.ainvoke([HumanMessage(content=self._batch_prompt(profiles, job_requirements))])
+            payload = extract_json(response.content)
+        except Exception as e:
+            logger.warning("⚠️ Batched scoring response unusable (%s), scoring %s candidates one by one", e, len(batch))
+            return [None] * len(batch)
+        
+        # Entries are validated one at a time, so one bad entry costs one retry
+        entries = payload.get("evaluations", []) if isinstance(payload, dict) else payload
+        by_label = {}
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                evaluation = BatchEvaluation.model_validate(entry)
+            except ValidationError:
+                continue
+            by_label[evaluation.candidate_id] = evaluation.model_dump(exclude={"candidate_id"})
+        return [by_label.get(label) for label, _, _ in profiles]
+    
+    async def score_candidates(
+        self,
+        candidates: List[Tuple[str, dict]],
+        job_requirements: dict,
+        semaphore: asyncio.Semaphore | None = None
+    ) -> List[dict | Exception]:
+        """
+        Score many candidates for one job, SCORE_BATCH_SIZE per prompt
+        
+        Args:
+            candidates: (resume_text, parsed_data) pairs
+            semaphore: Limits prompts in flight, batched and individual alike
+                (SCORE_BATCH_CONCURRENCY if omitted); pass one to share the
+                limit across calls
+        
+        Returns:
+            One evaluation per candidate, in input order (same shape as
+            score_candidate), or the exception if that candidate couldn't be scored
+        """
+        size = settings.SCORE_BATCH_SIZE
+        semaphore = semaphore or asyncio.Semaphore(settings.SCORE_BATCH_CONCURRENCY)
+        
+        async def run(batch):
+            async with semaphore:
+                return await self._score_batch(batch, job_requirements)
+        
+        async def run_one(index):
+            resume_text, parsed_data = candidates[index]
+            async with semaphore:
+                try:
+                    return await self.score_candidate(resume_text, parsed_data, job_requirements)
+                except Exception as e:
+                    return e
+        
+        batches = []
+        evaluations: List[dict | Exception | None] = [None] * len(candidates)
+        if size > 1 and len(candidates) > 1:
+            batches = [candidates[start:start + size] for start in range(0, len(candidates), size)]
+            evaluations = [
+                evaluation
+                for batch_result in await asyncio.gather(*(run(batch) for batch in batches))
+                for evaluation in batch_result
+            ]
+        
+        # Fall back to one prompt per candidate where the batch didn't deliver
+        missing = [index for index, evaluation in enumerate(evaluations) if evaluation is None]
+        if missing and batches:
+            logger.info("Scoring %s of %s candidates individually", len(missing), len(candidates))
+        for index, evaluation in zip(missing, await asyncio.gather(*(run_one(index) for index in missing))):
+            evaluations[index] = evaluation
+        
+        if batches:
+            logger.info("Scored %s candidates in %s batched prompts", len(candidates), len(batches))
+        return evaluations
+
+scoring_service = ScoringService()
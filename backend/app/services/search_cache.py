@@ -0,0 +1,61 @@
+"""
+Per-tenant talent pool search result cache
+
+A search embeds the query and queries the vector store. The outcome is
+small: the ranked candidate IDs with their similarity scores (and the
+duplicate uploads folded under each) plus their facet counts. That ranking
+is cached per (normalized query, facet filters, minimum experience,
+embedding model version), so paging through results or re-running a search
+only reads the rows of the requested page.
+
+Only IDs and scores are cached, never row contents, so status changes show
+up immediately. Uploads, deletes and recommendation changes alter the
+ranking or its facets and bump the tenant's version (see app.utils.cache).
+"""
+from typing import Dict, Tuple
+from app.config.settings import settings
+from app.utils.cache import TenantVersionedCache
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    def __init__(self):
+        self._cache = TenantVersionedCache(
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS
+        )
+
+    def key(self, query: str, filters: Dict[str, Tuple[str, ...]], min_experience: int, model_version: str) -> Tuple:
+        """Cache key; `filters` as returned by facet_index.parse_filters"""
+        return (normalize_query(query), tuple(sorted(filters.items())), min_experience, model_version)
+
+    def version(self, tenant_id: int) -> int:
+        """Read before searching and pass to `set`, so a concurrent write wins"""
+        return self._cache.version(tenant_id)
+
+    def get(self, tenant_id: int, key: Tuple) -> Dict | None:
+        """
+        Cached ranking
+
+        Returns:
+            {"entries": [{"id", "score", "others": [{"id", "score"}]}] best first,
+            "cutoff", "complete", "partial", "facets"} or None on a miss
+        """
+        if not settings.SEARCH_CACHE_ENABLED:
+            return None
+        return self._cache.get(tenant_id, key)
+
+    def set(self, tenant_id: int, key: Tuple, ranking: Dict, version: int) -> None:
+        if settings.SEARCH_CACHE_ENABLED:
+            self._cache.set(tenant_id, key, ranking, version=version)
+
+    def invalidate(self, tenant_id: int) -> None:
+        """Call after candidates are added, removed or change recommendation"""
+        self._cache.bump(tenant_id)
+
+# Singleton instance
+search_cache = SearchCache()
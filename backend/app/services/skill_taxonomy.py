@@ -0,0 +1,234 @@
+"""
+Skill canonicalization
+
+The parser returns skills as free text ("JS", "Javascript", "node",
+"Node.js"). Every spelling in the alias dictionary maps to one skill ID
+("javascript", "nodejs"), which is what scoring, facets and filters compare.
+Skills that aren't in the dictionary keep a normalized form of their own
+text as their ID, so unknown skills still match their own spellings.
+
+`scan` finds dictionary skills mentioned anywhere in a resume with one
+Aho-Corasick pass over the text (app.utils.aho_corasick). A candidate's
+skill IDs are stored in `candidates.skill_ids` at ingestion, so matching a
+job's skills is a set lookup instead of a regex or LLM judgment per skill.
+After editing the dictionary, `python -m app.tasks.skills --all` recomputes
+stored IDs.
+
+Aliases in AMBIGUOUS_ALIASES ("go", "r", "spring", ...) are ordinary words
+too. They are canonicalized when the parser or a job lists them, but not
+searched for in free text.
+"""
+import json
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+from app.config.settings import settings
+from app.utils.aho_corasick import AhoCorasick
+import logging
+
+logger = logging.getLogger(__name__)
+
+# skill ID -> (label, aliases); the label is an alias too
+SKILLS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    # Languages
+    "python": ("Python", ("python3", "py")),
+    "javascript": ("JavaScript", ("js", "ecmascript", "es6", "es2015", "vanilla js")),
+    "typescript": ("TypeScript", ("ts",)),
+    "java": ("Java", ("java 8", "java 11", "java 17", "core java")),
+    "kotlin": ("Kotlin", ()),
+    "scala": ("Scala", ()),
+    "go": ("Go", ("golang", "go lang")),
+    "rust": ("Rust", ()),
+    "c": ("C", ()),
+    "cpp": ("C++", ("cpp", "c plus plus")),
+    "csharp": ("C#", ("c sharp", "csharp")),
+    "ruby": ("Ruby", ()),
+    "php": ("PHP", ()),
+    "swift": ("Swift", ()),
+    "objectivec": ("Objective-C", ("objc", "obj-c")),
+    "r": ("R", ("r language", "rlang")),
+    "matlab": ("MATLAB", ()),
+    "bash": ("Bash", ("shell scripting", "shell script", "sh")),
+    "powershell": ("PowerShell", ()),
+    "dart": ("Dart", ()),
+    "elixir": ("Elixir", ()),
+    "haskell": ("Haskell", ()),
+    "perl": ("Perl", ()),
+    "sql": ("SQL", ("t-sql", "tsql", "pl/sql", "plsql", "ansi sql")),
+    "html": ("HTML", ("html5",)),
+    "css": ("CSS", ("css3",)),
+    "sass": ("Sass", ("scss",)),
+    # Frontend
+    "react": ("React", ("reactjs", "react.js")),
+    "reactnative": ("React Native", ()),
+    "nextjs": ("Next.js", ("next",)),
+    "angular": ("Angular", ("angularjs", "angular.js", "angular 2+")),
+    "vue": ("Vue.js", ("vue", "vuejs")),
+    "svelte": ("Svelte", ()),
+    "redux": ("Redux", ()),
+    "jquery": ("jQuery", ()),
+    "tailwind": ("Tailwind CSS", ("tailwind", "tailwindcss")),
+    "webpack": ("Webpack", ()),
+    # Backend
+    "nodejs": ("Node.js", ("node", "nodejs", "node js")),
+    "express": ("Express", ("expressjs", "express.js")),
+    "nestjs": ("NestJS", ("nest.js",)),
+    "django": ("Django", ("django rest framework", "drf")),
+    "flask": ("Flask", ()),
+    "fastapi": ("FastAPI", ("fast api",)),
+    "spring": ("Spring", ("spring boot", "springboot", "spring framework")),
+    "rails": ("Ruby on Rails", ("rails", "ror")),
+    "laravel": ("Laravel", ()),
+    "dotnet": (".NET", ("dotnet", "asp.net", ".net core", "asp.net core")),
+    "graphql": ("GraphQL", ()),
+    "rest": ("REST APIs", ("rest", "rest api", "restful", "restful apis")),
+    "grpc": ("gRPC", ()),
+    "microservices": ("Microservices", ("microservice architecture",)),
+    # Data stores
+    "postgresql": ("PostgreSQL", ("postgres", "psql", "postgre")),
+    "mysql": ("MySQL", ("mariadb",)),
+    "sqlserver": ("SQL Server", ("mssql", "ms sql", "microsoft sql server")),
+    "oracle": ("Oracle Database", ("oracle db", "oracle")),
+    "sqlite": ("SQLite", ()),
+    "mongodb": ("MongoDB", ("mongo",)),
+    "redis": ("Redis", ()),
+    "elasticsearch": ("Elasticsearch", ("elastic search", "elk")),
+    "cassandra": ("Cassandra", ("apache cassandra",)),
+    "dynamodb": ("DynamoDB", ("dynamo db",)),
+    "snowflake": ("Snowflake", ()),
+    "bigquery": ("BigQuery", ("big query",)),
+    # Data and ML
+    "kafka": ("Kafka", ("apache kafka",)),
+    "spark": ("Spark", ("apache spark", "pyspark")),
+    "airflow": ("Airflow", ("apache airflow",)),
+    "dbt": ("dbt", ()),
+    "hadoop": ("Hadoop", ("hdfs",)),
+    "pandas": ("pandas", ()),
+    "numpy": ("NumPy", ()),
+    "machinelearning": ("Machine Learning", ("ml",)),
+    "deeplearning": ("Deep Learning", ("dl",)),
+    "pytorch": ("PyTorch", ("torch",)),
+    "tensorflow": ("TensorFlow", ("tf", "keras")),
+    "scikitlearn": ("scikit-learn", ("sklearn", "scikit learn")),
+    "nlp": ("NLP", ("natural language processing",)),
+    "computervision": ("Computer Vision", ("cv", "opencv")),
+    "llm": ("LLMs", ("llm", "large language models", "generative ai", "genai")),
+    "datascience": ("Data Science", ()),
+    "tableau": ("Tableau", ()),
+    "powerbi": ("Power BI", ("powerbi",)),
+    # Cloud and operations
+    "aws": ("AWS", ("amazon web services", "amazon aws")),
+    "azure": ("Azure", ("microsoft azure", "ms azure")),
+    "gcp": ("GCP", ("google cloud", "google cloud platform")),
+    "docker": ("Docker", ("containerization",)),
+    "kubernetes": ("Kubernetes", ("k8s",)),
+    "terraform": ("Terraform", ()),
+    "ansible": ("Ansible", ()),
+    "helm": ("Helm", ()),
+    "cicd": ("CI/CD", ("ci cd", "continuous integration", "continuous delivery", "continuous deployment")),
+    "jenkins": ("Jenkins", ()),
+    "githubactions": ("GitHub Actions", ()),
+    "gitlabci": ("GitLab CI", ("gitlab ci/cd",)),
+    "git": ("Git", ()),
+    "linux": ("Linux", ("unix", "ubuntu", "centos", "rhel")),
+    "nginx": ("Nginx", ()),
+    "prometheus": ("Prometheus", ()),
+    "grafana": ("Grafana", ()),
+    "devops": ("DevOps", ()),
+    # Practices
+    "agile": ("Agile", ("scrum", "kanban")),
+    "tdd": ("TDD", ("test driven development", "test-driven development")),
+    "systemdesign": ("System Design", ("distributed systems",)),
+}
+
+# Aliases that are also everyday words or letters: canonicalized when listed, not scanned for
+AMBIGUOUS_ALIASES = {
+    "go", "r", "c", "sh", "ts", "tf", "dl", "cv", "ml", "py", "next", "node", "rest",
+    "spring", "swift", "rust", "oracle", "express", "agile",
+}
+
+# Separators inside a name ("node.js", "ci/cd"), not leading ones (".net")
+_SEPARATORS = re.compile(r"(?<=\w)[.\-/_](?=\w)")
+# Characters that continue a skill name, so "java" doesn't match inside "javascript"
+_WORD_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789+#_")
+
+
+def normalize_skill(skill: str) -> str:
+    """'Node.js' / 'nodejs', 'CI/CD' / 'ci-cd' compare equal"""
+    return re.sub(r"[^a-z0-9+#]", "", skill.lower())
+
+
+def _spellings(alias: str) -> Set[str]:
+    """Spellings of an alias as they appear in text: 'node.js', 'node js', 'nodejs'"""
+    alias = " ".join(alias.lower().split())
+    return {alias, " ".join(_SEPARATORS.sub(" ", alias).split()), _SEPARATORS.sub("", alias)}
+
+
+class SkillTaxonomy:
+    def __init__(self, skills: Dict[str, Tuple[str, Tuple[str, ...]]] = SKILLS, path: str = ""):
+        skills = dict(skills)
+        if path:
+            skills.update(self._load(path))
+
+        self._labels: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        patterns: Dict[str, str] = {}
+        for skill_id, (label, aliases) in skills.items():
+            self._labels[skill_id] = label
+            for alias in (label, skill_id, *aliases):
+                key = normalize_skill(alias)
+                if not key:
+                    continue
+                self._aliases[key] = skill_id
+                if alias.lower() not in AMBIGUOUS_ALIASES:
+                    for spelling in _spellings(alias):
+                        patterns[spelling] = skill_id
+        self._matcher = AhoCorasick(patterns)
+
+    @staticmethod
+    def _load(path: str) -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+        with open(path, encoding="utf-8") as f:
+            extra = json.load(f)
+        logger.info("✅ Loaded %s skill definitions from %s", len(extra), path)
+        return {
+            skill_id: (entry.get("label") or skill_id, tuple(entry.get("aliases") or ()))
+            for skill_id, entry in extra.items()
+        }
+
+    def canonical(self, skill: str) -> str:
+        """Skill ID of a spelling; unknown skills get their normalized text"""
+        key = normalize_skill(skill)
+        return self._aliases.get(key, key)
+
+    def known(self, skill_id: str) -> bool:
+        return skill_id in self._labels
+
+    def label(self, skill_id: str) -> str:
+        """Display name of a skill ID (the ID itself if unknown)"""
+        return self._labels.get(skill_id, skill_id)
+
+    def scan(self, text: str) -> Set[str]:
+        """IDs of the dictionary skills mentioned in free text"""
+        text = " ".join((text or "").lower().split())
+        found = set()
+        for start, end, skill_id in self._matcher.finditer(text):
+            before = text[start - 2:start] if start > 1 else " " + text[:start]
+            # "js" in "node.js" is part of another name
+            joined = before[-1:] in _WORD_CHARS or before[-1:] == "." and before[:1] in _WORD_CHARS
+            if not joined and (end == len(text) or text[end] not in _WORD_CHARS):
+                found.add(skill_id)
+        return found
+
+    def skill_ids(self, skills: Iterable[str], resume_text: str = "") -> List[str]:
+        """
+        Canonical IDs of a candidate's skills
+
+        Args:
+            skills: Skills listed by the parser
+            resume_text: Scanned for further dictionary skills
+        """
+        ids = {self.canonical(skill) for skill in skills or [] if isinstance(skill, str)}
+        ids.discard("")
+        return sorted(ids | self.scan(resume_text))
+
+# Singleton instance
+skill_taxonomy = SkillTaxonomy(path=settings.SKILL_ALIASES_PATH)
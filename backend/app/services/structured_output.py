@@ -0,0 +1,170 @@
+"""
+Structured LLM output: tolerant JSON extraction, local repair, validation
+
+Every prompt that expects JSON goes through `generate`:
+
+1. `extract_json` takes the JSON value out of the reply, wherever it sits
+   (markdown fences, reasoning tags or prose around it)
+2. if it doesn't load, `repair_json` fixes what a model typically gets wrong
+   (trailing commas, comments, Python literals, smart quotes, output cut off
+   mid-object) without another call
+3. the value is validated against a pydantic schema (app.schemas.llm)
+4. only if that fails, one targeted retry: the model gets its own reply and
+   the error and is asked for the corrected JSON only
+
+If the retry fails too, StructuredOutputError is raised; callers never
+store placeholder data.
+"""
+import json
+import re
+from typing import Any, Dict, Type, TypeVar
+from langchain.schema import AIMessage, HumanMessage
+from pydantic import BaseModel, ValidationError
+from app.config.settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+Schema = TypeVar("Schema", bound=BaseModel)
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_REASONING = re.compile(r"<(think|thinking|reasoning)>.*?</\1>", re.DOTALL | re.IGNORECASE)
+_LINE_COMMENT = re.compile(r"^\s*//.*$", re.MULTILINE)
+# String literals are matched first and kept as they are, so only bare
+# Python literals and trailing commas outside strings are rewritten
+# ("Skills: None listed" or "a, ]" inside a value survive)
+_STRING = r'"(?:[^"\\]|\\.)*"'
+_PYTHON_LITERAL = re.compile(rf"{_STRING}|\b(True|False|None)\b")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_TRAILING_COMMA = re.compile(rf"{_STRING}|,\s*([}}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+# How often each path was taken in this process (read by benchmarks)
+stats: Dict[str, int] = {"parsed": 0, "repaired": 0, "retried": 0, "failed": 0}
+
+
+class StructuredOutputError(Exception):
+    """The model's reply couldn't be turned into the expected structure"""
+
+
+def _json_span(text: str) -> str:
+    """From the first '{' or '[' to the last matching closer (or the end if cut off)"""
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise StructuredOutputError("no JSON object in reply")
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]")
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def _close_truncated(text: str) -> str:
+    """Close an unterminated string and any open brackets, dropping a dangling key"""
+    stack = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+    text = re.sub(r',\s*"[^"]*"\s*:?\s*$', "", text.rstrip())
+    text = re.sub(r"[,:]\s*$", "", text)
+    return text + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """Cheap local fixes for almost-JSON"""
+    text = text.translate(_SMART_QUOTES)
+    text = _LINE_COMMENT.sub("", text)
+    # Strings closed first, so a cut-off one is skipped like the rest
+    text = _close_truncated(text)
+    text = _PYTHON_LITERAL.sub(
+        lambda match: _PYTHON_LITERALS[match.group(1)] if match.group(1) else match.group(0), text
+    )
+    return _TRAILING_COMMA.sub(lambda match: match.group(1) or match.group(0), text)
+
+
+def extract_json(content: str) -> Any:
+    """
+    The JSON value in an LLM reply, repairing it locally if needed
+
+    Raises:
+        StructuredOutputError: nothing loadable even after repair
+    """
+    text = _REASONING.sub("", content or "")
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    span = _json_span(text)
+
+    try:
+        value = json.loads(span)
+        stats["parsed"] += 1
+        return value
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        value = json.loads(repair_json(span))
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"invalid JSON: {e}") from None
+    stats["repaired"] += 1
+    return value
+
+
+def parse(content: str, schema: Type[Schema]) -> Schema:
+    """Extract, repair and validate one reply against `schema`"""
+    try:
+        return schema.model_validate(extract_json(content))
+    except ValidationError as e:
+        raise StructuredOutputError(
+            "; ".join(f"{'.'.join(map(str, error['loc'])) or 'value'}: {error['msg']}" for error in e.errors())
+        ) from None
+
+
+async def generate(llm, prompt: str, schema: Type[Schema], label: str = "LLM") -> Schema:
+    """
+    Run a JSON prompt and return the validated result
+
+    Args:
+        llm: Chat model with `ainvoke`
+        label: What is being generated, for logs
+
+    Raises:
+        StructuredOutputError: still invalid after LLM_OUTPUT_MAX_RETRIES targeted retries
+    """
+    messages = [HumanMessage(content=prompt)]
+    response = await llm.ainvoke(messages)
+
+    for attempt in range(settings.LLM_OUTPUT_MAX_RETRIES + 1):
+        try:
+            return parse(response.content, schema)
+        except StructuredOutputError as e:
+            if attempt == settings.LLM_OUTPUT_MAX_RETRIES:
+                stats["failed"] += 1
+                logger.error("❌ %s output unusable after %s retries: %s", label, attempt, e)
+                logger.debug("Response was: %s", response.content)
+                raise
+            stats["retried"] += 1
+            logger.warning("⚠️ %s output invalid (%s), asking for a correction", label, e)
+            # Only the correction is asked for; the original prompt is kept as
+            # context so the model doesn't have to redo the whole task
+            messages = messages[:1] + [
+                AIMessage(content=response.content),
+                HumanMessage(content=(
+                    f"Your reply could not be used: {e}. "
+                    "Reply with ONLY the corrected JSON object, no other text."
+                ))
+            ]
+            response = await llm.ainvoke(messages)
@@ -0,0 +1,253 @@
+"""
+Per-tenant in-memory store of candidate summaries
+
+Candidate lists and talent pool results render cards: name, contact
+details, score, recommendation, status, experience, matched skills and the
+first few strengths and concerns. Full rows carry the resume text, parsed
+data and evaluation besides, so they are read only for a candidate's
+detail view. Cards are served from compact `__slots__` records:
+- a job's candidate list is loaded with one lean query on first view, then
+  served from memory until SUMMARY_STORE_TTL_SECONDS pass;
+- search pages look records up by ID and read only the ones missing;
+- uploads, status changes, re-scoring and deletes write through, so this
+  worker's changes show up immediately. Other workers' changes show up
+  after the TTL.
+
+At most SUMMARY_STORE_MAX_RECORDS records are kept. When there are more,
+whole tenants are evicted, least recently used first; if the most recent
+tenant alone is over the limit, its least recently used jobs are dropped.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Set
+from postgrest import AsyncPostgrestClient
+from app.config.settings import settings
+
+SUMMARY_COLUMNS = (
+    "id, job_posting_id, name, email, phone, location, match_score, recommendation, "
+    "status, experience_years, skills_matched, strengths, concerns, created_at"
+)
+# Strengths / concerns shown on a card; the detail view reads the full row
+CARD_ITEMS = 3
+
+
+class CandidateSummary:
+    """Card fields of one candidate"""
+
+    __slots__ = (
+        "id", "job_posting_id", "name", "email", "phone", "location", "match_score", "recommendation",
+        "status", "experience_years", "skills_matched", "strengths", "concerns", "created_at", "loaded_at"
+    )
+    FIELDS = __slots__[:-1]
+    _LISTS = {"skills_matched": None, "strengths": CARD_ITEMS, "concerns": CARD_ITEMS}
+
+    def __init__(self, row: Dict, loaded_at: float):
+        for field in self.FIELDS:
+            self._set(field, row.get(field))
+        self.loaded_at = loaded_at
+
+    def _set(self, field: str, value) -> None:
+        if field in self._LISTS:
+            value = tuple((value or [])[:self._LISTS[field]])
+        elif field == "job_posting_id" and value is not None:
+            value = int(value)
+        setattr(self, field, value)
+
+    def update(self, changes: Dict) -> None:
+        for field, value in changes.items():
+            if field in self.FIELDS:
+                self._set(field, value)
+
+    def to_dict(self) -> Dict:
+        summary = {field: getattr(self, field) for field in self.FIELDS}
+        for field in self._LISTS:
+            summary[field] = list(summary[field])
+        return summary
+
+
+class TenantSummaries:
+    __slots__ = ("records", "jobs", "job_loaded_at")
+
+    def __init__(self):
+        self.records: Dict[int, CandidateSummary] = {}
+        # Job ID -> IDs of its candidates in `records`, least recently used first
+        self.jobs: "OrderedDict[int, Set[int]]" = OrderedDict()
+        # Job ID -> when its whole candidate list was last read
+        self.job_loaded_at: Dict[int, float] = {}
+
+    def put(self, record: CandidateSummary) -> None:
+        previous = self.records.get(record.id)
+        if previous is not None and previous.job_posting_id != record.job_posting_id:
+            self.jobs.get(previous.job_posting_id, set()).discard(record.id)
+        self.records[record.id] = record
+        self.jobs.setdefault(record.job_posting_id, set()).add(record.id)
+
+    def remove(self, candidate_id: int) -> None:
+        record = self.records.pop(candidate_id, None)
+        if record is not None:
+            self.jobs.get(record.job_posting_id, set()).discard(candidate_id)
+
+    def touch(self, job_id: int) -> None:
+        if job_id in self.jobs:
+            self.jobs.move_to_end(job_id)
+
+    def drop_job(self, job_id: int) -> None:
+        for candidate_id in self.jobs.pop(job_id, set()):
+            self.records.pop(candidate_id, None)
+        self.job_loaded_at.pop(job_id, None)
+
+
+class SummaryStore:
+    def __init__(self):
+        self._tenants: "OrderedDict[int, TenantSummaries]" = OrderedDict()
+        # Records across all tenants, kept up to date by every change
+        self._size = 0
+
+    def _fresh(self, loaded_at: float | None) -> bool:
+        return loaded_at is not None and time.monotonic() - loaded_at <= settings.SUMMARY_STORE_TTL_SECONDS
+
+    def _tenant(self, tenant_id: int) -> TenantSummaries:
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            tenant = self._tenants[tenant_id] = TenantSummaries()
+        self._tenants.move_to_end(tenant_id)
+        return tenant
+
+    def _evict(self) -> None:
+        while self._size > settings.SUMMARY_STORE_MAX_RECORDS and len(self._tenants) > 1:
+            _, tenant = self._tenants.popitem(last=False)
+            self._size -= len(tenant.records)
+        if self._size > settings.SUMMARY_STORE_MAX_RECORDS and self._tenants:
+            tenant = next(reversed(self._tenants.values()))
+            while self._size > settings.SUMMARY_STORE_MAX_RECORDS and tenant.jobs:
+                before = len(tenant.records)
+                tenant.drop_job(next(iter(tenant.jobs)))
+                self._size -= before - len(tenant.records)
+
+    async def job_candidates(self, db: AsyncPostgrestClient, tenant_id: int, job_id: int) -> List[Dict]:
+        """
+        Summaries of a job's candidates, best match first
+
+        Returns:
+            List of summary dicts (SUMMARY_COLUMNS)
+        """
+        if not settings.SUMMARY_STORE_ENABLED:
+            result = await db.table("candidates")\
+                .select(SUMMARY_COLUMNS)\
+                .eq("job_posting_id", job_id)\
+                .eq("tenant_id", tenant_id)\
+                .order("match_score", desc=True)\
+                .execute()
+            return result.data
+
+        tenant = self._tenant(tenant_id)
+        if not self._fresh(tenant.job_loaded_at.get(job_id)):
+            started = time.monotonic()
+            result = await db.table("candidates")\
+                .select(SUMMARY_COLUMNS)\
+                .eq("job_posting_id", job_id)\
+                .eq("tenant_id", tenant_id)\
+                .execute()
+            loaded = {row["id"] for row in result.data}
+            before = len(tenant.records)
+            # Drop rows deleted elsewhere, but keep ones written through during the read
+            for candidate_id in list(tenant.jobs.get(job_id, ())):
+                if candidate_id not in loaded and tenant.records[candidate_id].loaded_at < started:
+                    tenant.remove(candidate_id)
+            for row in result.data:
+                tenant.put(CandidateSummary(row, started))
+            tenant.job_loaded_at[job_id] = started
+            self._size += len(tenant.records) - before
+        tenant.touch(job_id)
+
+        records = [tenant.records[candidate_id] for candidate_id in tenant.jobs.get(job_id, ())]
+        records.sort(key=lambda record: record.match_score or 0, reverse=True)
+        summaries = [record.to_dict() for record in records]
+        # After reading, so a job larger than the limit is still served in full
+        self._evict()
+        return summaries
+
+    async def get_many(self, db: AsyncPostgrestClient, tenant_id: int, candidate_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Summaries by candidate ID, reading only the ones not in memory
+
+        Returns:
+            {candidate ID: summary dict}; deleted candidates are absent
+        """
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        if not candidate_ids:
+            return {}
+        if not settings.SUMMARY_STORE_ENABLED:
+            result = await db.table("candidates")\
+                .select(SUMMARY_COLUMNS)\
+                .in_("id", candidate_ids)\
+                .eq("tenant_id", tenant_id)\
+                .execute()
+            return {row["id"]: row for row in result.data}
+
+        tenant = self._tenant(tenant_id)
+        missing = [
+            candidate_id for candidate_id in candidate_ids
+            if candidate_id not in tenant.records or not self._fresh(tenant.records[candidate_id].loaded_at)
+        ]
+        if missing:
+            started = time.monotonic()
+            result = await db.table("candidates")\
+                .select(SUMMARY_COLUMNS)\
+                .in_("id", missing)\
+                .eq("tenant_id", tenant_id)\
+                .execute()
+            before = len(tenant.records)
+            for candidate_id in missing:
+                tenant.remove(candidate_id)
+            for row in result.data:
+                tenant.put(CandidateSummary(row, started))
+            self._size += len(tenant.records) - before
+
+        summaries = {
+            candidate_id: tenant.records[candidate_id].to_dict()
+            for candidate_id in candidate_ids if candidate_id in tenant.records
+        }
+        for job_id in {summary["job_posting_id"] for summary in summaries.values()}:
+            tenant.touch(job_id)
+        self._evict()
+        return summaries
+
+    # Write-through
+
+    def add(self, tenant_id: int, rows: List[Dict]) -> None:
+        """New candidates rows (full or SUMMARY_COLUMNS)"""
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            return
+        now = time.monotonic()
+        before = len(tenant.records)
+        for row in rows:
+            tenant.put(CandidateSummary(row, now))
+        self._size += len(tenant.records) - before
+        self._evict()
+
+    def update(self, tenant_id: int, candidate_id: int, changes: Dict) -> None:
+        tenant = self._tenants.get(tenant_id)
+        record = tenant.records.get(candidate_id) if tenant else None
+        if record is not None:
+            record.update(changes)
+
+    def remove(self, tenant_id: int, candidate_id: int) -> None:
+        tenant = self._tenants.get(tenant_id)
+        if tenant is not None:
+            before = len(tenant.records)
+            tenant.remove(candidate_id)
+            self._size -= before - len(tenant.records)
+
+    def drop_job(self, tenant_id: int, job_id: int) -> None:
+        """Forget a job's candidates, e.g. after they were re-scored in bulk or deleted"""
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            return
+        before = len(tenant.records)
+        tenant.drop_job(job_id)
+        self._size -= before - len(tenant.records)
+
+# Singleton instance
+summary_store = SummaryStore()
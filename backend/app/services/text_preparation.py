@@ -0,0 +1,362 @@
+"""
+Resume text preparation for LLM prompts and embeddings
+
+Instead of hard character cuts (`resume_text[:4000]`), text is normalized,
+stripped of boilerplate, split into sections and then the most useful
+sections for each purpose are packed into a token budget measured with a
+real tokenizer. Selected sections are emitted in their original order.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+from app.config.settings import settings
+from app.config.logging_config import logger
+
+TokenCounter = Callable[[str], int]
+
+# Canonical section -> heading keywords (matched against a short heading line)
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("summary", "professional summary", "profile", "about me", "objective", "career objective"),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history",
+    ),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "competencies", "technologies", "tech stack"),
+    "projects": ("projects", "personal projects", "key projects", "selected projects"),
+    "education": ("education", "academic background", "qualifications", "academics"),
+    "certifications": ("certifications", "certificates", "licenses", "courses", "training"),
+    "achievements": ("achievements", "awards", "honors", "accomplishments"),
+    "publications": ("publications", "research"),
+    "languages": ("languages",),
+    "volunteer": ("volunteer", "volunteering", "volunteer experience"),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "references": ("references",),
+}
+
+_HEADING_LOOKUP = {keyword: section for section, keywords in SECTION_HEADINGS.items() for keyword in keywords}
+
+# Section order by usefulness for each purpose; sections not listed are dropped.
+# "header" is whatever precedes the first heading (name, contact details).
+SECTION_PRIORITY: Dict[str, Tuple[str, ...]] = {
+    "parse": (
+        "header", "summary", "experience", "skills", "education", "certifications",
+        "projects", "other", "achievements", "languages", "publications", "volunteer",
+    ),
+    "score": (
+        "summary", "skills", "experience", "projects", "certifications",
+        "education", "achievements", "other", "publications",
+    ),
+}
+# Sections embedded as chunks, most useful first
+_CHUNK_PRIORITY = (
+    "skills", "summary", "experience", "projects", "certifications", "education",
+    "other", "achievements", "publications", "volunteer", "header",
+)
+
+# Longer lines aren't contact details, even before the first heading
+_HEADER_MAX_LINE_CHARS = 200
+
+_BOILERPLATE = re.compile(
+    r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d{1,3}|curriculum vitae|resume|r[eé]sum[eé]|cv"
+    r"|references (are )?available (up)?on request\.?|confidential)$",
+    re.IGNORECASE
+)
+_JOB_BOILERPLATE = re.compile(
+    r"(equal opportunity employer|we are an equal|eeo|all qualified applicants|"
+    r"reasonable accommodation|apply now|click apply|benefits include|perks:|what we offer)",
+    re.IGNORECASE
+)
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff\u00ad"), None)
+_BULLETS = re.compile(r"^[\u2022\u25cf\u25aa\u25a0\u2023\u2043\u2219\u00b7*-]+\s*")
+_INLINE_SPACE = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+_SENTENCE_END = re.compile(r"[.!?;](?=\s)")
+
+
+@dataclass(frozen=True)
+class Section:
+    name: str
+    lines: Tuple[str, ...]
+    position: int
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize extracted text
+
+    NFKC folds ligatures (ﬁ -> fi) and full-width forms, zero-width and soft
+    hyphen characters are dropped, bullets are unified, inline whitespace is
+    collapsed and runs of blank lines are reduced to one.
+    """
+    text = unicodedata.normalize("NFKC", text).translate(_ZERO_WIDTH)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    lines = []
+    blank = False
+    for raw_line in text.split("\n"):
+        line = _INLINE_SPACE.sub(" ", raw_line).strip()
+        if line and _BULLETS.match(line):
+            rest = _BULLETS.sub("", line)
+            line = f"- {rest}" if rest else ""
+        if not line:
+            if lines and not blank:
+                lines.append("")
+            blank = True
+            continue
+        lines.append(line)
+        blank = False
+
+    return "\n".join(lines).strip()
+
+
+def _heading_for(line: str) -> str | None:
+    if len(line) > 40:
+        return None
+    key = line.strip(" :-").lower()
+    key = re.sub(r"[^a-z &]", "", key).replace("&", "and").strip()
+    return _HEADING_LOOKUP.get(key)
+
+
+@lru_cache(maxsize=64)
+def split_sections(text: str) -> Tuple[Section, ...]:
+    """
+    Normalize, drop boilerplate and split into sections
+
+    Lines repeated 3+ times (page headers/footers) are kept only once.
+    Cached because one resume is prepared for parsing, scoring and embedding.
+    """
+    lines = normalize_text(text).split("\n")
+
+    counts: Dict[str, int] = {}
+    for line in lines:
+        if line and len(line) < 80:
+            counts[line] = counts.get(line, 0) + 1
+
+    sections: List[Section] = []
+    current_name = "header"
+    current: List[str] = []
+    seen_repeated = set()
+
+    def flush():
+        if any(current):
+            sections.append(Section(current_name, tuple(current), len(sections)))
+
+    for line in lines:
+        if line and _BOILERPLATE.match(line):
+            continue
+        if counts.get(line, 0) >= 3:
+            if line in seen_repeated:
+                continue
+            seen_repeated.add(line)
+
+        heading = _heading_for(line) if line else None
+        if heading:
+            flush()
+            current_name = heading
+            current = [line]
+            continue
+
+        if current_name == "header" and line and (len(current) >= 8 or len(line) > _HEADER_MAX_LINE_CHARS):
+            # Long preamble or paragraph without headings: treat the rest as body text
+            flush()
+            current_name = "other"
+            current = []
+        current.append(line)
+
+    flush()
+    return tuple(sections)
+
+
+class _Tokenizer:
+    """
+    LLM token counter
+
+    Uses tiktoken (cl100k_base) when it is installed and its encoding can be
+    loaded; otherwise falls back to a ~4 characters per token estimate.
+    """
+
+    def __init__(self):
+        self._encoding = None
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(settings.LLM_TOKENIZER_ENCODING)
+        except Exception as e:
+            logger.warning("⚠️ tiktoken unavailable (%s), estimating tokens from length", e)
+
+    def count(self, text: str) -> int:
+        if not self._loaded:
+            self._load()
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+
+llm_tokenizer = _Tokenizer()
+
+
+def count_llm_tokens(text: str) -> int:
+    """Number of LLM tokens in `text`"""
+    return llm_tokenizer.count(text)
+
+
+def truncate_to_tokens(text: str, limit: int, count_tokens: TokenCounter = count_llm_tokens) -> str:
+    """
+    Longest prefix of `text` within `limit` tokens
+
+    Cut at the last sentence end in the prefix, else at the last space;
+    a single unbroken word is cut mid-word.
+    """
+    if limit <= 0:
+        return ""
+    if count_tokens(text) <= limit:
+        return text
+
+    # Longest fitting character prefix (token counts grow with length)
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= limit:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = text[:low]
+
+    sentence_ends = [match.end() for match in _SENTENCE_END.finditer(prefix + " ")]
+    if sentence_ends and sentence_ends[-1] >= len(prefix) // 2:
+        return prefix[:sentence_ends[-1]]
+    space = prefix.rfind(" ")
+    if space > 0:
+        return prefix[:space].rstrip()
+    return prefix
+
+
+def split_long_line(line: str, limit: int, count_tokens: TokenCounter = count_llm_tokens) -> List[str]:
+    """Split a line into pieces of at most `limit` tokens (see truncate_to_tokens)"""
+    pieces = []
+    rest = line
+    while rest:
+        piece = truncate_to_tokens(rest, limit, count_tokens)
+        if not piece:
+            break
+        pieces.append(piece)
+        rest = rest[len(piece):].lstrip()
+    return pieces
+
+
+def fit_sections(
+    sections: Tuple[Section, ...],
+    purpose: str,
+    budget: int,
+    count_tokens: TokenCounter = count_llm_tokens
+) -> str:
+    """
+    Pack the most useful sections for `purpose` into `budget` tokens
+
+    Sections are taken in SECTION_PRIORITY order; the first one that doesn't
+    fit is cut at a line boundary (a line longer than what is left is cut
+    at a sentence or word boundary) and packing stops. The result keeps the
+    document's original section order.
+    """
+    priority = SECTION_PRIORITY[purpose]
+    ranked = sorted(
+        (section for section in sections if section.name in priority),
+        key=lambda section: (priority.index(section.name), section.position)
+    )
+
+    chosen: Dict[int, List[str]] = {}
+    remaining = budget
+    for section in ranked:
+        section_text = "\n".join(section.lines)
+        tokens = count_tokens(section_text) + 1
+        if tokens <= remaining:
+            chosen[section.position] = list(section.lines)
+            remaining -= tokens
+            continue
+
+        partial = []
+        for line in section.lines:
+            line_tokens = count_tokens(line) + 1
+            if line_tokens > remaining:
+                partial.append(truncate_to_tokens(line, remaining - 1, count_tokens))
+                break
+            partial.append(line)
+            remaining -= line_tokens
+        if any(partial):
+            chosen[section.position] = partial
+        break
+
+    return "\n\n".join("\n".join(chosen[position]).strip() for position in sorted(chosen)).strip()
+
+
+def prepare_for_parsing(resume_text: str) -> str:
+    """Resume text for the structured-extraction prompt (keeps contact header)"""
+    return fit_sections(split_sections(resume_text), "parse", settings.PARSE_PROMPT_TOKEN_BUDGET)
+
+
+def prepare_for_scoring(resume_text: str, budget: int | None = None) -> str:
+    """Resume text for the scoring prompt (no contact header or hobbies)"""
+    return fit_sections(split_sections(resume_text), "score", budget or settings.SCORE_PROMPT_TOKEN_BUDGET)
+
+
+def prepare_job_description(description: str) -> str:
+    """Job description for prompts, without EEO/benefits boilerplate"""
+    lines = [
+        line for line in normalize_text(description).split("\n")
+        if not _JOB_BOILERPLATE.search(line)
+    ]
+    body = Section("other", tuple(lines), 0)
+    return fit_sections((body,), "score", settings.JOB_DESCRIPTION_TOKEN_BUDGET)
+
+
+def chunk_sections(
+    resume_text: str,
+    count_tokens: TokenCounter,
+    max_tokens: int,
+    max_chunks: int
+) -> List[str]:
+    """
+    Split a resume into section-aware chunks for multi-vector embedding
+
+    Each chunk stays within one section, is at most `max_tokens` long and
+    starts with its section heading so it carries context on its own. Long
+    sections are split at line boundaries, long lines at sentence or word
+    boundaries. Sections are taken in priority order until `max_chunks` is
+    reached.
+    """
+    sections = sorted(
+        (section for section in split_sections(resume_text) if section.name in _CHUNK_PRIORITY),
+        key=lambda section: (_CHUNK_PRIORITY.index(section.name), section.position)
+    )
+
+    chunks: List[str] = []
+    for section in sections:
+        heading = section.name.upper() if _heading_for(section.lines[0]) is None else section.lines[0]
+        prefix_tokens = count_tokens(heading) + 1
+        body = [
+            piece
+            for line in section.lines if line and line != heading
+            for piece in split_long_line(line, max_tokens - prefix_tokens - 1, count_tokens)
+        ]
+
+        current: List[str] = []
+        used = prefix_tokens
+        for line in body:
+            line_tokens = count_tokens(line) + 1
+            if current and used + line_tokens > max_tokens:
+                chunks.append(heading + "\n" + "\n".join(current))
+                if len(chunks) >= max_chunks:
+                    return chunks
+                current, used = [], prefix_tokens
+            current.append(line)
+            used += line_tokens
+        if current:
+            chunks.append(heading + "\n" + "\n".join(current))
+            if len(chunks) >= max_chunks:
+                return chunks
+
+    return chunks
@@ -0,0 +1,397 @@
+"""
+Vector store backend selection and the in-process quantized store
+
+VECTOR_STORE_BACKEND picks where resume chunk vectors live:
+- "pinecone": the managed index (PineconeService)
+- "local": LocalVectorStore, an in-process store that keeps vectors as
+  NumPy buffers at VECTOR_STORE_PRECISION (float32, float16 or int8)
+
+Both take the embedding ModelSpec on every call and keep each model
+version in its own namespace (see app.services.embedding_models).
+
+With int8, search runs a fast int8 dot-product pass over the tenant's
+vectors with an int8-quantized query, keeps the best
+`top_k * VECTOR_RESCORE_FACTOR` chunks and rescores only those against the
+unquantized float32 query. Original vectors aren't kept (that would cost
+more memory than float16), so the rescore removes the query's quantization
+error but not the stored vectors'. Recall stays a little below float16's
+(about 0.97 against 0.997 in benchmarks/vector_search.py); use float16
+where that gap matters.
+"""
+import glob
+import json
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from app.config.settings import settings
+from app.services.embedding_models import ModelSpec, default_model_spec
+from app.utils import quantization
+from app.utils.vectors import (
+    candidate_vector_ids,
+    chunk_vector_id,
+    legacy_vector_id,
+    parse_vector_id,
+    rank_candidates
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LocalVectorIndex:
+    """
+    One namespace of the in-process store (a single model version)
+
+    Rows live in preallocated arrays that grow by doubling; deleted rows are
+    reused. Tenant and candidate IDs are kept in their own columns so the
+    tenant filter and a `{"candidate_id": {"$in": [...]}}` prefilter are
+    vectorized masks instead of a scan over metadata dicts.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        precision: str = "int8",
+        rescore_factor: int = 4,
+        path: str | None = None
+    ):
+        if precision not in quantization.PRECISIONS:
+            raise ValueError(f"Unsupported vector precision: {precision}")
+
+        self.enabled = True
+        self.dimension = dimension
+        self.precision = precision
+        self.rescore_factor = max(rescore_factor, 1)
+        self.path = path
+        self._lock = threading.Lock()
+        self._allocate(1024)
+
+        if path and os.path.exists(f"{path}.npz"):
+            self.load()
+
+    def _allocate(self, capacity: int) -> None:
+        self._codes = np.zeros((capacity, self.dimension), dtype=self.precision)
+        self._scales = np.ones(capacity, dtype=np.float32)
+        self._tenants = np.full(capacity, -1, dtype=np.int64)
+        self._candidates = np.full(capacity, -1, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._ids: List[str | None] = [None] * capacity
+        self._metadata: List[Dict | None] = [None] * capacity
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+
+    def _grow(self) -> None:
+        capacity = len(self._alive) * 2
+        extra = capacity - len(self._alive)
+        self._codes = np.concatenate([self._codes, np.zeros((extra, self.dimension), dtype=self._codes.dtype)])
+        self._scales = np.concatenate([self._scales, np.ones(extra, dtype=np.float32)])
+        self._tenants = np.concatenate([self._tenants, np.full(extra, -1, dtype=np.int64)])
+        self._candidates = np.concatenate([self._candidates, np.full(extra, -1, dtype=np.int64)])
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        self._ids.extend([None] * extra)
+        self._metadata.extend([None] * extra)
+
+    def _row_for(self, vector_id: str) -> int:
+        row = self._rows.get(vector_id)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._size == len(self._alive):
+                self._grow()
+            row = self._size
+            self._size += 1
+        self._rows[vector_id] = row
+        return row
+
+    def upsert(self, vector_ids: List[str], vectors, metadata: List[Dict]) -> None:
+        """Insert or replace vectors (float32 array or list of vectors)"""
+        codes, scales = quantization.encode(quantization.normalize(vectors), self.precision)
+        with self._lock:
+            for position, vector_id in enumerate(vector_ids):
+                row = self._row_for(vector_id)
+                self._codes[row] = codes[position]
+                if scales is not None:
+                    self._scales[row] = scales[position]
+                self._tenants[row] = int(metadata[position].get("tenant_id", -1))
+                self._candidates[row] = parse_vector_id(vector_id)
+                self._alive[row] = True
+                self._ids[row] = vector_id
+                self._metadata[row] = metadata[position]
+
+    def delete(self, vector_ids: List[str]) -> None:
+        with self._lock:
+            for vector_id in vector_ids:
+                row = self._rows.pop(vector_id, None)
+                if row is None:
+                    continue
+                self._alive[row] = False
+                self._tenants[row] = -1
+                self._candidates[row] = -1
+                self._ids[row] = None
+                self._metadata[row] = None
+                self._free.append(row)
+
+    def _candidate_rows(self, filter_dict: Optional[Dict]) -> np.ndarray:
+        mask = self._alive[:self._size]
+        filters = dict(filter_dict or {})
+        if "tenant_id" in filters:
+            mask = mask & (self._tenants[:self._size] == int(filters.pop("tenant_id")))
+        if "candidate_id" in filters:
+            wanted = np.fromiter(filters.pop("candidate_id")["$in"], dtype=np.int64)
+            mask = mask & np.isin(self._candidates[:self._size], wanted)
+        rows = np.flatnonzero(mask)
+        if filters:
+            rows = np.array([
+                row for row in rows
+                if all(self._metadata[row].get(key) == value for key, value in filters.items())
+            ], dtype=np.int64)
+        return rows
+
+    def _approximate_scores(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if self.precision == "int8":
+            query_codes, query_scales = quantization.quantize_int8(query)
+            return quantization.int8_dot(self._codes, self._scales, query_codes[0], query_scales[0], rows)
+        return quantization.blocked_dot(self._codes, query, rows)
+
+    def search_resumes(self, query_embedding, top_k: int = 20, filter_dict: Optional[Dict] = None) -> List[Dict]:
+        """
+        Nearest chunk vectors by cosine similarity (vectors and queries are
+        normalized, so dot products are cosines)
+
+        Returns:
+            List of {id, score, metadata}, best first
+        """
+        query = quantization.normalize(query_embedding)[0]
+        with self._lock:
+            rows = self._candidate_rows(filter_dict)
+            if rows.size == 0:
+                return []
+
+            scores = self._approximate_scores(rows, query)
+
+            if self.precision == "int8":
+                # Stage two: rescore the best approximate matches against the
+                # float32 query (the stored side stays the int8 reconstruction)
+                pool = min(rows.size, top_k * self.rescore_factor)
+                shortlist = np.argpartition(-scores, pool - 1)[:pool]
+                rows = rows[shortlist]
+                scores = quantization.dequantize_int8(self._codes[rows], self._scales[rows]) @ query
+
+            keep = min(rows.size, top_k)
+            best = np.argpartition(-scores, keep - 1)[:keep]
+            best = best[np.argsort(-scores[best])]
+            return [
+                {"id": self._ids[rows[i]], "score": float(scores[i]), "metadata": self._metadata[rows[i]]}
+                for i in best
+            ]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by live vectors (codes plus int8 scales)"""
+        return len(self._rows) * quantization.bytes_per_vector(self.dimension, self.precision)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def contains(self, vector_id: str) -> bool:
+        return vector_id in self._rows
+
+    def vector_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._rows)
+
+    def save(self) -> None:
+        """Persist vectors and metadata to `path`.npz / `path`.json"""
+        if not self.path:
+            return
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size])
+            np.savez(
+                f"{self.path}.npz",
+                codes=self._codes[rows],
+                scales=self._scales[rows]
+            )
+            with open(f"{self.path}.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "dimension": self.dimension,
+                    "precision": self.precision,
+                    "ids": [self._ids[row] for row in rows],
+                    "metadata": [self._metadata[row] for row in rows]
+                }, f)
+        logger.info("✅ Saved %s vectors to %s", rows.size, self.path)
+
+    def load(self) -> None:
+        """Load vectors saved by `save`, re-encoding if the precision changed"""
+        with open(f"{self.path}.json", encoding="utf-8") as f:
+            saved = json.load(f)
+        arrays = np.load(f"{self.path}.npz")
+        scales = arrays["scales"] if saved["precision"] == "int8" else None
+        vectors = quantization.decode(arrays["codes"], scales)
+        if len(saved["ids"]):
+            self.upsert(saved["ids"], vectors, saved["metadata"])
+        logger.info("✅ Loaded %s vectors from %s", len(saved["ids"]), self.path)
+
+
+class LocalVectorStore:
+    """
+    In-process vector store with the same interface as PineconeService
+
+    Holds one LocalVectorIndex per model namespace. With a `path`, each
+    namespace is saved to `{path}.{namespace}.npz/.json` on shutdown and
+    loaded back on start.
+    """
+
+    def __init__(self, precision: str = "int8", rescore_factor: int = 4, path: str | None = None):
+        if precision not in quantization.PRECISIONS:
+            raise ValueError(f"Unsupported vector precision: {precision}")
+
+        self.enabled = True
+        self.precision = precision
+        self.rescore_factor = rescore_factor
+        self.path = path
+        self._indexes: Dict[str, LocalVectorIndex] = {}
+        self._lock = threading.Lock()
+
+        if path:
+            for saved in glob.glob(f"{path}.*.json"):
+                namespace = saved[len(path) + 1:-len(".json")]
+                with open(saved, encoding="utf-8") as f:
+                    dimension = json.load(f)["dimension"]
+                self._indexes[namespace] = self._new_index(namespace, dimension)
+        logger.info("✅ Local vector store ready (%s, %s namespaces)", precision, len(self._indexes))
+
+    def _file(self, namespace: str) -> str | None:
+        return f"{self.path}.{namespace or 'default'}" if self.path else None
+
+    def _new_index(self, namespace: str, dimension: int) -> LocalVectorIndex:
+        return LocalVectorIndex(dimension, self.precision, self.rescore_factor, self._file(namespace))
+
+    def _index(self, model: ModelSpec, create: bool = False) -> LocalVectorIndex | None:
+        key = model.namespace or "default"
+        index = self._indexes.get(key)
+        if index is None and create:
+            with self._lock:
+                index = self._indexes.setdefault(key, self._new_index(model.namespace, model.dimension))
+        return index
+
+    def upsert_resume_chunks(
+        self,
+        candidate_id: int,
+        embeddings,
+        metadata: Dict,
+        model: ModelSpec | None = None
+    ) -> bool:
+        """Store one vector per resume chunk (see PineconeService.upsert_resume_chunks)"""
+        model = model or default_model_spec()
+        count = len(embeddings)
+        self._index(model, create=True).upsert(
+            [chunk_vector_id(candidate_id, chunk) for chunk in range(count)],
+            embeddings,
+            [{**metadata, "candidate_id": candidate_id, "chunk": chunk} for chunk in range(count)]
+        )
+        logger.info("✅ Stored %s chunks for candidate %s in local vector store", count, candidate_id)
+        return True
+
+    def delete_resume(self, candidate_id: int, model: ModelSpec | None = None) -> bool:
+        """Delete a resume's legacy vector and all of its chunk vectors"""
+        return self.delete_resumes([candidate_id], model)
+
+    def delete_resumes(self, candidate_ids: Iterable[int], model: ModelSpec | None = None) -> bool:
+        index = self._index(model or default_model_spec())
+        if index is not None:
+            index.delete([
+                vector_id
+                for candidate_id in candidate_ids
+                for vector_id in candidate_vector_ids(candidate_id, settings.EMBEDDING_MAX_CHUNKS)
+            ])
+        return True
+
+    def existing_candidates(self, candidate_ids: Iterable[int], model: ModelSpec | None = None) -> Set[int]:
+        """Which of these candidates have chunk vectors (see PineconeService.existing_candidates)"""
+        index = self._index(model or default_model_spec())
+        if index is None:
+            return set()
+        return {candidate_id for candidate_id in candidate_ids if index.contains(chunk_vector_id(candidate_id, 0))}
+
+    def delete_legacy_vectors(self, candidate_ids: Iterable[int], model: ModelSpec | None = None) -> bool:
+        index = self._index(model or default_model_spec())
+        if index is not None:
+            index.delete([legacy_vector_id(candidate_id) for candidate_id in candidate_ids])
+        return True
+
+    def list_candidate_ids(self, model: ModelSpec | None = None, page_size: int = 100) -> Iterator[List[int]]:
+        """Candidate IDs present in the model's namespace, one page at a time"""
+        index = self._index(model or default_model_spec())
+        if index is None:
+            return
+        candidate_ids = sorted({parse_vector_id(vector_id) for vector_id in index.vector_ids()})
+        for start in range(0, len(candidate_ids), page_size):
+            yield candidate_ids[start:start + page_size]
+
+    def search_resumes(
+        self,
+        query_embedding,
+        top_k: int = 20,
+        filter_dict: Optional[Dict] = None,
+        model: ModelSpec | None = None
+    ) -> List[Dict]:
+        """Nearest chunk vectors in the model's namespace"""
+        index = self._index(model or default_model_spec())
+        if index is None:
+            return []
+        return index.search_resumes(query_embedding, top_k, filter_dict)
+
+    def search_candidates(
+        self,
+        query_embedding,
+        top_k: int = 20,
+        filter_dict: Optional[Dict] = None,
+        model: ModelSpec | None = None
+    ) -> Tuple[List[Dict], bool]:
+        """Rank candidates by aggregated chunk similarity (see PineconeService.search_candidates)"""
+        return rank_candidates(
+            lambda chunk_top_k: self.search_resumes(query_embedding, chunk_top_k, filter_dict, model),
+            top_k,
+            settings.EMBEDDING_AGGREGATION,
+            settings.EMBEDDING_AGGREGATION_K,
+            settings.EMBEDDING_CHUNK_OVERSAMPLE,
+            # Enough for `top_k` candidates even if every chunk of each matches
+            top_k * (settings.EMBEDDING_MAX_CHUNKS + 1)
+        )
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": True,
+            "backend": "local",
+            "precision": self.precision,
+            "namespaces": {
+                namespace: {
+                    "total_vectors": len(index),
+                    "dimension": index.dimension,
+                    "memory_bytes": index.memory_bytes()
+                }
+                for namespace, index in self._indexes.items()
+            }
+        }
+
+    def save(self) -> None:
+        for index in self._indexes.values():
+            index.save()
+
+
+def _create_vector_store():
+    if settings.VECTOR_STORE_BACKEND == "local":
+        return LocalVectorStore(
+            precision=settings.VECTOR_STORE_PRECISION,
+            rescore_factor=settings.VECTOR_RESCORE_FACTOR,
+            path=settings.VECTOR_STORE_PATH or None
+        )
+
+    from app.services.pinecone_service import pinecone_service
+    return pinecone_service
+
+# Singleton instance
+vector_store = _create_vector_store()
@@ -0,0 +1,200 @@
+"""
+Keeping the vector store in step with the candidates table
+
+- `store_candidate_vectors` / `store_candidates_vectors`: embed and upsert
+  one or many candidates rows (bulk embeds all chunks in one encode call)
+- `VectorOutbox`: vector writes that failed during a request are recorded
+  in `vector_outbox` and retried in the background with exponential
+  backoff until they succeed or run out of attempts. Anything left after
+  that is fixed by the reconciliation task (app.tasks.reconcile).
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from postgrest import AsyncPostgrestClient
+from app.config.settings import settings
+from app.services.embedding_models import ModelSpec, get_model_spec
+from app.services.embedding_service import embedding_service
+from app.services.search_cache import search_cache
+from app.services.text_preparation import chunk_sections
+from app.services.vector_store import vector_store
+from app.utils.vectors import candidate_metadata
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns needed to rebuild a candidate's vectors
+VECTOR_SOURCE_COLUMNS = (
+    "id, tenant_id, job_posting_id, name, resume_text, parsed_data, "
+    "experience_years, match_score, recommendation"
+)
+
+
+def store_candidate_vectors(candidate: Dict, model: ModelSpec) -> bool:
+    """
+    Embed one candidates row and upsert its chunks
+
+    Returns:
+        False if there is no resume text to embed; raises if the store rejects it
+    """
+    resume_text = candidate.get("resume_text")
+    if not resume_text:
+        return False
+    _, embeddings = embedding_service.generate_resume_chunk_embeddings(resume_text, model)
+    if not vector_store.upsert_resume_chunks(
+        candidate_id=candidate["id"],
+        embeddings=embeddings,
+        metadata=candidate_metadata(candidate),
+        model=model
+    ):
+        raise RuntimeError(f"Vector store rejected candidate {candidate['id']}")
+    return True
+
+
+def store_candidates_vectors(candidates: List[Dict], model: ModelSpec) -> Tuple[List[int], List[int]]:
+    """
+    Embed many candidates rows with one encode call and upsert them
+
+    Returns:
+        (stored candidate IDs, failed candidate IDs)
+    """
+    backend = embedding_service.backend(model)
+    spans = []
+    texts: List[str] = []
+    for candidate in candidates:
+        resume_text = candidate.get("resume_text")
+        if not resume_text:
+            continue
+        chunks = chunk_sections(
+            resume_text,
+            backend.count_tokens,
+            backend.max_seq_length - 2,
+            settings.EMBEDDING_MAX_CHUNKS
+        ) or [resume_text]
+        spans.append((candidate, len(texts), len(texts) + len(chunks)))
+        texts.extend(chunks)
+
+    if not texts:
+        return [], []
+    embeddings = embedding_service.encode(texts, model)
+
+    stored, failed = [], []
+    for candidate, start, end in spans:
+        ok = vector_store.upsert_resume_chunks(
+            candidate_id=candidate["id"],
+            embeddings=embeddings[start:end],
+            metadata=candidate_metadata(candidate),
+            model=model
+        )
+        (stored if ok else failed).append(candidate["id"])
+    return stored, failed
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class VectorOutbox:
+    """
+    Durable retry queue for vector writes that failed inline
+
+    Upserts re-read the candidate row and deletes reuse the ID scheme, so
+    both are idempotent and several workers draining at once is harmless.
+    """
+
+    async def enqueue(
+        self,
+        db: AsyncPostgrestClient,
+        candidate_id: int,
+        tenant_id: int,
+        operation: str,
+        model: ModelSpec
+    ) -> None:
+        """Record a failed 'upsert' or 'delete' for background retry"""
+        try:
+            await db.table("vector_outbox").insert({
+                "candidate_id": candidate_id,
+                "tenant_id": tenant_id,
+                "operation": operation,
+                "model_version": model.version,
+                "next_attempt_at": _now().isoformat()
+            }).execute()
+            logger.info("Queued vector %s for candidate %s", operation, candidate_id)
+        except Exception as e:
+            # Reconciliation will still find the drift
+            logger.error("❌ Could not queue vector %s for candidate %s: %s", operation, candidate_id, e)
+
+    async def _apply(self, db: AsyncPostgrestClient, entry: Dict) -> None:
+        model = get_model_spec(entry["model_version"])
+        if entry["operation"] == "delete":
+            if not await asyncio.to_thread(vector_store.delete_resume, entry["candidate_id"], model):
+                raise RuntimeError("vector delete failed")
+        else:
+            result = await db.table("candidates")\
+                .select(VECTOR_SOURCE_COLUMNS)\
+                .eq("id", entry["candidate_id"])\
+                .execute()
+            if result.data:
+                await asyncio.to_thread(store_candidate_vectors, result.data[0], model)
+        # The candidate only now (dis)appears from search
+        search_cache.invalidate(entry["tenant_id"])
+
+    async def drain(self, db: AsyncPostgrestClient, limit: int | None = None) -> int:
+        """
+        Retry due outbox entries once
+
+        Returns:
+            Number of entries that succeeded
+        """
+        result = await db.table("vector_outbox")\
+            .select("*")\
+            .lte("next_attempt_at", _now().isoformat())\
+            .lt("attempts", settings.VECTOR_OUTBOX_MAX_ATTEMPTS)\
+            .order("next_attempt_at")\
+            .limit(limit or settings.VECTOR_OUTBOX_BATCH_SIZE)\
+            .execute()
+
+        done = 0
+        for entry in result.data:
+            try:
+                await self._apply(db, entry)
+            except Exception as e:
+                attempts = entry["attempts"] + 1
+                delay = min(
+                    settings.VECTOR_OUTBOX_BASE_DELAY_SECONDS * 2 ** (attempts - 1),
+                    settings.VECTOR_OUTBOX_MAX_DELAY_SECONDS
+                )
+                await db.table("vector_outbox")\
+                    .update({
+                        "attempts": attempts,
+                        "last_error": str(e)[:500],
+                        "next_attempt_at": (_now() + timedelta(seconds=delay)).isoformat()
+                    })\
+                    .eq("id", entry["id"])\
+                    .execute()
+                logger.warning(
+                    "⚠️ Vector %s retry %s failed for candidate %s: %s",
+                    entry["operation"], attempts, entry["candidate_id"], e
+                )
+                continue
+
+            await db.table("vector_outbox").delete().eq("id", entry["id"]).execute()
+            done += 1
+
+        if done:
+            logger.info("✅ Applied %s queued vector writes", done)
+        return done
+
+    async def run_forever(self, db: AsyncPostgrestClient) -> None:
+        """Background drainer; cancel the task to stop it"""
+        while True:
+            try:
+                await self.drain(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("❌ Vector outbox drain failed: %s", e)
+            await asyncio.sleep(settings.VECTOR_OUTBOX_INTERVAL_SECONDS)
+
+# Singleton instance
+vector_outbox = VectorOutbox()
@@ -0,0 +1,93 @@
+"""
+Fingerprint and link candidates uploaded before duplicate detection
+
+    python -m app.tasks.dedup --dry-run
+    python -m app.tasks.dedup --page-size 500
+
+Walks candidates without a fingerprint in id order, fingerprints each
+resume (email/phone from parsed_data) and links it to the earliest
+matching upload of the same person, exactly as ingestion would have.
+Rows are only ever compared with earlier rows, so the oldest upload stays
+canonical. Safe to rerun; already fingerprinted rows are skipped.
+"""
+import argparse
+import asyncio
+from typing import Dict, List
+from postgrest import AsyncPostgrestClient
+from app.config.database import supabase_db
+from app.config.logging_config import logger
+from app.services.dedup_service import dedup_service
+from app.utils.fingerprints import fingerprint_resume
+
+
+class DedupBackfill:
+    def __init__(self, db: AsyncPostgrestClient, page_size: int, dry_run: bool):
+        self.db = db
+        self.page_size = page_size
+        self.dry_run = dry_run
+        self.report = {"fingerprinted": 0, "exact": 0, "near": 0, "contact": 0}
+
+    async def _next_page(self, after_id: int) -> List[Dict]:
+        result = await self.db.table("candidates")\
+            .select("id, tenant_id, job_posting_id, resume_text, parsed_data")\
+            .is_("content_hash", "null")\
+            .gt("id", after_id)\
+            .order("id")\
+            .limit(self.page_size)\
+            .execute()
+        return result.data
+
+    async def run(self) -> Dict:
+        last_id = 0
+        while True:
+            page = await self._next_page(last_id)
+            if not page:
+                return self.report
+            last_id = page[-1]["id"]
+
+            for candidate in page:
+                if not candidate.get("resume_text"):
+                    continue
+                fingerprint = fingerprint_resume(candidate["resume_text"])\
+                    .with_contacts(candidate.get("parsed_data") or {})
+                duplicate = await dedup_service.find_duplicate(
+                    self.db,
+                    candidate["tenant_id"],
+                    fingerprint,
+                    job_posting_id=candidate["job_posting_id"],
+                    before_id=candidate["id"]
+                )
+                self.report["fingerprinted"] += 1
+                if duplicate:
+                    self.report[duplicate.kind] += 1
+                if self.dry_run:
+                    continue
+
+                await self.db.table("candidates")\
+                    .update({
+                        **fingerprint.columns(),
+                        "canonical_candidate_id": duplicate.canonical_id if duplicate else None
+                    })\
+                    .eq("id", candidate["id"])\
+                    .execute()
+
+            logger.info("Fingerprinted candidates up to id %s: %s", last_id, self.report)
+
+
+async def _main(args) -> None:
+    try:
+        report = await DedupBackfill(supabase_db.get_client(), args.page_size, args.dry_run).run()
+        logger.info("Duplicate backfill%s: %s", " (dry run)" if args.dry_run else "", report)
+    finally:
+        await supabase_db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="only report matches against rows fingerprinted already")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
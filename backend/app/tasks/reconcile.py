@@ -0,0 +1,150 @@
+"""
+Reconcile the vector store with the candidates table
+
+    python -m app.tasks.reconcile --dry-run
+    python -m app.tasks.reconcile --model-version minilm-l6-v2 --page-size 500
+    python -m app.tasks.reconcile --refresh --skip-purge
+
+1. Backfill: pages through candidate IDs, asks the vector store which of
+   them have chunk vectors and re-embeds the missing ones in bulk (one
+   encode call per page). Candidates with only a legacy single vector
+   count as missing: it has no `candidate_id` metadata, so faceted
+   searches on Pinecone can't find them. Once their chunk vectors are
+   stored, the legacy vector is deleted. With --refresh, every candidate
+   is re-embedded, which rewrites vector metadata written before a field
+   was added.
+2. Purge: pages through candidate IDs present in the vector store, looks
+   them up in the database and deletes vectors of candidates that no
+   longer exist, so searches stop spending top_k slots on ghosts.
+
+The vector write outbox is drained first, so retries that are about to
+succeed aren't duplicated. Safe to run while the API is serving.
+"""
+import argparse
+import asyncio
+from typing import Dict, List
+from postgrest import AsyncPostgrestClient
+from app.config.database import supabase_db
+from app.config.logging_config import logger
+from app.services.embedding_models import ModelSpec, get_model_spec, serving_model
+from app.services.vector_store import vector_store, LocalVectorStore
+from app.services.vector_sync import VECTOR_SOURCE_COLUMNS, store_candidates_vectors, vector_outbox
+
+
+class Reconciler:
+    def __init__(self, db: AsyncPostgrestClient, model: ModelSpec, page_size: int, dry_run: bool, refresh: bool = False):
+        self.db = db
+        self.model = model
+        self.page_size = page_size
+        self.dry_run = dry_run
+        self.refresh = refresh
+        self.report = {
+            "checked": 0,
+            "missing": 0,
+            "backfilled": 0,
+            "backfill_failed": 0,
+            "vector_candidates": 0,
+            "orphans": 0,
+            "purged": 0
+        }
+
+    async def _candidate_ids(self, after_id: int) -> List[int]:
+        result = await self.db.table("candidates")\
+            .select("id")\
+            .gt("id", after_id)\
+            .order("id")\
+            .limit(self.page_size)\
+            .execute()
+        return [row["id"] for row in result.data]
+
+    async def backfill(self) -> None:
+        last_id = 0
+        while True:
+            candidate_ids = await self._candidate_ids(last_id)
+            if not candidate_ids:
+                return
+            last_id = candidate_ids[-1]
+            self.report["checked"] += len(candidate_ids)
+
+            present = await asyncio.to_thread(vector_store.existing_candidates, candidate_ids, self.model)
+            missing = [candidate_id for candidate_id in candidate_ids if candidate_id not in present]
+            self.report["missing"] += len(missing)
+            if self.refresh:
+                missing = candidate_ids
+            if not missing or self.dry_run:
+                continue
+
+            rows = await self.db.table("candidates")\
+                .select(VECTOR_SOURCE_COLUMNS)\
+                .in_("id", missing)\
+                .execute()
+            stored, failed = await asyncio.to_thread(store_candidates_vectors, rows.data, self.model)
+            if stored and not await asyncio.to_thread(vector_store.delete_legacy_vectors, stored, self.model):
+                logger.warning("⚠️ Could not delete legacy vectors of candidates %s", stored)
+            self.report["backfilled"] += len(stored)
+            self.report["backfill_failed"] += len(missing) - len(stored)
+            if failed:
+                logger.warning("⚠️ Backfill failed for candidates %s", failed)
+            logger.info("Backfilled %s of %s candidates up to id %s", len(stored), len(missing), last_id)
+
+    async def purge(self) -> None:
+        pages = vector_store.list_candidate_ids(self.model, self.page_size)
+        while True:
+            candidate_ids = await asyncio.to_thread(next, pages, None)
+            if candidate_ids is None:
+                return
+            self.report["vector_candidates"] += len(candidate_ids)
+
+            result = await self.db.table("candidates")\
+                .select("id")\
+                .in_("id", candidate_ids)\
+                .execute()
+            existing = {row["id"] for row in result.data}
+            orphans = [candidate_id for candidate_id in candidate_ids if candidate_id not in existing]
+            self.report["orphans"] += len(orphans)
+            if not orphans or self.dry_run:
+                continue
+
+            if await asyncio.to_thread(vector_store.delete_resumes, orphans, self.model):
+                self.report["purged"] += len(orphans)
+                logger.info("Purged %s orphaned candidates", len(orphans))
+
+    async def run(self, backfill: bool = True, purge: bool = True) -> Dict:
+        if not self.dry_run:
+            await vector_outbox.drain(self.db)
+        if backfill:
+            await self.backfill()
+        if purge:
+            await self.purge()
+        return self.report
+
+
+async def _main(args) -> None:
+    db = supabase_db.get_client()
+    try:
+        model = get_model_spec(args.model_version) if args.model_version else await serving_model.get(db)
+        reconciler = Reconciler(db, model, args.page_size, args.dry_run, args.refresh)
+        report = await reconciler.run(backfill=not args.skip_backfill, purge=not args.skip_purge)
+        logger.info(
+            "Reconciliation of %s%s: %s",
+            model.version, " (dry run)" if args.dry_run else "", report
+        )
+    finally:
+        if isinstance(vector_store, LocalVectorStore) and not args.dry_run:
+            vector_store.save()
+        await supabase_db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-version", help="namespace to reconcile (default: serving version)")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="report drift without changing anything")
+    parser.add_argument("--refresh", action="store_true", help="re-embed every candidate, not only missing ones")
+    parser.add_argument("--skip-backfill", action="store_true")
+    parser.add_argument("--skip-purge", action="store_true")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
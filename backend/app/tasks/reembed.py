@@ -0,0 +1,208 @@
+"""
+Background re-embedding into a new embedding model version
+
+    python -m app.tasks.reembed --model-version mpnet-base-v2
+    python -m app.tasks.reembed --model-version mpnet-base-v2 --max-per-second 5 --no-switch
+    python -m app.tasks.reembed --model-version mpnet-base-v2 --switch-only
+
+Walks `candidates` in id order, embeds each resume with the target model
+and writes the chunks into that model's namespace while the current model
+keeps serving. Progress is checkpointed in `embedding_migrations` after
+every batch, so the job can be stopped and rerun at any time and resumes
+where it left off. Throughput is capped with --max-per-second.
+
+When no candidates are left the target becomes the serving version
+(status `active`; the previous one is `retired` and its vectors are kept
+for rollback). Workers pick the switch up within
+EMBEDDING_SERVING_CACHE_SECONDS; after that window the job sweeps once
+more for resumes uploaded with the old model in the meantime.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+from postgrest import AsyncPostgrestClient
+from app.config.database import supabase_db
+from app.config.settings import settings
+from app.config.logging_config import logger
+from app.services.embedding_models import ModelSpec, get_model_spec
+from app.services.vector_store import vector_store, LocalVectorStore
+from app.services.vector_sync import VECTOR_SOURCE_COLUMNS, store_candidate_vectors
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ReembedJob:
+    def __init__(
+        self,
+        db: AsyncPostgrestClient,
+        model: ModelSpec,
+        batch_size: int,
+        max_per_second: float
+    ):
+        self.db = db
+        self.model = model
+        self.batch_size = batch_size
+        self.max_per_second = max_per_second
+        self.state: Dict = {}
+
+    async def _load_state(self) -> Dict:
+        """Get or create this model version's migration row"""
+        result = await self.db.table("embedding_migrations")\
+            .select("*")\
+            .eq("model_version", self.model.version)\
+            .execute()
+        if result.data:
+            return result.data[0]
+
+        result = await self.db.table("embedding_migrations").insert({
+            "model_version": self.model.version,
+            "status": "running"
+        }).execute()
+        return result.data[0]
+
+    async def _save(self, **fields) -> None:
+        self.state.update(fields)
+        await self.db.table("embedding_migrations")\
+            .update({**fields, "updated_at": _now()})\
+            .eq("id", self.state["id"])\
+            .execute()
+
+    async def _next_batch(self, after_id: int) -> List[Dict]:
+        result = await self.db.table("candidates")\
+            .select(VECTOR_SOURCE_COLUMNS)\
+            .gt("id", after_id)\
+            .order("id")\
+            .limit(self.batch_size)\
+            .execute()
+        return result.data
+
+    async def _sweep(self) -> None:
+        """Embed every candidate after the checkpoint, batch by batch"""
+        while True:
+            batch = await self._next_batch(self.state["last_candidate_id"])
+            if not batch:
+                return
+
+            started = time.monotonic()
+            embedded = 0
+            for candidate in batch:
+                try:
+                    embedded += await asyncio.to_thread(store_candidate_vectors, candidate, self.model)
+                except Exception as e:
+                    # Stop at the failing row; the checkpoint still points before
+                    # it, so a rerun retries it
+                    await self._save(status="failed", error=f"candidate {candidate['id']}: {e}")
+                    raise
+                self.state["last_candidate_id"] = candidate["id"]
+
+            await self._save(
+                last_candidate_id=self.state["last_candidate_id"],
+                embedded_count=self.state["embedded_count"] + embedded,
+                error=None
+            )
+            logger.info(
+                "Re-embedded up to candidate %s (%s total) into %s",
+                self.state["last_candidate_id"], self.state["embedded_count"], self.model.version
+            )
+
+            # Throttle: a batch takes at least len(batch) / max_per_second seconds
+            if self.max_per_second > 0:
+                remaining = len(batch) / self.max_per_second - (time.monotonic() - started)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+
+    async def coverage(self) -> float:
+        """Share of current candidates at or below the checkpoint"""
+        total, covered = await asyncio.gather(
+            self.db.table("candidates").select("id", count="exact").limit(1).execute(),
+            self.db.table("candidates")\
+                .select("id", count="exact")\
+                .lte("id", self.state["last_candidate_id"])\
+                .limit(1)\
+                .execute()
+        )
+        total_count = total.count or 0
+        await self._save(total_count=total_count)
+        return 1.0 if total_count == 0 else (covered.count or 0) / total_count
+
+    async def switch_over(self) -> None:
+        """Make the target the serving version and retire the previous one"""
+        await self.db.table("embedding_migrations")\
+            .update({"status": "retired", "updated_at": _now()})\
+            .eq("status", "active")\
+            .neq("id", self.state["id"])\
+            .execute()
+        await self._save(status="active", completed_at=_now())
+        logger.info("✅ %s is now the serving embedding model", self.model.version)
+
+        # Uploads in other workers may use the old model until their cached
+        # serving version expires; pick those up once the window has passed
+        await asyncio.sleep(settings.EMBEDDING_SERVING_CACHE_SECONDS + 5)
+        await self._sweep()
+
+    async def run(self, switch: bool = True, switch_only: bool = False) -> Dict:
+        self.state = await self._load_state()
+        if self.state["status"] == "active":
+            logger.info("%s is already serving; sweeping new candidates only", self.model.version)
+            await self._sweep()
+            return self.state
+
+        await self._save(status="running", error=None)
+        logger.info(
+            "Re-embedding into %s from candidate %s",
+            self.model.version, self.state["last_candidate_id"]
+        )
+
+        if not switch_only:
+            await self._sweep()
+
+        coverage = await self.coverage()
+        logger.info("Coverage for %s: %.1f%%", self.model.version, coverage * 100)
+        if coverage < 1.0:
+            await self._save(status="paused", error=f"coverage {coverage:.2%}")
+            logger.warning("⚠️ Coverage below 100%%, not switching; rerun to continue")
+        elif switch:
+            await self.switch_over()
+        else:
+            await self._save(status="paused", error=None)
+            logger.info("Namespace complete; rerun with --switch-only to make it serve")
+        return self.state
+
+
+async def _main(args) -> None:
+    model = get_model_spec(args.model_version)
+    job = ReembedJob(
+        supabase_db.get_client(),
+        model,
+        batch_size=args.batch_size,
+        max_per_second=args.max_per_second
+    )
+    try:
+        state = await job.run(switch=not args.no_switch, switch_only=args.switch_only)
+        logger.info(
+            "Re-embedding %s: status=%s embedded=%s last_id=%s",
+            model.version, state["status"], state["embedded_count"], state["last_candidate_id"]
+        )
+    finally:
+        if isinstance(vector_store, LocalVectorStore):
+            vector_store.save()
+        await supabase_db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-version", required=True)
+    parser.add_argument("--batch-size", type=int, default=settings.REEMBED_BATCH_SIZE)
+    parser.add_argument("--max-per-second", type=float, default=settings.REEMBED_MAX_PER_SECOND,
+                        help="resumes embedded per second (0 = unthrottled)")
+    parser.add_argument("--no-switch", action="store_true", help="build the namespace but keep the current model serving")
+    parser.add_argument("--switch-only", action="store_true", help="switch to an already complete namespace")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
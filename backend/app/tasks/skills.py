@@ -0,0 +1,106 @@
+"""
+Compute canonical skill IDs for stored candidates
+
+    python -m app.tasks.skills --dry-run
+    python -m app.tasks.skills --all --page-size 500
+
+Walks candidates without skill IDs (every candidate with --all, e.g. after
+editing the alias dictionary) in id order. For each one it canonicalizes the
+parsed skills and scans the resume text (app.services.skill_taxonomy). It
+also recomputes skills_matched / skills_missing against the candidate's job,
+exactly as ingestion now does. Each page is written back in bulk, and the
+task is safe to rerun.
+"""
+import argparse
+import asyncio
+from typing import Dict, List
+from postgrest import AsyncPostgrestClient
+from app.config.database import supabase_db
+from app.config.logging_config import logger
+from app.services.local_scorer import local_scorer
+from app.services.skill_taxonomy import skill_taxonomy
+
+_COLUMNS = "id, job_posting_id, resume_text, parsed_data, skill_ids, ai_evaluation"
+_JOB_COLUMNS = "id, must_have_skills, nice_to_have_skills"
+
+
+class SkillBackfill:
+    def __init__(self, db: AsyncPostgrestClient, page_size: int, dry_run: bool, recompute: bool):
+        self.db = db
+        self.page_size = page_size
+        self.dry_run = dry_run
+        self.recompute = recompute
+        self.report = {"checked": 0, "changed": 0}
+
+    async def _next_page(self, after_id: int) -> List[Dict]:
+        query = self.db.table("candidates").select(_COLUMNS)
+        if not self.recompute:
+            query = query.is_("skill_ids", "null")
+        result = await query\
+            .gt("id", after_id)\
+            .order("id")\
+            .limit(self.page_size)\
+            .execute()
+        return result.data
+
+    async def _jobs(self, page: List[Dict]) -> Dict[int, Dict]:
+        job_ids = list({candidate["job_posting_id"] for candidate in page if candidate.get("job_posting_id")})
+        if not job_ids:
+            return {}
+        result = await self.db.table("job_postings")\
+            .select(_JOB_COLUMNS)\
+            .in_("id", job_ids)\
+            .execute()
+        return {job["id"]: job for job in result.data}
+
+    async def run(self) -> Dict:
+        last_id = 0
+        while True:
+            page = await self._next_page(last_id)
+            if not page:
+                return self.report
+            last_id = page[-1]["id"]
+            jobs = await self._jobs(page)
+
+            updates = []
+            for candidate in page:
+                resume_text = candidate.get("resume_text") or ""
+                skill_ids = skill_taxonomy.skill_ids((candidate.get("parsed_data") or {}).get("skills"), resume_text)
+                self.report["checked"] += 1
+                if skill_ids == candidate.get("skill_ids"):
+                    continue
+                self.report["changed"] += 1
+
+                columns = {"id": candidate["id"], "skill_ids": skill_ids}
+                job = jobs.get(candidate.get("job_posting_id"))
+                if job is not None:
+                    lists = local_scorer.skill_match(skill_ids, resume_text, job)
+                    columns.update(lists)
+                    if candidate.get("ai_evaluation"):
+                        columns["ai_evaluation"] = {**candidate["ai_evaluation"], **lists}
+                updates.append(columns)
+
+            if updates and not self.dry_run:
+                # Update-only: a candidate deleted since the read isn't recreated
+                await self.db.rpc("backfill_skill_ids", {"p_updates": updates}).execute()
+            logger.info("Skill IDs computed up to id %s: %s", last_id, self.report)
+
+
+async def _main(args) -> None:
+    try:
+        report = await SkillBackfill(supabase_db.get_client(), args.page_size, args.dry_run, args.all).run()
+        logger.info("Skill backfill%s: %s", " (dry run)" if args.dry_run else "", report)
+    finally:
+        await supabase_db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--all", action="store_true", help="recompute candidates that already have skill IDs")
+    parser.add_argument("--dry-run", action="store_true", help="only count candidates whose skill IDs would change")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Aho-Corasick multi-pattern matcher
+
+Finds every occurrence of any number of patterns in one pass over the text,
+O(text length + matches) regardless of how many patterns there are. Used
+to spot skill aliases in resume text (app.services.skill_taxonomy).
+"""
+from collections import deque
+from typing import Dict, Generic, Iterator, List, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class AhoCorasick(Generic[V]):
+    """
+    Automaton over a fixed set of patterns
+
+    Args:
+        patterns: {pattern: value reported when it matches}
+    """
+
+    def __init__(self, patterns: Dict[str, V]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (pattern length, value) of every pattern ending there
+        self._out: List[List[Tuple[int, V]]] = [[]]
+
+        for pattern, value in patterns.items():
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                state = self._goto[state].setdefault(char, self._new_state())
+            self._out[state].append((len(pattern), value))
+
+        # Breadth-first, so a state's failure target is final before its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _new_state(self) -> int:
+        self._goto.append({})
+        self._fail.append(0)
+        self._out.append([])
+        return len(self._goto) - 1
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, V]]:
+        """(start, end, value) of every match, overlapping ones included"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in out[state]:
+                yield position + 1 - length, position + 1, value
@@ -0,0 +1,115 @@
+"""
+Shared authentication dependency
+
+Every router uses `get_current_user` from here. Verified tokens are kept in
+a small bounded cache so repeated requests with the same bearer token
+(dashboard polling, search-as-you-type) skip the full JWT decode.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.config.settings import settings
+from app.utils.jwt import decode_token
+
+security = HTTPBearer()
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWT payloads
+
+    Entries are keyed by a prefix of an HMAC-SHA256 digest of the token (the
+    raw token is never stored) and confirmed with a constant-time compare of
+    the full digest. An entry lives until the token's `exp` claim or the
+    cache TTL, whichever comes first.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._key = hashlib.sha256(settings.SECRET_KEY.encode("utf-8")).digest()
+
+    def _digest(self, token: str) -> bytes:
+        return hmac.new(self._key, token.encode("utf-8"), hashlib.sha256).digest()
+
+    def get(self, token: str) -> dict | None:
+        """Return the cached payload for a token, or None on miss/expiry"""
+        digest = self._digest(token)
+        key = digest[:16]
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            full_digest, expires_at, payload = entry
+            if not hmac.compare_digest(full_digest, digest):
+                return None
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        """Cache a verified payload until its expiry"""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest[:16]] = (digest, expires_at, payload)
+            self._entries.move_to_end(digest[:16])
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    max_size=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS
+)
+
+
+def verify_token(token: str) -> dict | None:
+    """
+    Verify a bearer token, using the cache when possible
+
+    Args:
+        token: JWT token string
+
+    Returns:
+        Decoded payload dict or None if invalid/expired
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    payload = decode_token(token)
+    if payload:
+        token_cache.put(token, payload)
+    return payload
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Extract user info from JWT token"""
+    payload = verify_token(credentials.credentials)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return payload
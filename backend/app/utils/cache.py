@@ -0,0 +1,76 @@
+"""
+Tenant-versioned in-process cache
+
+Each tenant has a version counter that is part of every cache key. Writes
+bump the version instead of hunting down individual keys, so invalidation is
+O(1) and stale entries simply become unreachable and age out of the LRU.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TenantVersionedCache:
+    """Bounded LRU + TTL cache whose keys are scoped to a tenant version"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Distinguishes this process's versions from another worker's (or a
+        # restarted process's) when versions are exposed, e.g. in ETags
+        self.epoch = secrets.token_hex(4)
+        self._versions: dict = {}
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, tenant_id: int) -> int:
+        """Current version for a tenant"""
+        return self._versions.get(tenant_id, 0)
+
+    def bump(self, tenant_id: int) -> int:
+        """Invalidate everything cached for a tenant"""
+        with self._lock:
+            version = self._versions.get(tenant_id, 0) + 1
+            self._versions[tenant_id] = version
+            return version
+
+    def tag(self, tenant_id: int) -> str:
+        """Opaque token identifying the tenant's current cache generation"""
+        return f"{self.epoch}-{self.version(tenant_id)}"
+
+    def get(self, tenant_id: int, key: Hashable) -> Any | None:
+        """Return the cached value for the tenant's current version, or None"""
+        full_key = (tenant_id, self.version(tenant_id), key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[full_key]
+                return None
+            self._entries.move_to_end(full_key)
+            return value
+
+    def set(self, tenant_id: int, key: Hashable, value: Any, version: int | None = None) -> None:
+        """
+        Cache a value
+
+        Pass the `version` read before loading the value from the database;
+        if the tenant was invalidated in the meantime the value is stored
+        under the old version and is never served.
+        """
+        if version is None:
+            version = self.version(tenant_id)
+        full_key = (tenant_id, version, key)
+        with self._lock:
+            self._entries[full_key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,124 @@
+"""
+Resume fingerprints for duplicate detection
+
+- content hash: SHA-256 of the lowercased word sequence, so re-exports of
+  the same document (different whitespace, punctuation, casing) match exactly
+- SimHash: 64-bit locality-sensitive hash over word 3-shingles; resumes
+  that differ by a few edits land within a few bits of each other
+- SimHash bands: the 64 bits split into 4 tagged 16-bit bands. Two hashes
+  within 3 bits share at least one band (pigeonhole), so a database lookup
+  on overlapping bands finds every near-duplicate candidate
+- contacts: lowercased email (plus-tag stripped) and the last 10 phone
+  digits. The email is also picked out of the raw text so it can be matched
+  before parsing; phones only come from the parser, since dates and IDs in
+  free text look too much like phone numbers
+"""
+import hashlib
+import re
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+SHINGLE_SIZE = 3
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+_WORD_RE = re.compile(r"\w+")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+@dataclass(frozen=True)
+class ResumeFingerprint:
+    content_hash: str
+    simhash: int
+    simhash_bands: List[int]
+    email: Optional[str]
+    phone: Optional[str]
+
+    def with_contacts(self, parsed_data: Dict) -> "ResumeFingerprint":
+        """Add the parser's email/phone (the email takes precedence over regex)"""
+        return replace(
+            self,
+            email=normalize_email(parsed_data.get("email")) or self.email,
+            phone=normalize_phone(parsed_data.get("phone")) or self.phone
+        )
+
+    def columns(self) -> Dict:
+        """Values for the candidates fingerprint columns"""
+        return {
+            "content_hash": self.content_hash,
+            "simhash": to_signed64(self.simhash),
+            "simhash_bands": self.simhash_bands,
+            "email_normalized": self.email,
+            "phone_normalized": self.phone
+        }
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email or "@" not in email:
+        return None
+    local, _, domain = email.strip().lower().rpartition("@")
+    local = local.split("+", 1)[0]
+    return f"{local}@{domain}" if local and domain else None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Last 10 digits, so "+1 (555) 010-2030" and "555.010.2030" match"""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    return digits[-10:] if 10 <= len(digits) <= 15 else None
+
+
+def to_signed64(value: int) -> int:
+    """Unsigned 64-bit hash as a Postgres BIGINT"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned64(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def content_hash(words: List[str]) -> str:
+    return hashlib.sha256(" ".join(words).encode()).hexdigest()
+
+
+def simhash(words: List[str]) -> int:
+    """64-bit SimHash over word shingles, weighted by occurrence"""
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def simhash_bands(value: int) -> List[int]:
+    """Band values tagged with their position so bands only match their own slot"""
+    return [
+        band << _BAND_BITS | (value >> (band * _BAND_BITS) & _BAND_MASK)
+        for band in range(SIMHASH_BANDS)
+    ]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(to_unsigned64(a) ^ to_unsigned64(b)).count("1")
+
+
+def fingerprint_resume(resume_text: str) -> ResumeFingerprint:
+    """Fingerprint normalized resume text (email found by regex, no phone yet)"""
+    words = _WORD_RE.findall(resume_text.lower())
+    value = simhash(words)
+    email = _EMAIL_RE.search(resume_text)
+    return ResumeFingerprint(
+        content_hash=content_hash(words),
+        simhash=value,
+        simhash_bands=simhash_bands(value),
+        email=normalize_email(email.group(0)) if email else None,
+        phone=None
+    )
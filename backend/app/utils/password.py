@@ -1,48 +1,101 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
+from app.config.settings import settings
+
+# bcrypt is CPU-bound (~250 ms at cost 12), so async callers run it on a
+# small dedicated pool instead of the shared threadpool / event loop.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+_pending = 0
+
+_BCRYPT_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash/verify calls are already queued"""
+
+
+def _to_bytes(password: str) -> bytes:
+    # Convert password to bytes
+    password_bytes = password.encode('utf-8')
+
+    # Bcrypt has a 72-byte limit, truncate if necessary
+    if len(password_bytes) > 72:
+        password_bytes = password_bytes[:72]
+
+    return password_bytes
+
 
 def hash_password(password: str) -> str:
     """
     Hash a plain password using bcrypt
-    
+
     Args:
         password: Plain text password
-    
+
     Returns:
         Hashed password string
     """
-    # Convert password to bytes
-    password_bytes = password.encode('utf-8')
-    
-    # Bcrypt has a 72-byte limit, truncate if necessary
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    
     # Generate salt and hash
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    hashed = bcrypt.hashpw(_to_bytes(password), salt)
+
     # Return as string
     return hashed.decode('utf-8')
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against its hash
-    
+
     Args:
         plain_password: Plain text password to verify
         hashed_password: Hashed password from database
-    
+
     Returns:
         True if password matches, False otherwise
     """
-    # Convert to bytes
-    password_bytes = plain_password.encode('utf-8')
-    
-    # Truncate if necessary (same as hashing)
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    
     hashed_bytes = hashed_password.encode('utf-8')
-    
+
     # Verify
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    return bcrypt.checkpw(_to_bytes(plain_password), hashed_bytes)
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash was made with a different cost factor
+
+    Args:
+        hashed_password: Hashed password from database
+
+    Returns:
+        True if the hash should be regenerated with BCRYPT_ROUNDS
+    """
+    match = _BCRYPT_COST.match(hashed_password)
+    if not match:
+        return True
+    return int(match.group(1)) != settings.BCRYPT_ROUNDS
+
+async def _run_bounded(func, *args):
+    """Run a bcrypt call on the dedicated pool, rejecting work past the queue bound"""
+    global _pending
+
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy("Password hashing queue is full")
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_bounded(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await _run_bounded(verify_password, plain_password, hashed_password)
@@ -0,0 +1,40 @@
+"""
+PDF page-range extraction, the unit of work of the PDF worker processes
+
+Kept apart from app.services.resume_parser so spawned workers import only
+PyPDF2, not the LLM client and settings.
+"""
+import time
+from typing import List
+import PyPDF2
+
+
+def extract_pages(
+    reader: PyPDF2.PdfReader,
+    start: int,
+    end: int,
+    char_budget: int,
+    deadline: float
+) -> List[str]:
+    """
+    Extract text from pages [start, end) of an open PDF
+
+    Stops early once `char_budget` characters have been collected or the
+    wall-clock `deadline` passes.
+    """
+    parts = []
+    collected = 0
+    for index in range(start, end):
+        if collected >= char_budget or time.time() >= deadline:
+            break
+        page_text = reader.pages[index].extract_text() or ""
+        if page_text:
+            parts.append(page_text)
+            collected += len(page_text)
+    return parts
+
+
+def extract_page_range(path: str, start: int, end: int, char_budget: int, deadline: float) -> List[str]:
+    """Worker-process entry point: open the PDF file and extract one page range"""
+    with open(path, "rb") as pdf_file:
+        return extract_pages(PyPDF2.PdfReader(pdf_file), start, end, char_budget, deadline)
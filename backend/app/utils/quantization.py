@@ -0,0 +1,121 @@
+"""
+Scalar quantization for embedding vectors
+
+int8 uses a symmetric per-vector scale (max |x| maps to 127), so one
+384-dim vector takes 384 + 4 bytes instead of 1536. float16 halves storage
+with no extra state. Everything works on NumPy arrays in place of lists.
+"""
+from typing import Tuple
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+
+# Rows converted to float32 per BLAS call; small enough to stay in cache
+_BLOCK_ROWS = 1024
+
+
+def as_float32_matrix(vectors) -> np.ndarray:
+    """2-D contiguous float32 view of one vector or a batch"""
+    return np.ascontiguousarray(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+
+
+def normalize(vectors) -> np.ndarray:
+    """Unit-length float32 rows (zero vectors stay zero)"""
+    matrix = as_float32_matrix(vectors)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def quantize_int8(vectors) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize vectors to int8 codes with a per-vector scale
+
+    Returns:
+        (codes int8 [n, dim], scales float32 [n]); x ~= codes * scale
+    """
+    matrix = as_float32_matrix(vectors)
+    peak = np.abs(matrix).max(axis=1)
+    scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """float32 reconstruction of int8 codes"""
+    return codes.astype(np.float32) * scales[:, None]
+
+
+def encode(vectors, precision: str) -> Tuple[np.ndarray, np.ndarray | None]:
+    """
+    Store-ready representation of vectors
+
+    Returns:
+        (codes, scales); scales is None except for int8
+    """
+    if precision == "int8":
+        return quantize_int8(vectors)
+    return as_float32_matrix(vectors).astype(precision), None
+
+
+def decode(codes: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    """float32 vectors back from `encode` output"""
+    if scales is not None:
+        return dequantize_int8(codes, scales)
+    return codes.astype(np.float32)
+
+
+def blocked_dot(codes: np.ndarray, query: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+    """
+    float32 dot products of stored rows with a query
+
+    NumPy has no int8/float16 GEMV, so rows are widened to float32 a block
+    at a time into a reused buffer instead of materializing a float32 copy
+    of the whole matrix.
+
+    Args:
+        codes: stored vectors [n, dim] (any dtype)
+        query: float32 [dim]
+        rows: optional row indices to score (default: all rows)
+    """
+    query = query.astype(np.float32, copy=False)
+    total = codes.shape[0] if rows is None else rows.size
+    scores = np.empty(total, dtype=np.float32)
+    buffer = np.empty((min(_BLOCK_ROWS, max(total, 1)), codes.shape[1]), dtype=np.float32)
+    for start in range(0, total, _BLOCK_ROWS):
+        block = codes[start:start + _BLOCK_ROWS] if rows is None else codes[rows[start:start + _BLOCK_ROWS]]
+        count = block.shape[0]
+        np.copyto(buffer[:count], block, casting="unsafe")
+        scores[start:start + count] = buffer[:count] @ query
+    return scores
+
+
+def int8_dot(
+    codes: np.ndarray,
+    scales: np.ndarray,
+    query_codes: np.ndarray,
+    query_scale: float,
+    rows: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Approximate dot products between int8 rows and an int8 query
+
+    Code products are at most 127 * 127, so float32 accumulation is exact
+    for dimensions up to ~1000.
+
+    Args:
+        codes: int8 [n, dim]
+        scales: float32 [n]
+        query_codes: int8 [dim]
+        query_scale: the query's scale
+        rows: optional row indices to score (default: all rows)
+    """
+    raw = blocked_dot(codes, query_codes.astype(np.float32), rows)
+    row_scales = scales if rows is None else scales[rows]
+    return raw * row_scales * np.float32(query_scale)
+
+
+def bytes_per_vector(dimension: int, precision: str) -> int:
+    """Storage cost of one vector, including its scale for int8"""
+    if precision == "int8":
+        return dimension + 4
+    return dimension * np.dtype(precision).itemsize
@@ -0,0 +1,104 @@
+"""
+In-process rate limiting
+
+- `SlidingWindowLimiter`: attempt counting used for login throttling
+- `AsyncRateLimiter`: paces background LLM calls to a per-minute budget
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from app.config.settings import settings
+
+
+class SlidingWindowLimiter:
+    """
+    Count events per key over a sliding time window
+
+    `retry_after(key)` is checked before doing any expensive work (DB lookup,
+    bcrypt), so throttled requests cost a dict lookup.
+    """
+
+    def __init__(self, max_attempts: int, window_seconds: int, max_keys: int = 100_000):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._events: dict = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, events: deque, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while events and events[0] <= cutoff:
+            events.popleft()
+
+    def retry_after(self, key: str) -> float:
+        """Seconds until `key` may try again (0 if not throttled)"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return 0.0
+            self._prune(events, now)
+            if len(events) < self.max_attempts:
+                return 0.0
+            return events[0] + self.window_seconds - now
+
+    def record(self, key: str) -> None:
+        """Record one attempt for `key`"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if events is None:
+                if len(self._events) >= self.max_keys:
+                    self._evict_stale(now)
+                events = self._events[key] = deque()
+            self._prune(events, now)
+            events.append(now)
+
+    def reset(self, key: str) -> None:
+        """Forget all attempts for `key`"""
+        with self._lock:
+            self._events.pop(key, None)
+
+    def _evict_stale(self, now: float) -> None:
+        for key in list(self._events):
+            events = self._events[key]
+            self._prune(events, now)
+            if not events:
+                del self._events[key]
+        # Still full of active keys: drop the oldest half rather than grow unbounded
+        if len(self._events) >= self.max_keys:
+            for key in list(self._events)[: self.max_keys // 2]:
+                del self._events[key]
+
+
+class AsyncRateLimiter:
+    """Spaces `acquire()` calls at least 60 / max_per_minute seconds apart"""
+
+    def __init__(self, max_per_minute: float):
+        self.interval = 60.0 / max_per_minute if max_per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# All login attempts per client IP
+login_ip_limiter = SlidingWindowLimiter(
+    max_attempts=settings.LOGIN_IP_MAX_ATTEMPTS,
+    window_seconds=settings.LOGIN_IP_WINDOW_SECONDS
+)
+
+# Failed login attempts per email address
+login_email_limiter = SlidingWindowLimiter(
+    max_attempts=settings.LOGIN_EMAIL_MAX_FAILURES,
+    window_seconds=settings.LOGIN_EMAIL_WINDOW_SECONDS
+)
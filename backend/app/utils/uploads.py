@@ -0,0 +1,55 @@
+"""
+Helpers for bounded-memory file uploads
+"""
+import io
+from typing import Callable
+from fastapi import Request, UploadFile
+from fastapi.routing import APIRoute
+from starlette.datastructures import FormData
+from starlette.exceptions import HTTPException
+from starlette.formparsers import MultiPartException, MultiPartParser, parse_options_header
+from app.config.settings import settings
+
+
+class UploadRequest(Request):
+    """
+    Request whose multipart parts spill to disk above UPLOAD_SPOOL_MAX_MEMORY_BYTES
+
+    Starlette keeps each uploaded part in a SpooledTemporaryFile (1 MB in
+    memory by default). With hundreds of resumes per request that default
+    alone can pin hundreds of MB, so this request's parser keeps the
+    in-memory part small. Other apps and routes keep Starlette's default.
+    """
+
+    async def _get_form(self, *, max_files: int | float = 1000, max_fields: int | float = 1000) -> FormData:
+        if self._form is None:
+            content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+            if content_type == b"multipart/form-data":
+                parser = MultiPartParser(self.headers, self.stream(), max_files=max_files, max_fields=max_fields)
+                parser.max_file_size = settings.UPLOAD_SPOOL_MAX_MEMORY_BYTES
+                try:
+                    self._form = await parser.parse()
+                except MultiPartException as exc:
+                    raise HTTPException(status_code=400, detail=exc.message)
+        return await super()._get_form(max_files=max_files, max_fields=max_fields)
+
+
+class UploadRoute(APIRoute):
+    """Route class that hands its endpoints an UploadRequest"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def upload_handler(request: Request):
+            return await handler(UploadRequest(request.scope, request.receive))
+
+        return upload_handler
+
+
+def upload_size(upload: UploadFile) -> int:
+    """Size in bytes of an already-received upload, without reading it"""
+    if upload.size is not None:
+        return upload.size
+    size = upload.file.seek(0, io.SEEK_END)
+    upload.file.seek(0)
+    return size
@@ -0,0 +1,122 @@
+"""
+Vector ID scheme and per-candidate score aggregation
+
+Shared by every vector store backend so IDs and ranking stay identical
+whether vectors live in Pinecone or in process.
+"""
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Vector IDs: "candidate_{id}" (legacy single vector) or "candidate_{id}#{chunk}"
+VECTOR_ID_PREFIX = "candidate_"
+CHUNK_SEPARATOR = "#"
+
+
+class VectorSearchError(Exception):
+    """The vector store could not be queried"""
+
+
+def legacy_vector_id(candidate_id: int) -> str:
+    return f"{VECTOR_ID_PREFIX}{candidate_id}"
+
+
+def chunk_vector_id(candidate_id: int, chunk: int) -> str:
+    return f"{VECTOR_ID_PREFIX}{candidate_id}{CHUNK_SEPARATOR}{chunk}"
+
+
+def candidate_vector_ids(candidate_id: int, max_chunks: int) -> List[str]:
+    """Every ID a candidate's vectors can have (deleting missing IDs is a no-op)"""
+    return [legacy_vector_id(candidate_id)] + [chunk_vector_id(candidate_id, chunk) for chunk in range(max_chunks)]
+
+
+def parse_vector_id(vector_id: str) -> int:
+    """Candidate ID from a legacy or chunk vector ID"""
+    return int(vector_id[len(VECTOR_ID_PREFIX):].split(CHUNK_SEPARATOR, 1)[0])
+
+
+def aggregate_scores(scores: List[float], method: str, k: int) -> float:
+    """
+    Combine a candidate's chunk similarities into one score
+
+    "max" rewards the single best-matching section; "topk_mean" averages
+    the best `k` so broad matches beat one lucky chunk.
+    """
+    if method == "topk_mean":
+        best = sorted(scores, reverse=True)[:max(k, 1)]
+        return sum(best) / len(best)
+    return max(scores)
+
+
+def group_by_candidate(matches: Iterable[Dict], method: str, k: int, top_k: int) -> List[Dict]:
+    """
+    Group chunk matches ({id, score, metadata}) into ranked candidates
+
+    Returns:
+        Up to `top_k` of {candidate_id, score, chunk_scores, metadata}, best first
+    """
+    grouped: Dict[int, Dict] = {}
+    for match in matches:
+        candidate_id = parse_vector_id(match["id"])
+        entry = grouped.setdefault(
+            candidate_id,
+            {"candidate_id": candidate_id, "chunk_scores": [], "metadata": match["metadata"] or {}}
+        )
+        entry["chunk_scores"].append(match["score"])
+
+    for entry in grouped.values():
+        entry["score"] = aggregate_scores(entry["chunk_scores"], method, k)
+
+    ranked = sorted(grouped.values(), key=lambda entry: entry["score"], reverse=True)
+    return ranked[:top_k]
+
+
+def rank_candidates(
+    search_chunks: Callable[[int], List[Dict]],
+    top_k: int,
+    method: str,
+    k: int,
+    oversample: int,
+    max_chunk_matches: int
+) -> Tuple[List[Dict], bool]:
+    """
+    Rank the best `top_k` candidates from chunk searches
+
+    Starts with `top_k * oversample` chunk matches and asks for twice as
+    many, up to `max_chunk_matches`, while candidates with many matching
+    chunks leave fewer than `top_k` distinct candidates.
+
+    Args:
+        search_chunks: Chunk search for a number of matches ({id, score, metadata}, best first)
+
+    Returns:
+        (up to `top_k` candidates as from group_by_candidate, complete), where
+        complete means the chunk search ran out of matches and every
+        candidate that passed its filter is in the list
+    """
+    chunk_top_k = max(min(top_k * oversample, max_chunk_matches), 1)
+    while True:
+        matches = search_chunks(chunk_top_k)
+        exhausted = len(matches) < chunk_top_k
+        ranked = group_by_candidate(matches, method, k, len(matches))
+        if exhausted or len(ranked) >= top_k or chunk_top_k >= max_chunk_matches:
+            return ranked[:top_k], exhausted and len(ranked) <= top_k
+        chunk_top_k = min(chunk_top_k * 2, max_chunk_matches)
+
+
+def candidate_metadata(candidate: Dict) -> Dict:
+    """
+    Vector metadata for a candidates row
+
+    Pinecone rejects null values, so every field has a non-null default.
+    `candidate_id` is what facet prefilters match with `$in`.
+    """
+    skills = ((candidate.get("parsed_data") or {}).get("skills") or [])[:10]
+    return {
+        "tenant_id": candidate["tenant_id"],
+        "candidate_id": int(candidate["id"]),
+        "job_posting_id": int(candidate["job_posting_id"]),
+        "name": candidate.get("name") or "Unknown",
+        "skills": skills or ["none"],
+        "experience_years": candidate.get("experience_years") or 0,
+        "match_score": float(candidate.get("match_score") or 0),
+        "recommendation": candidate.get("recommendation") or "pending"
+    }
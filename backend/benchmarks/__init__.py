@@ -0,0 +1,22 @@
+"""
+Offline benchmarks for the Recrux backend
+
+Run from the backend directory, e.g. `python -m benchmarks.extraction`.
+Importing this package fills in placeholder credentials so app modules can
+be imported without a .env file; nothing here talks to external services.
+"""
+import os
+
+for _name, _value in {
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_SERVICE_ROLE_KEY": "benchmark",
+    "S3_ENDPOINT": "http://localhost:9000",
+    "S3_REGION": "local",
+    "S3_ACCESS_KEY_ID": "benchmark",
+    "S3_SECRET_ACCESS_KEY": "benchmark",
+    "BUCKET_NAME": "benchmark",
+    "SECRET_KEY": "benchmark-secret",
+    "GROQ_API_KEY": "benchmark",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(_name, _value)
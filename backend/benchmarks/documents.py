@@ -0,0 +1,136 @@
+"""
+Synthetic resume corpora in PDF, DOCX and plain-text form
+"""
+import io
+import random
+import zipfile
+from typing import List
+from xml.sax.saxutils import escape
+
+FIRST_NAMES = ["Ayesha", "Bilal", "Carlos", "Dana", "Elena", "Farhan", "Grace", "Hassan", "Irene", "Jamal"]
+LAST_NAMES = ["Khan", "Garcia", "Smith", "Chen", "Ahmed", "Novak", "Okafor", "Rossi", "Tanaka", "Malik"]
+SKILLS = [
+    "Python", "FastAPI", "Django", "JavaScript", "TypeScript", "React", "Node.js", "PostgreSQL",
+    "AWS", "Docker", "Kubernetes", "Terraform", "Go", "Java", "Spring", "Redis", "Kafka",
+    "Machine Learning", "PyTorch", "SQL", "GraphQL", "CI/CD", "Linux", "Azure", "GCP",
+]
+TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "DevOps Engineer", "Full Stack Developer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech"]
+BULLETS = [
+    "Designed and shipped {skill} services handling {n}k requests per minute",
+    "Led migration of legacy systems to {skill}, cutting costs by {n}%",
+    "Mentored {n} engineers and ran weekly {skill} design reviews",
+    "Built data pipelines in {skill} processing {n} GB per day",
+    "Improved p95 latency by {n}% through {skill} profiling and caching",
+]
+
+
+def make_resume_text(seed: int, experience_entries: int = 4) -> str:
+    """Deterministic synthetic resume text"""
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, 8)
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{seed}@example.com | +1 555 {seed % 10000:04d} | Lahore, Pakistan",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {rng.randint(1, 15)} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+    ]
+    for index in range(experience_entries):
+        start = 2024 - 2 * (index + 1)
+        lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({start}-{start + 2})")
+        for _ in range(3):
+            lines.append("- " + rng.choice(BULLETS).format(skill=rng.choice(skills), n=rng.randint(2, 90)))
+        lines.append("")
+    lines += [
+        "EDUCATION",
+        f"BSc Computer Science - University {rng.randint(1, 50)} ({2024 - 2 * experience_entries - 4})",
+    ]
+    return "\n".join(lines)
+
+
+def make_pdf(text: str, lines_per_page: int = 50) -> bytes:
+    """Minimal text-only PDF (Helvetica, one text object per page)"""
+    lines = text.split("\n")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[""]]
+
+    def pdf_string(line: str) -> str:
+        line = line.encode("latin-1", "replace").decode("latin-1")
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    objects: List[bytes] = []
+    page_ids = [3 + 2 * i for i in range(len(pages))]
+    font_id = 3 + 2 * len(pages)
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    for page_id, page_lines in zip(page_ids, pages):
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(
+            f"({pdf_string(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_docx(text: str) -> bytes:
+    """Minimal DOCX with one paragraph per line"""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+        for line in text.split("\n")
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paragraphs}</w:body></w:document>"
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        "</Types>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", content_types)
+        archive.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+def make_corpus(count: int, fmt: str = "pdf", seed: int = 0, experience_entries: int = 4) -> List[tuple[str, bytes]]:
+    """(filename, bytes) pairs of synthetic resumes in one format"""
+    builders = {
+        "pdf": (make_pdf, "pdf"),
+        "docx": (make_docx, "docx"),
+        "text": (lambda text: text.encode("utf-8"), "txt"),
+    }
+    build, extension = builders[fmt]
+    return [
+        (f"resume_{seed + i}.{extension}", build(make_resume_text(seed + i, experience_entries)))
+        for i in range(count)
+    ]
@@ -0,0 +1,90 @@
+"""
+Embedding throughput and parity per inference backend
+
+    python -m benchmarks.embedding --resumes 50 --backends torch onnx onnx-int8 --threads 4
+
+Encodes the section chunks of synthetic resumes (the upload workload) and
+single short queries (the search workload). Reports encodes/sec for both
+and the min/mean cosine similarity against the torch backend. Needs the
+model files (downloaded from the Hugging Face hub on first run).
+"""
+import argparse
+import time
+
+import numpy as np
+
+import benchmarks  # noqa: F401  (placeholder credentials)
+from benchmarks.documents import make_resume_text
+from app.config.settings import settings
+from app.services.embedding_backends import create_backend
+from app.services.embedding_models import default_model_spec
+from app.services.text_preparation import chunk_sections
+
+QUERIES = (
+    "Python developer with AWS experience",
+    "frontend engineer React TypeScript",
+    "data scientist with NLP background",
+    "DevOps Kubernetes Terraform",
+)
+
+
+def _load(name: str, threads: int):
+    return create_backend(
+        name,
+        model_name=default_model_spec().model_name,
+        threads=threads,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        max_seq_length=settings.EMBEDDING_MAX_SEQ_LENGTH,
+        bucket_size=settings.EMBEDDING_LENGTH_BUCKET,
+        cache_dir=settings.EMBEDDING_CACHE_DIR
+    )
+
+
+def _rate(encode, items: list, repeat: int) -> float:
+    encode(items[:2])  # warm-up: first call allocates and optimizes
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode(items)
+    return len(items) * repeat / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=8)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--threads", type=int, default=settings.EMBEDDING_THREADS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    loaded = {name: _load(name, args.threads) for name in args.backends}
+    counter = next(iter(loaded.values())).count_tokens
+    chunks = [
+        chunk
+        for seed in range(args.resumes)
+        for chunk in chunk_sections(
+            make_resume_text(seed, args.entries),
+            counter,
+            settings.EMBEDDING_MAX_SEQ_LENGTH - 2,
+            settings.EMBEDDING_MAX_CHUNKS
+        )
+    ]
+    queries = list(QUERIES) * 25
+
+    reference = loaded["torch"].encode(chunks) if "torch" in loaded else None
+
+    print(f"{len(chunks)} chunks from {args.resumes} resumes, {len(queries)} queries, threads={args.threads or 'default'}")
+    print(f"{'backend':<11}{'chunks/s':>10}{'queries/s':>11}{'min cos':>9}{'mean cos':>10}")
+    for name, backend in loaded.items():
+        chunk_rate = _rate(backend.encode, chunks, args.repeat)
+        query_rate = _rate(lambda items: [backend.encode([item]) for item in items], queries, args.repeat)
+        if reference is not None:
+            cosines = np.sum(backend.encode(chunks) * reference, axis=1)
+            parity = f"{cosines.min():>9.4f}{cosines.mean():>10.4f}"
+        else:
+            parity = f"{'-':>9}{'-':>10}"
+        print(f"{name:<11}{chunk_rate:>10.1f}{query_rate:>11.1f}{parity}")
+
+
+if __name__ == "__main__":
+    main()
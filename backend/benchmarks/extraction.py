@@ -0,0 +1,57 @@
+"""
+Text extraction throughput per format
+
+    python -m benchmarks.extraction --docs 200 --entries 4 --entries 40
+"""
+import argparse
+import asyncio
+import time
+
+import benchmarks  # noqa: F401  (placeholder credentials)
+from benchmarks.documents import make_corpus
+from app.services.resume_parser import extractor_registry
+
+
+async def _run(fmt: str, docs: int, entries: int) -> dict:
+    corpus = make_corpus(docs, fmt, experience_entries=entries)
+    total_bytes = sum(len(data) for _, data in corpus)
+
+    chars = 0
+    started = time.perf_counter()
+    for _, data in corpus:
+        text, detected = await extractor_registry.extract(data)
+        assert detected == fmt, f"detected {detected} for {fmt}"
+        chars += len(text)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "format": fmt,
+        "entries": entries,
+        "docs": docs,
+        "avg_kb": total_bytes / docs / 1024,
+        "docs_per_sec": docs / elapsed,
+        "mb_per_sec": total_bytes / elapsed / 1024 / 1024,
+        "avg_chars": chars / docs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--entries", type=int, action="append",
+                        help="experience entries per resume (controls document length)")
+    parser.add_argument("--formats", nargs="+", default=["pdf", "docx", "text"])
+    args = parser.parse_args()
+
+    print(f"{'format':<8}{'entries':>8}{'docs':>7}{'avg KB':>9}{'docs/s':>10}{'MB/s':>8}{'avg chars':>11}")
+    for entries in args.entries or [4]:
+        for fmt in args.formats:
+            row = asyncio.run(_run(fmt, args.docs, entries))
+            print(
+                f"{row['format']:<8}{row['entries']:>8}{row['docs']:>7}{row['avg_kb']:>9.1f}"
+                f"{row['docs_per_sec']:>10.1f}{row['mb_per_sec']:>8.2f}{row['avg_chars']:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""
+In-memory stand-in for the Supabase (PostgREST) client
+
+Implements the query-builder surface the app uses (select with column lists,
+`alias:column->key` JSON paths, `count="exact"` and embedded relations, insert/update/upsert/delete, the
+eq/neq/gt/gte/lt/lte/in_/is_/contains/match/or_ filters, order and limit)
+over plain lists of dicts, plus `rpc()` for the functions in
+database/schema.sql. Filter values are compared the way PostgREST
+sees them, as text unless both sides are numeric, so `eq("job_posting_id",
+"7")` matches an integer 7. Results go through a JSON round-trip like a real
+response, and every execute() sleeps `latency` seconds and counts as one
+round-trip for `count_queries()`.
+"""
+import asyncio
+import itertools
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config.database import _query_counter
+
+# Column defaults from database/schema.sql for the tables the app writes
+DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "users": {"role": "hr_manager"},
+    "job_postings": {"status": "active"},
+    "candidates": {"status": "pending"},
+    "embedding_migrations": {"status": "running", "last_candidate_id": 0, "embedded_count": 0, "failed_count": 0},
+    "vector_outbox": {"attempts": 0},
+    "job_rescores": {
+        "status": "running", "total_count": 0, "local_count": 0,
+        "llm_queued": 0, "llm_done": 0, "llm_failed": 0
+    },
+}
+TIMESTAMP_COLUMNS = ("created_at", "started_at", "updated_at", "next_attempt_at")
+
+# Embedded resources whose foreign key isn't `<singular>_id`
+RELATION_KEYS = {("users", "companies"): "tenant_id"}
+
+_EMBED = re.compile(r"(\w+)\(([^)]*)\)")
+_JSON_PATH = re.compile(r"(?:(\w+):)?(\w+)->>?(\w+)")
+_OR_CONDITION = re.compile(r'(\w+)\.(eq|neq|gt|gte|lt|lte|is|ov)\.("(?:[^"\\]|\\.)*"|\{[^}]*\}|[^,]+)')
+
+
+@dataclass
+class FakeResponse:
+    data: List[Dict]
+    count: Optional[int] = None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _text(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _number(value):
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _equal(left, right) -> bool:
+    left_number, right_number = _number(left), _number(right)
+    if left_number is not None and right_number is not None:
+        return left_number == right_number
+    return _text(left) == _text(right)
+
+
+def _compare(op: str) -> Callable[[Any, Any], bool]:
+    def check(left, right) -> bool:
+        if left is None:
+            return False
+        left_number, right_number = _number(left), _number(right)
+        if left_number is not None and right_number is not None:
+            left, right = left_number, right_number
+        else:
+            left, right = _text(left), _text(right)
+        return {"gt": left > right, "gte": left >= right, "lt": left < right, "lte": left <= right}[op]
+    return check
+
+
+def _is(left, right) -> bool:
+    right = _text(right).lower()
+    if right == "null":
+        return left is None
+    return _text(left).lower() == right
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _or_condition(column: str, op: str, raw: str) -> Callable[[Dict], bool]:
+    if op == "ov":
+        values = {_text(part.strip()) for part in raw.strip("{}").split(",") if part.strip()}
+        return lambda row: bool(values & {_text(item) for item in row.get(column) or []})
+    value = _unquote(raw)
+    if op == "eq":
+        return lambda row: _equal(row.get(column), value)
+    if op == "neq":
+        return lambda row: not _equal(row.get(column), value)
+    if op == "is":
+        return lambda row: _is(row.get(column), value)
+    check = _compare(op)
+    return lambda row: check(row.get(column), value)
+
+
+class FakeQuery:
+    """One table request, built up like postgrest's request builders"""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._operation = "select"
+        self._columns = "*"
+        self._count = None
+        self._payload = None
+        self._filters: List[Callable[[Dict], bool]] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+
+    # Operations
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "FakeQuery":
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, payload) -> "FakeQuery":
+        self._operation, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "id") -> "FakeQuery":
+        self._operation, self._payload = "upsert", (payload, on_conflict)
+        return self
+
+    def update(self, payload: Dict) -> "FakeQuery":
+        self._operation, self._payload = "update", payload
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self._operation = "delete"
+        return self
+
+    # Filters
+
+    def eq(self, column: str, value) -> "FakeQuery":
+        self._filters.append(lambda row: _equal(row.get(column), value))
+        return self
+
+    def neq(self, column: str, value) -> "FakeQuery":
+        self._filters.append(lambda row: not _equal(row.get(column), value))
+        return self
+
+    def gt(self, column: str, value) -> "FakeQuery":
+        return self._compare("gt", column, value)
+
+    def gte(self, column: str, value) -> "FakeQuery":
+        return self._compare("gte", column, value)
+
+    def lt(self, column: str, value) -> "FakeQuery":
+        return self._compare("lt", column, value)
+
+    def lte(self, column: str, value) -> "FakeQuery":
+        return self._compare("lte", column, value)
+
+    def _compare(self, op: str, column: str, value) -> "FakeQuery":
+        check = _compare(op)
+        self._filters.append(lambda row: check(row.get(column), value))
+        return self
+
+    def in_(self, column: str, values) -> "FakeQuery":
+        wanted = {_text(value) for value in values}
+        self._filters.append(lambda row: _text(row.get(column)) in wanted)
+        return self
+
+    def is_(self, column: str, value) -> "FakeQuery":
+        self._filters.append(lambda row: _is(row.get(column), value))
+        return self
+
+    def contains(self, column: str, values) -> "FakeQuery":
+        if isinstance(values, dict):
+            self._filters.append(lambda row: all(
+                (row.get(column) or {}).get(key) == value for key, value in values.items()
+            ))
+        else:
+            wanted = [_text(value) for value in values]
+            self._filters.append(lambda row: set(wanted) <= {_text(item) for item in row.get(column) or []})
+        return self
+
+    def match(self, query: Dict) -> "FakeQuery":
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def or_(self, filters: str) -> "FakeQuery":
+        conditions = [_or_condition(*match.groups()) for match in _OR_CONDITION.finditer(filters)]
+        self._filters.append(lambda row: any(condition(row) for condition in conditions))
+        return self
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False, nullsfirst: bool = False) -> "FakeQuery":
+        self._order.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int) -> "FakeQuery":
+        self._limit = size
+        return self
+
+    # Execution
+
+    def _matching(self) -> List[Dict]:
+        return [row for row in self._db.rows(self._table) if all(check(row) for check in self._filters)]
+
+    def _sorted(self, rows: List[Dict]) -> List[Dict]:
+        # Stable sorts applied last key first give a multi-column ORDER BY
+        for column, desc, nullsfirst in reversed(self._order):
+            present = sorted(
+                (row for row in rows if row.get(column) is not None),
+                key=lambda row: _number(row[column]) if _number(row[column]) is not None else _text(row[column]),
+                reverse=desc
+            )
+            missing = [row for row in rows if row.get(column) is None]
+            # PostgreSQL puts NULLs last ascending and first descending
+            rows = missing + present if nullsfirst or desc else present + missing
+        return rows
+
+    def _project(self, row: Dict) -> Dict:
+        columns = self._columns.strip()
+        embeds = _EMBED.findall(columns)
+        plain = [column.strip() for column in _EMBED.sub("", columns).split(",") if column.strip()]
+        projected = dict(row) if "*" in plain else {}
+        for column in plain:
+            path = _JSON_PATH.fullmatch(column)
+            if path:
+                alias, source, key = path.groups()
+                projected[alias or key] = (row.get(source) or {}).get(key)
+            elif column != "*":
+                projected[column] = row.get(column)
+        for relation, relation_columns in embeds:
+            projected[relation] = self._db.embedded(self._table, relation, row, relation_columns)
+        return projected
+
+    def _run(self) -> FakeResponse:
+        db = self._db
+        if self._operation == "insert":
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            return FakeResponse([dict(db.add(self._table, row)) for row in payload])
+
+        if self._operation == "upsert":
+            payload, on_conflict = self._payload
+            rows = []
+            for values in payload if isinstance(payload, list) else [payload]:
+                existing = next(
+                    (row for row in db.rows(self._table) if _equal(row.get(on_conflict), values.get(on_conflict))),
+                    None
+                )
+                if existing is None:
+                    rows.append(dict(db.add(self._table, values)))
+                else:
+                    existing.update(values)
+                    rows.append(dict(existing))
+            return FakeResponse(rows)
+
+        matching = self._matching()
+        if self._operation == "update":
+            for row in matching:
+                row.update(self._payload)
+            return FakeResponse([dict(row) for row in matching])
+
+        if self._operation == "delete":
+            db.remove(self._table, matching)
+            return FakeResponse([dict(row) for row in matching])
+
+        count = len(matching) if self._count else None
+        rows = self._sorted(matching)
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        return FakeResponse([self._project(row) for row in rows], count)
+
+    async def execute(self) -> FakeResponse:
+        return await self._db.round_trip(self._run)
+
+
+class FakeRPC:
+    """Stored procedure call (`db.rpc(name, params)`)"""
+
+    def __init__(self, db: "FakeSupabase", function: str, params: Dict):
+        self._db = db
+        self._function = function
+        self._params = params
+
+    async def execute(self) -> FakeResponse:
+        procedure = getattr(self._db, f"_rpc_{self._function}")
+        return await self._db.round_trip(lambda: FakeResponse(procedure(**self._params)))
+
+
+class FakeSupabase:
+    """
+    In-memory PostgREST client
+
+    Args:
+        latency: Seconds each round-trip sleeps (network + database time)
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[Dict]] = {}
+        self.queries = 0
+        self._ids: Dict[str, itertools.count] = {}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, function: str, params: Dict) -> FakeRPC:
+        return FakeRPC(self, function, params)
+
+    async def round_trip(self, run: Callable[[], FakeResponse]) -> FakeResponse:
+        counter = _query_counter.get()
+        if counter is not None:
+            counter.count += 1
+        self.queries += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+        response = run()
+        # Same isolation (and serialization cost) as reading a real response
+        response.data = json.loads(json.dumps(response.data, default=str))
+        return response
+
+    def rows(self, table: str) -> List[Dict]:
+        return self.tables.setdefault(table, [])
+
+    def add(self, table: str, values: Dict) -> Dict:
+        ids = self._ids.setdefault(table, itertools.count(1))
+        row = {**DEFAULTS.get(table, {}), **{column: _now() for column in TIMESTAMP_COLUMNS}, **values}
+        if row.get("id") is None:
+            row["id"] = next(ids)
+        self.rows(table).append(row)
+        return row
+
+    def remove(self, table: str, rows: List[Dict]) -> None:
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.rows(table) if id(row) not in doomed]
+
+    def embedded(self, table: str, relation: str, row: Dict, columns: str) -> Optional[Dict]:
+        """Many-to-one embed, e.g. `job_postings(title)` on a candidate"""
+        key = RELATION_KEYS.get((table, relation), f"{relation.rstrip('s')}_id")
+        target = next((other for other in self.rows(relation) if _equal(other.get("id"), row.get(key))), None)
+        if target is None:
+            return None
+        wanted = [column.strip() for column in columns.split(",") if column.strip()]
+        return dict(target) if not wanted or "*" in wanted else {column: target.get(column) for column in wanted}
+
+    # Functions from database/schema.sql
+
+    def _rpc_update_job_posting(self, p_job_id: int, p_tenant_id: int, p_changes: Dict) -> List[Dict]:
+        job = next((
+            row for row in self.rows("job_postings")
+            if _equal(row["id"], p_job_id) and _equal(row.get("tenant_id"), p_tenant_id)
+        ), None)
+        if job is None:
+            return []
+        old_job = dict(job)
+        columns = ("title", "description", "requirements", "must_have_skills", "nice_to_have_skills", "min_experience")
+        job.update({column: p_changes.get(column) for column in columns})
+        return [{"old_job": old_job, "new_job": dict(job)}]
+
+    def _rpc_rescore_candidates(self, p_tenant_id: int, p_updates: List[Dict]) -> List[int]:
+        candidates = {row["id"]: row for row in self.rows("candidates") if _equal(row.get("tenant_id"), p_tenant_id)}
+        updated = []
+        for values in p_updates:
+            candidate = candidates.get(values["id"])
+            if candidate is not None:
+                candidate.update({column: values.get(column) for column in (
+                    "match_score", "skills_matched", "skills_missing", "ai_evaluation"
+                )})
+                updated.append(candidate["id"])
+        return updated
+
+    def _rpc_backfill_skill_ids(self, p_updates: List[Dict]) -> List[int]:
+        candidates = {row["id"]: row for row in self.rows("candidates")}
+        updated = []
+        for values in p_updates:
+            candidate = candidates.get(values["id"])
+            if candidate is not None:
+                candidate["skill_ids"] = values["skill_ids"]
+                candidate.update({column: values[column] for column in (
+                    "skills_matched", "skills_missing", "ai_evaluation"
+                ) if values.get(column) is not None})
+                updated.append(candidate["id"])
+        return updated
@@ -0,0 +1,154 @@
+"""
+The FastAPI app wired to local stand-ins, for end-to-end benchmarks
+
+Import this module before any other app or benchmark module: it selects the
+in-process vector store, which is chosen when app.services.vector_store is
+first imported.
+
+`start()` then swaps the remaining external services:
+- Supabase -> FakeSupabase (benchmarks.fake_supabase)
+- ChatGroq -> StubChatModel (benchmarks.stub_llm) in the parser, scorer and
+  requirement extractor
+- optionally the embedding model -> HashingBackend, a bag-of-words hashing
+  encoder that needs no model download (search quality is meaningless, but
+  the request path does the same work around it)
+
+and seeds one company, user (password PASSWORD) and job. Requests go
+through the real routers, middleware and auth via httpx's ASGI transport,
+with no sockets; `client()` gives further clients with their own source IP
+(the login throttle is per IP).
+"""
+import os
+
+import benchmarks  # noqa: F401  (placeholder credentials)
+
+os.environ["VECTOR_STORE_BACKEND"] = "local"
+os.environ["VECTOR_STORE_PATH"] = ""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import List
+
+import httpx
+import numpy as np
+
+from app.config.database import supabase_db
+from app.main import app
+from app.services.ai_service import ai_service
+from app.services.embedding_models import default_model_spec, serving_model
+from app.services.embedding_service import embedding_service
+from app.services.job_cache import job_cache
+from app.services.resume_parser import resume_parser
+from app.services.scoring_service import scoring_service
+from app.services.search_cache import search_cache
+from app.services.vector_store import LocalVectorStore, vector_store
+from app.utils.jwt import create_access_token
+from app.utils.password import hash_password
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.stub_llm import StubChatModel
+
+_WORD = re.compile(r"\w+")
+
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark-password"
+
+JOB = {
+    "title": "Senior Backend Engineer",
+    "description": (
+        "We are hiring a senior backend engineer to design and operate the APIs behind our "
+        "recruitment platform, from data modelling in PostgreSQL to deployment on AWS."
+    ),
+    "must_have_skills": ["Python", "FastAPI", "PostgreSQL", "AWS"],
+    "nice_to_have_skills": ["Docker", "Kubernetes", "Redis"],
+    "min_experience": 4
+}
+
+
+class HashingBackend:
+    """Deterministic stand-in embedding backend (signed feature hashing)"""
+
+    name = "hashing"
+    max_seq_length = 256
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def count_tokens(self, text: str) -> int:
+        return len(_WORD.findall(text))
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower())[:self.max_seq_length]:
+                digest = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def _client(ip: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, client=(ip, 40000)),
+        base_url="http://benchmark",
+        timeout=None
+    )
+
+
+@dataclass
+class Harness:
+    http: httpx.AsyncClient
+    db: FakeSupabase
+    llm: StubChatModel
+    job_id: int
+    headers: dict
+
+    def client(self, ip: str) -> httpx.AsyncClient:
+        """Another client, seen by the app as coming from `ip`"""
+        return _client(ip)
+
+    async def close(self) -> None:
+        await self.http.aclose()
+
+
+async def start(llm: StubChatModel, db_latency: float = 0.0, fake_embeddings: bool = False) -> Harness:
+    """
+    Wire the app to local stand-ins and seed a tenant with one job
+
+    Args:
+        llm: Stub used for parsing, scoring and requirement extraction
+        db_latency: Seconds per database round-trip
+        fake_embeddings: Use HashingBackend instead of loading the real model
+    """
+    if not isinstance(vector_store, LocalVectorStore):
+        raise RuntimeError("benchmarks.harness must be imported before app.services.vector_store")
+
+    db = FakeSupabase(latency=db_latency)
+    supabase_db.client = db
+    resume_parser.llm = scoring_service.llm = ai_service.llm = llm
+    serving_model.invalidate()
+
+    model = default_model_spec()
+    if fake_embeddings:
+        embedding_service._backends[model.version] = HashingBackend(model.dimension)
+    # Load the model outside the timed requests, as the startup event does
+    embedding_service.warm_up(model)
+
+    company = db.add("companies", {"name": "Benchmark Co"})
+    user = db.add("users", {
+        "tenant_id": company["id"],
+        "email": EMAIL,
+        "password_hash": hash_password(PASSWORD),
+        "full_name": "Benchmark User"
+    })
+    job = db.add("job_postings", {"tenant_id": company["id"], "requirements": {}, **JOB})
+    # A fresh database reuses tenant IDs; drop what earlier runs cached for them
+    job_cache.invalidate(company["id"])
+    search_cache.invalidate(company["id"])
+    token = create_access_token({
+        "user_id": user["id"],
+        "tenant_id": company["id"],
+        "email": user["email"],
+        "role": user["role"]
+    })
+    return Harness(_client("127.0.0.1"), db, llm, job["id"], {"Authorization": f"Bearer {token}"})
@@ -0,0 +1,211 @@
+"""
+End-to-end resume ingestion and talent pool search, fully offline
+
+    python -m benchmarks.ingestion --sizes 10 100 1000 --fake-embeddings
+    python -m benchmarks.ingestion --sizes 100 --rate-limit-rate 0.05 --error-rate 0.01
+
+For each corpus size, a fresh process boots the app on local stand-ins
+(benchmarks.harness), uploads that many synthetic resumes to
+POST /api/candidates/jobs/{id}/upload-resumes in requests of --files-per-request,
+--concurrency requests at a time, then runs --searches queries against
+POST /api/talent-pool/search. Reports ingestion throughput, request latency
+percentiles for both endpoints, outcomes, LLM and database round-trips, and
+the process's peak RSS.
+
+LLM latency follows benchmarks.stub_llm's model scaled by --time-scale; all
+other time (extraction, embedding, the app itself, --db-latency-ms) is real,
+so the reported numbers are what the app would do against an LLM that much
+faster. Use --time-scale 1 for production-like LLM latency.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import harness  # first: selects the local vector store
+from benchmarks.documents import make_corpus
+from benchmarks.stub_llm import LatencyModel, StubChatModel
+
+QUERIES = (
+    "Python developer with AWS experience",
+    "frontend engineer React TypeScript",
+    "DevOps engineer with Kubernetes and Terraform",
+    "data engineer Kafka pipelines",
+    "machine learning PyTorch",
+)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentiles(latencies: list) -> dict:
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99}
+
+
+async def _upload(bench: harness.Harness, files: list, semaphore: asyncio.Semaphore, latencies: list) -> list:
+    async with semaphore:
+        started = time.perf_counter()
+        response = await bench.http.post(
+            f"/api/candidates/jobs/{bench.job_id}/upload-resumes",
+            files=[("resumes", (name, data, "application/octet-stream")) for name, data in files],
+            headers=bench.headers
+        )
+        latencies.append(time.perf_counter() - started)
+    response.raise_for_status()
+    return response.json()["results"]
+
+
+async def _search(bench: harness.Harness, query: str, semaphore: asyncio.Semaphore, latencies: list) -> int:
+    async with semaphore:
+        started = time.perf_counter()
+        response = await bench.http.post(
+            "/api/talent-pool/search",
+            json={"query": query, "top_k": 20},
+            headers=bench.headers
+        )
+        latencies.append(time.perf_counter() - started)
+    response.raise_for_status()
+    return response.json()["total"]
+
+
+async def _run(args) -> dict:
+    llm = StubChatModel(
+        latency=LatencyModel(time_scale=args.time_scale),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    bench = await harness.start(llm, args.db_latency_ms / 1000, args.fake_embeddings)
+    corpus = make_corpus(args.size, args.format, seed=args.seed)
+    baseline_rss = _peak_rss_mb()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    try:
+        upload_latencies = []
+        requests = [corpus[start:start + args.files_per_request] for start in range(0, len(corpus), args.files_per_request)]
+        started = time.perf_counter()
+        batches = await asyncio.gather(*(_upload(bench, files, semaphore, upload_latencies) for files in requests))
+        upload_seconds = time.perf_counter() - started
+        upload_queries = bench.db.queries
+        results = [result for batch in batches for result in batch]
+
+        search_latencies = []
+        started = time.perf_counter()
+        hits = await asyncio.gather(*(
+            _search(bench, QUERIES[index % len(QUERIES)], semaphore, search_latencies)
+            for index in range(args.searches)
+        ))
+        search_seconds = time.perf_counter() - started
+        search_queries = bench.db.queries - upload_queries
+    finally:
+        await bench.close()
+
+    return {
+        "size": args.size,
+        "resumes_per_second": args.size / upload_seconds,
+        "upload_seconds": upload_seconds,
+        "upload_ms": _percentiles(upload_latencies),
+        "searches_per_second": args.searches / search_seconds if args.searches else 0.0,
+        "search_ms": _percentiles(search_latencies),
+        "search_hits": sum(hits) / len(hits) if hits else 0.0,
+        "outcomes": {
+            status: sum(result["status"] == status for result in results)
+            for status in ("success", "duplicate", "error")
+        },
+        "llm": {
+            "calls": llm.stats.calls,
+            "rate_limited": llm.stats.rate_limited,
+            "errors": llm.stats.errors,
+            "retries": llm.stats.retries
+        },
+        "db_queries_per_resume": upload_queries / args.size,
+        "db_queries_per_search": search_queries / args.searches if args.searches else 0.0,
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+
+def _child_command(args, size: int) -> list:
+    command = [
+        sys.executable, "-m", "benchmarks.ingestion", "--child", str(size),
+        "--files-per-request", str(args.files_per_request),
+        "--concurrency", str(args.concurrency),
+        "--searches", str(args.searches),
+        "--format", args.format,
+        "--time-scale", str(args.time_scale),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+        "--db-latency-ms", str(args.db_latency_ms),
+        "--seed", str(args.seed)
+    ]
+    if args.fake_embeddings:
+        command.append("--fake-embeddings")
+    return command
+
+
+def _report(result: dict) -> None:
+    upload, search, outcomes, llm = result["upload_ms"], result["search_ms"], result["outcomes"], result["llm"]
+    print(
+        f"{result['size']:>6}{result['resumes_per_second']:>10.1f}"
+        f"{upload['p50']:>9.0f}{upload['p95']:>9.0f}{upload['p99']:>9.0f}"
+        f"{result['searches_per_second']:>9.1f}{search['p50']:>8.1f}{search['p95']:>8.1f}{search['p99']:>8.1f}"
+        f"{outcomes['success']:>6}/{outcomes['duplicate']}/{outcomes['error']:<5}"
+        f"{llm['calls']:>6}{llm['rate_limited']:>5}{llm['errors']:>5}"
+        f"{result['db_queries_per_resume']:>7.1f}{result['peak_rss_mb']:>8.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--files-per-request", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight")
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--format", choices=["pdf", "docx", "text"], default="pdf")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="multiplier on stub LLM latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="LLM 500s per attempt")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="LLM 429s per attempt")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--fake-embeddings", action="store_true", help="hashing encoder instead of the real model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        args.size = args.child
+        print(json.dumps(asyncio.run(_run(args))))
+        return
+
+    print(
+        f"{args.format} resumes, {args.files_per_request} per request, concurrency={args.concurrency}, "
+        f"LLM time scale={args.time_scale}, 500s={args.error_rate}, 429s={args.rate_limit_rate}, "
+        f"db latency={args.db_latency_ms}ms, embeddings={'hashing' if args.fake_embeddings else 'model'}"
+    )
+    print(
+        f"{'files':>6}{'res/s':>10}{'up p50':>9}{'up p95':>9}{'up p99':>9}"
+        f"{'srch/s':>9}{'s p50':>8}{'s p95':>8}{'s p99':>8}"
+        f"{'  ok/dup/err':<13}{'llm':>5}{'429':>5}{'500':>5}{'db/res':>7}{'RSS MB':>8}"
+    )
+    # One process per size so peak RSS isn't carried over between runs
+    for size in args.sizes:
+        child = subprocess.run(_child_command(args, size), capture_output=True, text=True)
+        if child.returncode != 0:
+            print(f"{size:>6}  failed:\n{child.stderr}")
+            continue
+        _report(json.loads(child.stdout.strip().splitlines()[-1]))
+    print("latencies in ms; upload latency is per request")
+
+
+if __name__ == "__main__":
+    main()
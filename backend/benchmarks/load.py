@@ -0,0 +1,409 @@
+"""
+Mixed-traffic load test of the whole API, in process
+
+    python -m benchmarks.load mixed --fake-embeddings
+    python -m benchmarks.load benchmarks/scenarios/upload_spike.json --rate-scale 2 --report results.json
+
+Runs a scenario (benchmarks/scenarios/*.json, or a path) against the app on
+local stand-ins (benchmarks.harness). Each endpoint gets an open-loop
+arrival process at its own rate: requests are sent on schedule whether or
+not earlier ones have finished, and latency is measured from the scheduled
+send time, so a backed-up server shows up as latency instead of silently
+lowering the load. Requests rotate over `clients` simulated clients, each
+with its own source IP.
+
+Prints per-endpoint throughput, error rate, p50/p95/p99/max, a latency
+histogram and the event loop's lag, then checks each endpoint's SLOs and
+exits with status 1 if any failed.
+
+Scenario format (all keys but `endpoints` optional):
+
+    {
+      "description": "...",
+      "duration_seconds": 30,
+      "arrival": "poisson",            # or "uniform"
+      "clients": 64,
+      "preload_resumes": 200,          # uploaded before the timed run
+      "db_latency_ms": 2,
+      "llm": {"time_scale": 0.1, "error_rate": 0, "rate_limit_rate": 0},
+      "stages": [{"seconds": 10, "rate_scale": 0.5}, {"seconds": 20, "rate_scale": 1}],
+      "endpoints": {
+        "search": {"rate": 5, "params": {"top_k": 20}, "slo": {"p95_ms": 250, "max_error_rate": 0.01}}
+      }
+    }
+
+Endpoints: dashboard, list_jobs, job_candidates, search, login, upload
+(params: files, format). SLO keys: p50_ms, p95_ms, p99_ms, max_error_rate.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks import harness  # first: selects the local vector store
+from benchmarks.documents import make_corpus
+from benchmarks.ingestion import QUERIES
+from benchmarks.stub_llm import LatencyModel, StubChatModel
+
+SCENARIO_DIR = os.path.join(os.path.dirname(__file__), "scenarios")
+# SLO key -> summary metric it bounds
+SLO_METRICS = {"p50_ms": "p50_ms", "p95_ms": "p95_ms", "p99_ms": "p99_ms", "max_error_rate": "error_rate"}
+# Histogram bucket upper bounds in ms
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float("inf"))
+PRELOAD_FILES_PER_REQUEST = 20
+
+
+@dataclass
+class Context:
+    bench: harness.Harness
+    rng: random.Random
+    # Seeds for fresh synthetic resumes (never duplicates of earlier uploads)
+    seeds: itertools.count
+    etags: Dict[int, str] = field(default_factory=dict)
+
+
+Operation = Callable[[Context, httpx.AsyncClient, dict], Awaitable[httpx.Response]]
+
+
+async def _dashboard(ctx: Context, client: httpx.AsyncClient, params: dict) -> httpx.Response:
+    return await client.get("/api/dashboard/stats", headers=ctx.bench.headers)
+
+
+async def _list_jobs(ctx: Context, client: httpx.AsyncClient, params: dict) -> httpx.Response:
+    # Revalidate like a browser: send back the ETag this client last saw
+    headers = dict(ctx.bench.headers)
+    etag = ctx.etags.get(id(client))
+    if etag:
+        headers["If-None-Match"] = etag
+    response = await client.get("/api/jobs", headers=headers)
+    if response.headers.get("etag"):
+        ctx.etags[id(client)] = response.headers["etag"]
+    return response
+
+
+async def _job_candidates(ctx: Context, client: httpx.AsyncClient, params: dict) -> httpx.Response:
+    return await client.get(f"/api/candidates/jobs/{ctx.bench.job_id}/candidates", headers=ctx.bench.headers)
+
+
+async def _search(ctx: Context, client: httpx.AsyncClient, params: dict) -> httpx.Response:
+    return await client.post(
+        "/api/talent-pool/search",
+        json={"query": ctx.rng.choice(QUERIES), "top_k": params.get("top_k", 20)},
+        headers=ctx.bench.headers
+    )
+
+
+async def _login(ctx: Context, client: httpx.AsyncClient, params: dict) -> httpx.Response:
+    return await client.post("/api/auth/login", json={"email": harness.EMAIL, "password": harness.PASSWORD})
+
+
+async def _upload(ctx: Context, client: httpx.AsyncClient, params: dict) -> httpx.Response:
+    files = make_corpus(params.get("files", 5), params.get("format", "pdf"), seed=next(ctx.seeds))
+    # make_corpus numbers files from `seed`, so skip the ones just used
+    for _ in range(len(files) - 1):
+        next(ctx.seeds)
+    return await client.post(
+        f"/api/candidates/jobs/{ctx.bench.job_id}/upload-resumes",
+        files=[("resumes", (name, data, "application/octet-stream")) for name, data in files],
+        headers=ctx.bench.headers
+    )
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "dashboard": _dashboard,
+    "list_jobs": _list_jobs,
+    "job_candidates": _job_candidates,
+    "search": _search,
+    "login": _login,
+    "upload": _upload,
+}
+
+
+def load_scenario(name: str) -> dict:
+    """
+    Read and validate a scenario file
+
+    Args:
+        name: Path to a JSON file, or the name of one in benchmarks/scenarios
+
+    Raises:
+        ValueError: unknown endpoint or SLO key, or no endpoints
+    """
+    path = name if os.path.exists(name) else os.path.join(SCENARIO_DIR, f"{name}.json")
+    with open(path) as file:
+        scenario = json.load(file)
+
+    if not scenario.get("endpoints"):
+        raise ValueError(f"{path}: no endpoints")
+    for endpoint, spec in scenario["endpoints"].items():
+        if endpoint not in OPERATIONS:
+            raise ValueError(f"{path}: unknown endpoint {endpoint!r} (known: {', '.join(OPERATIONS)})")
+        unknown = set(spec.get("slo", {})) - set(SLO_METRICS)
+        if unknown:
+            raise ValueError(f"{path}: unknown SLO keys for {endpoint}: {', '.join(sorted(unknown))}")
+
+    scenario.setdefault("description", os.path.basename(path))
+    scenario.setdefault("duration_seconds", 30)
+    scenario.setdefault("arrival", "poisson")
+    scenario.setdefault("clients", 64)
+    scenario.setdefault("preload_resumes", 0)
+    scenario.setdefault("db_latency_ms", 2)
+    scenario.setdefault("llm", {})
+    scenario.setdefault("stages", [{"seconds": scenario["duration_seconds"], "rate_scale": 1.0}])
+    return scenario
+
+
+def _rate_scale(stages: List[dict], elapsed: float) -> float | None:
+    """Rate multiplier at `elapsed` seconds, or None once all stages are over"""
+    for stage in stages:
+        if elapsed < stage["seconds"]:
+            return stage.get("rate_scale", 1.0)
+        elapsed -= stage["seconds"]
+    return None
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if status == "exception" or status >= 400)
+
+
+async def _send(ctx: Context, operation: Operation, client: httpx.AsyncClient, params: dict, scheduled: float, stats: EndpointStats) -> None:
+    try:
+        response = await operation(ctx, client, params)
+        status = response.status_code
+    except Exception:
+        status = "exception"
+    stats.latencies.append(time.perf_counter() - scheduled)
+    stats.statuses[status] += 1
+
+
+async def _arrivals(
+    ctx: Context,
+    name: str,
+    spec: dict,
+    scenario: dict,
+    clients: itertools.cycle,
+    started: float,
+    stats: EndpointStats,
+    in_flight: set
+) -> None:
+    operation, params = OPERATIONS[name], spec.get("params", {})
+    scheduled = started
+    while True:
+        scale = _rate_scale(scenario["stages"], scheduled - started)
+        if scale is None:
+            return
+        rate = spec["rate"] * scale
+        if rate <= 0:
+            # Idle stage: move to the next one
+            scheduled += 0.1
+            continue
+        scheduled += ctx.rng.expovariate(rate) if scenario["arrival"] == "poisson" else 1 / rate
+        if _rate_scale(scenario["stages"], scheduled - started) is None:
+            return
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(_send(ctx, operation, next(clients), params, scheduled, stats))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+
+async def _monitor_loop_lag(lags: List[float], interval: float = 0.01) -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def _preload(bench: harness.Harness, count: int) -> None:
+    corpus = make_corpus(count, "text", seed=0)
+    semaphore = asyncio.Semaphore(4)
+
+    async def upload(files):
+        async with semaphore:
+            response = await bench.http.post(
+                f"/api/candidates/jobs/{bench.job_id}/upload-resumes",
+                files=[("resumes", (name, data, "text/plain")) for name, data in files],
+                headers=bench.headers
+            )
+            response.raise_for_status()
+
+    await asyncio.gather(*(
+        upload(corpus[start:start + PRELOAD_FILES_PER_REQUEST])
+        for start in range(0, count, PRELOAD_FILES_PER_REQUEST)
+    ))
+
+
+async def run(scenario: dict, fake_embeddings: bool, seed: int) -> dict:
+    """Run a loaded scenario; returns per-endpoint stats and loop lag"""
+    llm_options = scenario["llm"]
+    llm = StubChatModel(
+        latency=LatencyModel(time_scale=llm_options.get("time_scale", 0.1)),
+        error_rate=llm_options.get("error_rate", 0.0),
+        rate_limit_rate=llm_options.get("rate_limit_rate", 0.0),
+        seed=seed
+    )
+    bench = await harness.start(llm, scenario["db_latency_ms"] / 1000, fake_embeddings)
+    await _preload(bench, scenario["preload_resumes"])
+
+    clients = [bench.client(f"10.0.{index // 250}.{index % 250 + 1}") for index in range(scenario["clients"])]
+    ctx = Context(bench, random.Random(seed), itertools.count(scenario["preload_resumes"]))
+    stats = {name: EndpointStats() for name in scenario["endpoints"]}
+    in_flight: set = set()
+    lags: List[float] = []
+    monitor = asyncio.create_task(_monitor_loop_lag(lags))
+
+    started = time.perf_counter()
+    try:
+        rotation = itertools.cycle(clients)
+        await asyncio.gather(*(
+            _arrivals(ctx, name, spec, scenario, rotation, started, stats[name], in_flight)
+            for name, spec in scenario["endpoints"].items()
+        ))
+        unfinished = len(in_flight)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        elapsed = time.perf_counter() - started
+    finally:
+        monitor.cancel()
+        await asyncio.gather(*(client.aclose() for client in clients))
+        await bench.close()
+
+    return {"stats": stats, "elapsed": elapsed, "unfinished": unfinished, "lags": lags, "llm": llm.stats}
+
+
+def _percentile_ms(values: List[float], percentile: float) -> float:
+    return float(np.percentile(np.array(values) * 1000, percentile)) if values else 0.0
+
+
+def _summary(stats: EndpointStats, duration: float) -> dict:
+    count = sum(stats.statuses.values())
+    return {
+        "requests": count,
+        "rate": count / duration if duration else 0.0,
+        "error_rate": stats.errors / count if count else 0.0,
+        "p50_ms": _percentile_ms(stats.latencies, 50),
+        "p95_ms": _percentile_ms(stats.latencies, 95),
+        "p99_ms": _percentile_ms(stats.latencies, 99),
+        "max_ms": max(stats.latencies, default=0.0) * 1000,
+        "statuses": {str(status): count for status, count in sorted(stats.statuses.items(), key=str)}
+    }
+
+
+def check_slo(summary: dict, slo: dict) -> List[str]:
+    """Violated SLOs as readable strings (empty if all met)"""
+    failures = []
+    for key, limit in slo.items():
+        value = summary[SLO_METRICS[key]]
+        if value > limit:
+            unit = "" if key == "max_error_rate" else "ms"
+            failures.append(f"{SLO_METRICS[key]} {value:.3g}{unit} > {limit}{unit}")
+    return failures
+
+
+def _histogram(latencies: List[float], width: int = 40) -> List[str]:
+    counts = Counter(
+        next(index for index, bound in enumerate(BUCKETS) if latency * 1000 <= bound)
+        for latency in latencies
+    )
+    if not counts:
+        return []
+    first, last = min(counts), max(counts)
+    peak = max(counts.values())
+    lines = []
+    for index in range(first, last + 1):
+        label = f"<= {BUCKETS[index]:g}" if BUCKETS[index] != float("inf") else f"> {BUCKETS[index - 1]:g}"
+        bar = "#" * round(counts[index] / peak * width)
+        lines.append(f"    {label:>9} ms | {bar:<{width}} {counts[index]}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", help="scenario name in benchmarks/scenarios or a path")
+    parser.add_argument("--duration", type=float, help="override duration_seconds (single stage)")
+    parser.add_argument("--rate-scale", type=float, default=1.0, help="multiply every endpoint's rate")
+    parser.add_argument("--time-scale", type=float, help="override the stub LLM latency multiplier")
+    parser.add_argument("--fake-embeddings", action="store_true", help="hashing encoder instead of the real model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", help="also write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    if args.duration is not None:
+        scenario["duration_seconds"] = args.duration
+        scenario["stages"] = [{"seconds": args.duration, "rate_scale": 1.0}]
+    if args.time_scale is not None:
+        scenario["llm"]["time_scale"] = args.time_scale
+    for spec in scenario["endpoints"].values():
+        spec["rate"] *= args.rate_scale
+
+    total_rate = sum(spec["rate"] for spec in scenario["endpoints"].values())
+    print(f"{scenario['description']}")
+    print(
+        f"{sum(stage['seconds'] for stage in scenario['stages']):g}s, {total_rate:g} req/s at full rate "
+        f"({scenario['arrival']}), {scenario['clients']} clients, {scenario['preload_resumes']} preloaded resumes"
+    )
+
+    result = asyncio.run(run(scenario, args.fake_embeddings, args.seed))
+    duration = sum(stage["seconds"] for stage in scenario["stages"])
+
+    print(f"\n{'endpoint':<16}{'reqs':>7}{'req/s':>8}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  SLO")
+    report, failed = {}, False
+    for name, stats in result["stats"].items():
+        summary = _summary(stats, duration)
+        failures = check_slo(summary, scenario["endpoints"][name].get("slo", {}))
+        failed = failed or bool(failures)
+        report[name] = {**summary, "slo_failures": failures}
+        print(
+            f"{name:<16}{summary['requests']:>7}{summary['rate']:>8.1f}{summary['error_rate'] * 100:>7.1f}"
+            f"{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}{summary['max_ms']:>9.1f}"
+            f"  {'FAIL: ' + '; '.join(failures) if failures else 'ok'}"
+        )
+    print(f"latencies in ms, from scheduled send time; {result['elapsed'] - duration:.1f}s to drain after the last arrival")
+
+    for name, stats in result["stats"].items():
+        print(f"\n{name}  statuses {report[name]['statuses']}")
+        for line in _histogram(stats.latencies):
+            print(line)
+
+    lags = result["lags"]
+    print(
+        f"\nevent loop lag: p50 {_percentile_ms(lags, 50):.1f}ms, p99 {_percentile_ms(lags, 99):.1f}ms, "
+        f"max {max(lags, default=0.0) * 1000:.1f}ms; {result['unfinished']} requests still in flight at the end; "
+        f"LLM calls {result['llm'].calls}, 429s {result['llm'].rate_limited}, 500s {result['llm'].errors}"
+    )
+
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump({
+                "scenario": scenario,
+                "elapsed": result["elapsed"],
+                "endpoints": report,
+                "loop_lag_p99_ms": _percentile_ms(lags, 99)
+            }, file, indent=2)
+
+    if failed:
+        print("\n❌ SLOs not met")
+        sys.exit(1)
+    print("\n✅ All SLOs met")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Single vs batched LLM scoring against a stub LLM
+
+    python -m benchmarks.scoring --candidates 200 --batch-sizes 1 5 10 --time-scale 0.01
+
+Scores synthetic candidates for one job through
+`scoring_service.score_candidates` with each SCORE_BATCH_SIZE (1 = one
+prompt per candidate, the previous behaviour). Reports prompts sent, input
+and output tokens per candidate and wall time. Wall time is measured with
+the stub's sleeps scaled by --time-scale and reported unscaled.
+--drop-rate leaves evaluations out of batched responses to exercise the
+per-candidate fallback.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import benchmarks  # noqa: F401  (placeholder credentials)
+from benchmarks.documents import make_resume_text
+from benchmarks.stub_llm import LatencyModel, StubChatModel
+from app.config.settings import settings
+from app.services.scoring_service import scoring_service
+
+JOB = {
+    "title": "Senior Backend Engineer",
+    "description": (
+        "We are hiring a senior backend engineer to design and operate the APIs behind our "
+        "recruitment platform. You will own services end to end, from data modelling in "
+        "PostgreSQL to deployment on AWS, and work closely with product and data teams.\n"
+        "Responsibilities include building FastAPI services, improving reliability and "
+        "latency, and mentoring engineers."
+    ),
+    "must_have_skills": ["Python", "FastAPI", "PostgreSQL", "AWS"],
+    "nice_to_have_skills": ["Docker", "Kubernetes", "Redis"],
+    "min_experience": 4
+}
+
+
+def _candidate(seed: int) -> tuple:
+    text = make_resume_text(seed)
+    lines = text.split("\n")
+    skills = lines[lines.index("SKILLS") + 1].split(", ")
+    return text, {
+        "name": lines[0],
+        "skills": skills,
+        "experience_years": random.Random(seed).randint(1, 15)
+    }
+
+
+async def _run(candidates: list, batch_size: int, latency: LatencyModel, drop_rate: float) -> dict:
+    settings.SCORE_BATCH_SIZE = batch_size
+    stub = StubChatModel(latency=latency, drop_rate=drop_rate)
+    scoring_service.llm = stub
+
+    started = time.perf_counter()
+    evaluations = await scoring_service.score_candidates(candidates, JOB)
+    wall = (time.perf_counter() - started) / latency.time_scale
+
+    failed = sum(isinstance(evaluation, Exception) for evaluation in evaluations)
+    return {"stats": stub.stats, "wall": wall, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--concurrency", type=int, default=settings.SCORE_BATCH_CONCURRENCY)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--time-scale", type=float, default=0.01)
+    args = parser.parse_args()
+
+    settings.SCORE_BATCH_CONCURRENCY = args.concurrency
+    latency = LatencyModel(time_scale=args.time_scale)
+    candidates = [_candidate(seed) for seed in range(args.candidates)]
+
+    print(f"{args.candidates} candidates, concurrency={args.concurrency}, drop rate={args.drop_rate}")
+    print(f"{'batch':>5}{'prompts':>9}{'in tok/cand':>13}{'out tok/cand':>14}{'wall s':>9}{'model s':>9}{'failed':>8}")
+    baseline = None
+    for batch_size in args.batch_sizes:
+        result = asyncio.run(_run(candidates, batch_size, latency, args.drop_rate))
+        stats = result["stats"]
+        line = (
+            f"{batch_size:>5}{stats.calls:>9}"
+            f"{stats.input_tokens / args.candidates:>13.0f}{stats.output_tokens / args.candidates:>14.0f}"
+            f"{result['wall']:>9.1f}{stats.model_seconds:>9.1f}{result['failed']:>8}"
+        )
+        if baseline is None:
+            baseline = stats.input_tokens
+        else:
+            line += f"   input tokens -{1 - stats.input_tokens / baseline:.0%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Stub chat model standing in for ChatGroq in offline benchmarks
+
+Answers the app's prompts with deterministic JSON: resume parsing (fields
+read back out of the resume text), requirement extraction, and scoring (a
+single candidate or a labelled batch). Each call sleeps for a latency
+modelled on a hosted LLM: a fixed per-request overhead plus prefill and
+decode time per token. Token counts use the app's LLM tokenizer; totals are
+kept in `stats`.
+
+`error_rate` and `rate_limit_rate` make calls fail with the Groq SDK's own
+500 and 429 errors. Like ChatGroq, the stub retries them `max_retries` times
+with exponential backoff before raising, so callers see only the failures
+that outlast the retries.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+from dataclasses import dataclass, field
+
+import groq
+import httpx
+from langchain.schema import AIMessage
+
+from app.services.text_preparation import count_llm_tokens
+
+_BATCH_LABEL = re.compile(r"^\[(C\d+)\]", re.MULTILINE)
+_RESUME_TEXT = re.compile(r"RESUME TEXT:\s*(.*?)\s*Return a JSON object", re.DOTALL)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE = re.compile(r"\+?\d[\d ()-]{8,}\d")
+_YEARS = re.compile(r"(\d+)\+? years")
+_ENDPOINT = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+@dataclass
+class LatencyModel:
+    request_overhead: float = 0.3
+    prefill_tokens_per_second: float = 5000.0
+    decode_tokens_per_second: float = 400.0
+    # Multiply every sleep, so a run can be shortened without changing ratios
+    time_scale: float = 1.0
+
+    def seconds(self, input_tokens: int, output_tokens: int) -> float:
+        return (
+            self.request_overhead
+            + input_tokens / self.prefill_tokens_per_second
+            + output_tokens / self.decode_tokens_per_second
+        )
+
+
+@dataclass
+class LLMStats:
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    # Unscaled model latency summed over calls
+    model_seconds: float = 0.0
+    # Failed attempts (each retried or raised)
+    errors: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+
+
+def _evaluation(key: str) -> dict:
+    rng = random.Random(hashlib.sha256(key.encode()).digest())
+    score = rng.randint(20, 95)
+    return {
+        "overall_score": score,
+        "skills_matched": ["Python", "AWS"][:rng.randint(0, 2)],
+        "skills_missing": ["Kubernetes"] if score < 70 else [],
+        "experience_match": score >= 50,
+        "strengths": ["Relevant backend experience", "Solid delivery record"],
+        "concerns": ["Limited leadership exposure"],
+        "recommendation": "hire" if score >= 75 else "maybe" if score >= 50 else "reject",
+        "detailed_explanation": "Good overlap with the required stack; some gaps in the nice-to-haves.",
+        "score_breakdown": {
+            "skills": round(score * 0.4),
+            "experience": round(score * 0.3),
+            "relevance": round(score * 0.2),
+            "growth": round(score * 0.1)
+        }
+    }
+
+
+def _parsed_resume(text: str) -> dict:
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    skills = []
+    if "SKILLS" in lines and lines.index("SKILLS") + 1 < len(lines):
+        skills = [skill.strip() for skill in lines[lines.index("SKILLS") + 1].split(",")]
+    email, phone, years = _EMAIL.search(text), _PHONE.search(text), _YEARS.search(text)
+    return {
+        "name": lines[0] if lines else None,
+        "email": email.group(0) if email else None,
+        "phone": phone.group(0) if phone else None,
+        "location": None,
+        "summary": next((line for line in lines if "years of experience" in line), None),
+        "skills": skills,
+        "experience_years": int(years.group(1)) if years else 0,
+        "education": [],
+        "work_experience": [],
+        "certifications": []
+    }
+
+
+_REQUIREMENTS = {
+    "must_have_skills": ["Python", "FastAPI", "PostgreSQL", "AWS"],
+    "nice_to_have_skills": ["Docker", "Kubernetes", "Redis"],
+    "min_experience": 4,
+    "summary": "Senior backend engineer building the platform's APIs."
+}
+
+
+def _api_error(status_code: int) -> groq.APIStatusError:
+    response = httpx.Response(status_code, request=_ENDPOINT)
+    if status_code == 429:
+        return groq.RateLimitError("Rate limit reached (stub)", response=response, body=None)
+    return groq.InternalServerError("Internal server error (stub)", response=response, body=None)
+
+
+@dataclass
+class StubChatModel:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    # Probability that an evaluation is left out of a batched response
+    drop_rate: float = 0.0
+    # Probability that an attempt fails with a 500 / a 429
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # ChatGroq's defaults: 2 retries, backoff from 0.5s
+    max_retries: int = 2
+    retry_backoff: float = 0.5
+    seed: int = 0
+    stats: LLMStats = field(default_factory=LLMStats)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    def _respond(self, prompt: str) -> str:
+        resume = _RESUME_TEXT.search(prompt)
+        if resume:
+            return json.dumps(_parsed_resume(resume.group(1)), indent=2)
+        if "Job Description:" in prompt:
+            return json.dumps(_REQUIREMENTS, indent=2)
+
+        labels = _BATCH_LABEL.findall(prompt)
+        if labels:
+            evaluations = [
+                {"candidate_id": label, **_evaluation(prompt + label)}
+                for label in labels if self._rng.random() >= self.drop_rate
+            ]
+            return json.dumps({"evaluations": evaluations}, indent=2)
+        return json.dumps(_evaluation(prompt), indent=2)
+
+    def _failure(self) -> groq.APIStatusError | None:
+        draw = self._rng.random()
+        if draw < self.rate_limit_rate:
+            self.stats.rate_limited += 1
+            return _api_error(429)
+        if draw < self.rate_limit_rate + self.error_rate:
+            self.stats.errors += 1
+            return _api_error(500)
+        return None
+
+    async def ainvoke(self, messages) -> AIMessage:
+        prompt = "\n".join(message.content for message in messages)
+        for attempt in range(self.max_retries + 1):
+            error = self._failure()
+            if error is None:
+                break
+            # A rejected request costs a round-trip but no model time
+            await asyncio.sleep(self.latency.request_overhead * self.latency.time_scale)
+            if attempt == self.max_retries:
+                raise error
+            self.stats.retries += 1
+            await asyncio.sleep(self.retry_backoff * 2 ** attempt * self.latency.time_scale)
+
+        content = self._respond(prompt)
+        input_tokens, output_tokens = count_llm_tokens(prompt), count_llm_tokens(content)
+
+        seconds = self.latency.seconds(input_tokens, output_tokens)
+        self.stats.calls += 1
+        self.stats.input_tokens += input_tokens
+        self.stats.output_tokens += output_tokens
+        self.stats.model_seconds += seconds
+        await asyncio.sleep(seconds * self.latency.time_scale)
+        return AIMessage(content=content)
+
+    def invoke(self, messages) -> AIMessage:
+        return asyncio.run(self.ainvoke(messages))
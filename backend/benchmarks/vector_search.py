@@ -0,0 +1,77 @@
+"""
+Recall@k, memory and query rate of the local vector store per precision
+
+    python -m benchmarks.vector_search --vectors 100000 --queries 200 --k 10
+
+Vectors are synthetic unit vectors drawn around shared topic centroids (so
+neighbours are close, like real resume chunks). Ground truth is exact
+float32 search; each precision is measured against it.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import benchmarks  # noqa: F401  (placeholder credentials)
+from app.services.vector_store import LocalVectorIndex
+from app.utils.quantization import bytes_per_vector
+
+
+def make_vectors(count: int, centroids: np.ndarray, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    dimension = centroids.shape[1]
+    assignments = rng.integers(0, len(centroids), size=count)
+    vectors = centroids[assignments] + 0.6 * rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _run(precision: str, vectors: np.ndarray, queries: np.ndarray, truth: list, k: int, rescore: int) -> dict:
+    store = LocalVectorIndex(dimension=vectors.shape[1], precision=precision, rescore_factor=rescore)
+    ids = [f"candidate_{i}#0" for i in range(len(vectors))]
+    store.upsert(ids, vectors, [{"tenant_id": 1}] * len(vectors))
+
+    hits = 0
+    started = time.perf_counter()
+    for query, expected in zip(queries, truth):
+        found = {match["id"] for match in store.search_resumes(query, top_k=k, filter_dict={"tenant_id": 1})}
+        hits += len(found & expected)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "precision": precision,
+        "rescore": rescore if precision == "int8" else "-",
+        "recall": hits / (k * len(queries)),
+        "bytes": bytes_per_vector(vectors.shape[1], precision),
+        "qps": len(queries) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    centroids = np.random.default_rng(args.seed).standard_normal((args.topics, args.dimension)).astype(np.float32)
+    vectors = make_vectors(args.vectors, centroids, args.seed + 1)
+    queries = make_vectors(args.queries, centroids, args.seed + 2)
+
+    exact = queries @ vectors.T
+    top = np.argsort(-exact, axis=1)[:, :args.k]
+    truth = [{f"candidate_{i}#0" for i in row} for row in top]
+
+    print(f"{'precision':<10}{'rescore':>8}{'recall@' + str(args.k):>11}{'bytes/vec':>11}{'queries/s':>11}")
+    for precision, rescore in (("float32", 1), ("float16", 1), ("int8", 1), ("int8", 4)):
+        row = _run(precision, vectors, queries, truth, args.k, rescore)
+        print(
+            f"{row['precision']:<10}{row['rescore']:>8}{row['recall']:>11.4f}"
+            f"{row['bytes']:>11}{row['qps']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
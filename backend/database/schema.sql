@@ -66,6 +66,8 @@ CREATE TABLE candidates (
     -- Resume Data (text only, no file storage)
     resume_text TEXT,
     parsed_data JSONB,
+    -- Canonical skill IDs (see app/services/skill_taxonomy.py)
+    skill_ids TEXT[],
     
     -- AI Scoring
     match_score FLOAT,
@@ -80,6 +82,16 @@ CREATE TABLE candidates (
     concerns TEXT[],
     recommendation VARCHAR(50),
     
+    -- Duplicate detection (see app/services/dedup_service.py)
+    -- canonical_candidate_id: earliest upload of the same person, NULL if
+    -- this row is canonical. No FK: deletes re-link duplicates themselves.
+    content_hash VARCHAR(64),
+    simhash BIGINT,
+    simhash_bands INTEGER[],
+    email_normalized VARCHAR(255),
+    phone_normalized VARCHAR(20),
+    canonical_candidate_id INTEGER,
+    
     -- Status
     status VARCHAR(50) DEFAULT 'pending',
     created_at TIMESTAMP DEFAULT NOW()
@@ -89,6 +101,12 @@ CREATE INDEX idx_candidates_tenant_job ON candidates(tenant_id, job_posting_id);
 CREATE INDEX idx_candidates_match_score ON candidates(match_score DESC);
 CREATE INDEX idx_candidates_status ON candidates(status);
 CREATE INDEX idx_candidates_recommendation ON candidates(recommendation);
+CREATE INDEX idx_candidates_content_hash ON candidates(tenant_id, content_hash);
+CREATE INDEX idx_candidates_email_normalized ON candidates(tenant_id, email_normalized);
+CREATE INDEX idx_candidates_phone_normalized ON candidates(tenant_id, phone_normalized);
+CREATE INDEX idx_candidates_simhash_bands ON candidates USING GIN (simhash_bands);
+CREATE INDEX idx_candidates_canonical ON candidates(canonical_candidate_id);
+CREATE INDEX idx_candidates_skill_ids ON candidates USING GIN (skill_ids);
 
 -- ============================================
 -- 5. INTERVIEW QUESTIONS TABLE
@@ -120,6 +138,128 @@ CREATE TABLE audit_logs (
 CREATE INDEX idx_audit_tenant ON audit_logs(tenant_id);
 CREATE INDEX idx_audit_created_at ON audit_logs(created_at DESC);
 
+-- ============================================
+-- 7. EMBEDDING MIGRATIONS TABLE
+-- ============================================
+-- One row per embedding model version built by app.tasks.reembed.
+-- status: running -> active (serving) -> retired; paused/failed on stop.
+CREATE TABLE embedding_migrations (
+    id SERIAL PRIMARY KEY,
+    model_version VARCHAR(100) UNIQUE NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'running',
+    last_candidate_id INTEGER NOT NULL DEFAULT 0,
+    embedded_count INTEGER NOT NULL DEFAULT 0,
+    failed_count INTEGER NOT NULL DEFAULT 0,
+    total_count INTEGER,
+    error TEXT,
+    started_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    completed_at TIMESTAMP
+);
+
+CREATE INDEX idx_embedding_migrations_status ON embedding_migrations(status);
+
+-- ============================================
+-- 8. VECTOR OUTBOX TABLE
+-- ============================================
+-- Vector store writes that failed inline, retried in the background.
+-- No FK to candidates: deletes must outlive the candidate row.
+CREATE TABLE vector_outbox (
+    id SERIAL PRIMARY KEY,
+    candidate_id INTEGER NOT NULL,
+    tenant_id INTEGER REFERENCES companies(id) ON DELETE CASCADE,
+    operation VARCHAR(10) NOT NULL,
+    model_version VARCHAR(100) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMPTZ DEFAULT NOW(),
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX idx_vector_outbox_due ON vector_outbox(next_attempt_at);
+
+-- ============================================
+-- 9. JOB RESCORES TABLE
+-- ============================================
+-- One row per re-scoring run after a job's requirements change.
+-- status: running -> completed; superseded by a newer update,
+-- interrupted on shutdown.
+CREATE TABLE job_rescores (
+    id SERIAL PRIMARY KEY,
+    tenant_id INTEGER REFERENCES companies(id) ON DELETE CASCADE,
+    job_posting_id INTEGER REFERENCES job_postings(id) ON DELETE CASCADE,
+    status VARCHAR(20) NOT NULL DEFAULT 'running',
+    total_count INTEGER NOT NULL DEFAULT 0,
+    local_count INTEGER NOT NULL DEFAULT 0,
+    llm_queued INTEGER NOT NULL DEFAULT 0,
+    llm_done INTEGER NOT NULL DEFAULT 0,
+    llm_failed INTEGER NOT NULL DEFAULT 0,
+    started_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    completed_at TIMESTAMP
+);
+
+CREATE INDEX idx_job_rescores_job ON job_rescores(job_posting_id, started_at DESC);
+
+-- ============================================
+-- FUNCTIONS (called through PostgREST RPC)
+-- ============================================
+-- Update a job posting and return it as it was before and after, in one
+-- round-trip (PUT /api/jobs/{id} re-scores against the difference).
+-- No row when the job doesn't exist for the tenant.
+CREATE OR REPLACE FUNCTION update_job_posting(p_job_id INTEGER, p_tenant_id INTEGER, p_changes JSONB)
+RETURNS TABLE (old_job JSONB, new_job JSONB) AS $$
+    WITH old AS (
+        SELECT * FROM job_postings
+        WHERE id = p_job_id AND tenant_id = p_tenant_id
+        FOR UPDATE
+    ), updated AS (
+        UPDATE job_postings AS job SET
+            title = p_changes->>'title',
+            description = p_changes->>'description',
+            requirements = p_changes->'requirements',
+            must_have_skills = p_changes->'must_have_skills',
+            nice_to_have_skills = p_changes->'nice_to_have_skills',
+            min_experience = (p_changes->>'min_experience')::INTEGER
+        FROM old
+        WHERE job.id = old.id
+        RETURNING job.*
+    )
+    SELECT to_jsonb(old), to_jsonb(updated) FROM old JOIN updated ON updated.id = old.id;
+$$ LANGUAGE sql;
+
+-- Write local re-scores of a tenant's candidates in bulk. Only updates:
+-- candidates deleted in the meantime stay deleted. Returns the updated IDs.
+CREATE OR REPLACE FUNCTION rescore_candidates(p_tenant_id INTEGER, p_updates JSONB)
+RETURNS SETOF INTEGER AS $$
+    UPDATE candidates AS candidate SET
+        match_score = rescore.match_score,
+        skills_matched = rescore.skills_matched,
+        skills_missing = rescore.skills_missing,
+        ai_evaluation = rescore.ai_evaluation
+    FROM jsonb_to_recordset(p_updates) AS rescore(
+        id INTEGER, match_score FLOAT, skills_matched TEXT[], skills_missing TEXT[], ai_evaluation JSONB
+    )
+    WHERE candidate.id = rescore.id AND candidate.tenant_id = p_tenant_id
+    RETURNING candidate.id;
+$$ LANGUAGE sql;
+
+-- Write computed skill IDs (app/tasks/skills.py) in bulk. Only updates, like
+-- rescore_candidates; skill lists and evaluation are kept where not given.
+CREATE OR REPLACE FUNCTION backfill_skill_ids(p_updates JSONB)
+RETURNS SETOF INTEGER AS $$
+    UPDATE candidates AS candidate SET
+        skill_ids = backfill.skill_ids,
+        skills_matched = COALESCE(backfill.skills_matched, candidate.skills_matched),
+        skills_missing = COALESCE(backfill.skills_missing, candidate.skills_missing),
+        ai_evaluation = COALESCE(backfill.ai_evaluation, candidate.ai_evaluation)
+    FROM jsonb_to_recordset(p_updates) AS backfill(
+        id INTEGER, skill_ids TEXT[], skills_matched TEXT[], skills_missing TEXT[], ai_evaluation JSONB
+    )
+    WHERE candidate.id = backfill.id
+    RETURNING candidate.id;
+$$ LANGUAGE sql;
+
 -- ============================================
 -- ROW-LEVEL SECURITY (RLS)
 -- ============================================
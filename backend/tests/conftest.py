@@ -0,0 +1,34 @@
+"""
+Shared fixtures: the app wired to in-process stand-ins (benchmarks.harness)
+
+benchmarks.harness must be imported before any app module, since it selects
+the in-process vector store.
+"""
+import asyncio
+
+import pytest
+
+from benchmarks import harness
+from benchmarks.stub_llm import StubChatModel
+
+
+@pytest.fixture(scope="session")
+def loop():
+    # One loop for the session: app singletons keep loop-bound locks
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    """Run a coroutine to completion on the session loop"""
+    return loop.run_until_complete
+
+
+@pytest.fixture
+def app_harness(run):
+    """Fresh fake database seeded with one tenant, user and job"""
+    bench = run(harness.start(StubChatModel(), fake_embeddings=True))
+    yield bench
+    run(bench.close())
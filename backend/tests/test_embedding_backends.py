@@ -0,0 +1,121 @@
+"""
+ONNX backend checks: int8 cache paths and the parity tolerance against torch
+"""
+import os
+import sys
+import types
+import numpy as np
+import pytest
+from app.config.settings import settings
+from app.services.embedding_backends import PARITY_PROBES, OnnxBackend, parity
+from app.services.embedding_models import default_model_spec
+from app.services.embedding_service import EmbeddingService
+
+DIMENSION = 384
+
+
+class FixedBackend:
+    """Backend returning precomputed unit vectors for the parity probes"""
+
+    def __init__(self, name: str, vectors: np.ndarray):
+        self.name = name
+        self.vectors = vectors
+
+    def encode(self, texts):
+        assert len(texts) == len(self.vectors)
+        return self.vectors
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _reference() -> np.ndarray:
+    return _unit(np.random.default_rng(0).standard_normal((len(PARITY_PROBES), DIMENSION)))
+
+
+def _int8_roundtrip(vectors: np.ndarray) -> np.ndarray:
+    """Per-vector symmetric int8 quantization, the error scale of int8 weights"""
+    scale = np.abs(vectors).max(axis=1, keepdims=True) / 127
+    return _unit(np.round(vectors / scale) * scale)
+
+
+def _drifted(vectors: np.ndarray, cosine: float) -> np.ndarray:
+    """Vectors at exactly `cosine` to the originals"""
+    noise = np.random.default_rng(1).standard_normal(vectors.shape)
+    noise -= np.sum(noise * vectors, axis=1, keepdims=True) * vectors
+    noise = _unit(noise)
+    return _unit(cosine * vectors + np.sqrt(1 - cosine ** 2) * noise)
+
+
+@pytest.fixture
+def verify_int8(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "onnx-int8")
+    monkeypatch.setattr(settings, "EMBEDDING_VERIFY_BACKEND", True)
+
+
+def _service(candidate: FixedBackend, reference: FixedBackend) -> EmbeddingService:
+    service = EmbeddingService()
+    service._create = lambda name, model: reference if name == "torch" else candidate
+    return service
+
+
+def test_parity_is_lowest_probe_cosine():
+    reference = _reference()
+    vectors = reference.copy()
+    vectors[2] = _drifted(reference[2:3], 0.9)[0]
+
+    assert parity(FixedBackend("onnx", reference), FixedBackend("torch", reference)) == pytest.approx(1.0)
+    assert parity(FixedBackend("onnx", vectors), FixedBackend("torch", reference)) == pytest.approx(0.9, abs=1e-4)
+
+
+def test_int8_error_is_within_tolerance(verify_int8):
+    reference = FixedBackend("torch", _reference())
+    candidate = FixedBackend("onnx-int8", _int8_roundtrip(reference.vectors))
+
+    assert parity(candidate, reference) >= settings.EMBEDDING_PARITY_MIN_COSINE
+    assert _service(candidate, reference)._load_backend(default_model_spec()) is candidate
+
+
+def test_drift_below_tolerance_falls_back_to_torch(verify_int8):
+    reference = FixedBackend("torch", _reference())
+    cosine = settings.EMBEDDING_PARITY_MIN_COSINE - 0.005
+    candidate = FixedBackend("onnx-int8", _drifted(reference.vectors, cosine))
+
+    assert parity(candidate, reference) < settings.EMBEDDING_PARITY_MIN_COSINE
+    assert _service(candidate, reference)._load_backend(default_model_spec()) is reference
+
+
+def test_quantized_models_do_not_share_a_file(tmp_path, monkeypatch):
+    exports = {}
+    for model_name in ("sentence-transformers/all-MiniLM-L6-v2", "BAAI/bge-small-en-v1.5"):
+        path = tmp_path / "hub" / model_name.replace("/", "--") / "model.onnx"
+        path.parent.mkdir(parents=True)
+        path.write_bytes(model_name.encode())
+        exports[model_name] = str(path)
+
+    calls = []
+
+    def quantize_dynamic(source, target, weight_type):
+        calls.append(source)
+        with open(target, "wb") as f:
+            f.write(b"int8:" + open(source, "rb").read())
+
+    quantization = types.ModuleType("onnxruntime.quantization")
+    quantization.QuantType = types.SimpleNamespace(QInt8="QInt8")
+    quantization.quantize_dynamic = quantize_dynamic
+    monkeypatch.setitem(sys.modules, "onnxruntime", types.ModuleType("onnxruntime"))
+    monkeypatch.setitem(sys.modules, "onnxruntime.quantization", quantization)
+
+    cache_dir = str(tmp_path / "cache")
+    targets = {name: OnnxBackend._quantized(name, path, cache_dir) for name, path in exports.items()}
+    # Cached: a second load doesn't quantize again
+    for name, path in exports.items():
+        assert OnnxBackend._quantized(name, path, cache_dir) == targets[name]
+
+    assert len(set(targets.values())) == 2
+    assert calls == list(exports.values())
+    for name, target in targets.items():
+        assert os.path.dirname(os.path.dirname(target)) == cache_dir
+        assert open(target, "rb").read() == b"int8:" + name.encode()
+    assert not [f for f in os.listdir(os.path.join(cache_dir, "int8")) if f.endswith(".partial")]
@@ -0,0 +1,31 @@
+"""
+Serving model version (app.services.embedding_models)
+"""
+from app.services.embedding_models import default_model_spec, serving_model
+
+
+def test_unknown_active_version_serves_the_default(run, app_harness):
+    app_harness.db.add("embedding_migrations", {
+        "model_version": "minilm-l12-v2",
+        "status": "running",
+        "completed_at": None
+    })
+    # Switched over by a newer deploy that knows a model this build doesn't
+    app_harness.db.add("embedding_migrations", {
+        "model_version": "future-model-v9",
+        "status": "active",
+        "completed_at": "2026-10-01T00:00:00+00:00"
+    })
+    serving_model.invalidate()
+
+    assert run(serving_model.get(app_harness.db)) == default_model_spec()
+    assert [spec.version for spec in run(serving_model.live(app_harness.db))] == [
+        default_model_spec().version, "minilm-l12-v2"
+    ]
+
+    response = run(app_harness.http.post(
+        "/api/talent-pool/search",
+        json={"query": "Python developer"},
+        headers=app_harness.headers
+    ))
+    assert response.status_code == 200
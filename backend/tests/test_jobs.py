@@ -0,0 +1,13 @@
+"""
+Job endpoints (app.routers.jobs)
+"""
+from app.schemas.jobs import JobSummaryResponse
+
+
+def test_job_list_returns_card_fields_only(run, app_harness):
+    response = run(app_harness.http.get("/api/jobs", headers=app_harness.headers))
+
+    assert response.status_code == 200
+    [job] = response.json()
+    assert set(job) == set(JobSummaryResponse.model_fields)
+    assert "nice_to_have_skills" not in job and "tenant_id" not in job
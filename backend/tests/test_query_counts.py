@@ -0,0 +1,55 @@
+"""
+Database round-trips per request, as reported by QueryCountMiddleware
+"""
+from benchmarks import harness
+
+
+def _query_count(response) -> int:
+    return int(response.headers["X-DB-Query-Count"])
+
+
+def test_login_is_one_query(run, app_harness):
+    response = run(app_harness.http.post(
+        "/api/auth/login", json={"email": harness.EMAIL, "password": harness.PASSWORD}
+    ))
+    assert response.status_code == 200
+    assert response.json()["user"]["company_name"] == "Benchmark Co"
+    assert _query_count(response) == 1
+
+
+def test_update_job_is_one_query(run, app_harness):
+    response = run(app_harness.http.put(
+        f"/api/jobs/{app_harness.job_id}", json=harness.JOB, headers=app_harness.headers
+    ))
+    assert response.status_code == 200
+    # Unchanged requirements: the update alone, no read of the job before it
+    assert _query_count(response) == 1
+
+
+def test_update_job_requirements_does_not_read_job(run, app_harness):
+    response = run(app_harness.http.put(
+        f"/api/jobs/{app_harness.job_id}",
+        json={**harness.JOB, "min_experience": 8},
+        headers=app_harness.headers
+    ))
+    assert response.status_code == 200
+    assert response.json()["min_experience"] == 8
+    # Update, supersede running re-scores, read candidates, record the run
+    assert _query_count(response) == 4
+
+
+def test_update_missing_job_is_404(run, app_harness):
+    response = run(app_harness.http.put("/api/jobs/999", json=harness.JOB, headers=app_harness.headers))
+    assert response.status_code == 404
+    assert _query_count(response) == 1
+
+
+def test_delete_job_is_one_query(run, app_harness):
+    response = run(app_harness.http.delete(f"/api/jobs/{app_harness.job_id}", headers=app_harness.headers))
+    assert response.status_code == 204
+    assert _query_count(response) == 1
+    assert app_harness.db.rows("job_postings") == []
+
+    response = run(app_harness.http.delete(f"/api/jobs/{app_harness.job_id}", headers=app_harness.headers))
+    assert response.status_code == 404
+    assert _query_count(response) == 1
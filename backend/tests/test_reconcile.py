@@ -0,0 +1,37 @@
+"""
+Vector store reconciliation (app.tasks.reconcile)
+"""
+import numpy as np
+
+from app.services.embedding_models import default_model_spec
+from app.services.vector_store import vector_store
+from app.tasks.reconcile import Reconciler
+from app.utils.vectors import chunk_vector_id, legacy_vector_id
+from benchmarks.documents import make_resume_text
+
+
+def test_legacy_single_vectors_are_replaced_with_chunks(run, app_harness):
+    model = default_model_spec()
+    job = app_harness.db.rows("job_postings")[0]
+    candidate = app_harness.db.add("candidates", {
+        "tenant_id": job["tenant_id"],
+        "job_posting_id": job["id"],
+        "name": "Legacy Candidate",
+        "resume_text": make_resume_text(1)
+    })
+    # The in-process store outlives each test's database, which reuses IDs
+    vector_store.delete_resumes([candidate["id"]], model)
+    # Written before chunking: no candidate_id metadata, so facet prefilters miss it
+    index = vector_store._index(model, create=True)
+    index.upsert(
+        [legacy_vector_id(candidate["id"])],
+        np.ones((1, model.dimension), dtype=np.float32),
+        [{"tenant_id": job["tenant_id"]}]
+    )
+
+    report = run(Reconciler(app_harness.db, model, page_size=10, dry_run=False).run(purge=False))
+
+    assert report["missing"] == 1 and report["backfilled"] == 1
+    assert index.contains(chunk_vector_id(candidate["id"], 0))
+    assert not index.contains(legacy_vector_id(candidate["id"]))
+    assert vector_store.existing_candidates([candidate["id"]], model) == {candidate["id"]}
@@ -0,0 +1,39 @@
+"""
+Skill ID backfill (app.tasks.skills)
+"""
+from app.tasks.skills import SkillBackfill
+
+
+def _candidate(app_harness, name: str, skills: list) -> dict:
+    job = app_harness.db.rows("job_postings")[0]
+    return app_harness.db.add("candidates", {
+        "tenant_id": job["tenant_id"],
+        "job_posting_id": job["id"],
+        "name": name,
+        "resume_text": f"{name}. Backend developer working with {', '.join(skills)}.",
+        "parsed_data": {"skills": skills},
+        "skill_ids": None,
+        "ai_evaluation": {"overall_score": 70}
+    })
+
+
+def test_backfill_updates_without_recreating_deleted_candidates(run, app_harness, monkeypatch):
+    kept = _candidate(app_harness, "Kept", ["Python", "Postgres"])
+    deleted = _candidate(app_harness, "Deleted", ["AWS"])
+    backfill = SkillBackfill(app_harness.db, page_size=10, dry_run=False, recompute=False)
+    jobs = backfill._jobs
+
+    async def jobs_after_delete(page):
+        # Deleted between reading the page and writing it back
+        app_harness.db.remove("candidates", [deleted])
+        return await jobs(page)
+
+    monkeypatch.setattr(backfill, "_jobs", jobs_after_delete)
+    report = run(backfill.run())
+
+    assert report == {"checked": 2, "changed": 2}
+    assert [row["id"] for row in app_harness.db.rows("candidates")] == [kept["id"]]
+    assert "python" in kept["skill_ids"]
+    assert kept["skills_matched"][:2] == ["Python", "PostgreSQL"]
+    assert kept["ai_evaluation"]["overall_score"] == 70
+    assert kept["ai_evaluation"]["skills_missing"] == kept["skills_missing"]
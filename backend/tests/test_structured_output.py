@@ -0,0 +1,33 @@
+"""
+Local JSON repair of LLM replies (app.services.structured_output)
+"""
+import json
+
+from app.services.structured_output import extract_json, repair_json
+
+
+def test_python_literals_are_rewritten_outside_strings_only():
+    reply = (
+        '{"summary": "Skills: None listed, True to form, False start", '
+        '"note": "a, ]", "email": None, "experience_match": True, "flags": [False, None,],}'
+    )
+
+    assert json.loads(repair_json(reply)) == {
+        "summary": "Skills: None listed, True to form, False start",
+        "note": "a, ]",
+        "email": None,
+        "experience_match": True,
+        "flags": [False, None]
+    }
+
+
+def test_escaped_quotes_keep_string_boundaries():
+    reply = '{"quote": "said \\"None, True\\" twice", "ok": True}'
+
+    assert extract_json(reply) == {"quote": 'said "None, True" twice', "ok": True}
+
+
+def test_truncated_string_is_closed_before_rewriting():
+    reply = '```json\n{"name": "Jane", "summary": "Answered: None'
+
+    assert extract_json(reply) == {"name": "Jane", "summary": "Answered: None"}
@@ -0,0 +1,68 @@
+"""
+Bounded candidate summary store (app.services.summary_store)
+"""
+import pytest
+
+from app.config.settings import settings
+from app.services.summary_store import SummaryStore
+
+
+@pytest.fixture
+def jobs(app_harness):
+    """Two jobs of the harness tenant with four candidates each"""
+    first = app_harness.db.rows("job_postings")[0]
+    second = app_harness.db.add("job_postings", {**first, "id": None, "title": "Data Engineer"})
+    for job in (first, second):
+        for index in range(4):
+            app_harness.db.add("candidates", {
+                "tenant_id": job["tenant_id"],
+                "job_posting_id": job["id"],
+                "name": f"Candidate {job['id']}-{index}",
+                "match_score": index * 10
+            })
+    return first["tenant_id"], first["id"], second["id"]
+
+
+def _held(store: SummaryStore) -> int:
+    return sum(len(tenant.records) for tenant in store._tenants.values())
+
+
+def test_single_tenant_is_trimmed_by_least_recently_used_job(run, app_harness, jobs, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_STORE_MAX_RECORDS", 6)
+    tenant_id, first, second = jobs
+    store = SummaryStore()
+
+    assert len(run(store.job_candidates(app_harness.db, tenant_id, first))) == 4
+    assert len(run(store.job_candidates(app_harness.db, tenant_id, second))) == 4
+
+    tenant = store._tenants[tenant_id]
+    assert list(tenant.jobs) == [second]
+    assert first not in tenant.job_loaded_at
+    assert store._size == _held(store) == 4
+
+
+def test_job_over_the_limit_is_served_but_not_kept(run, app_harness, jobs, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_STORE_MAX_RECORDS", 3)
+    tenant_id, first, _ = jobs
+    store = SummaryStore()
+
+    summaries = run(store.job_candidates(app_harness.db, tenant_id, first))
+
+    assert [summary["match_score"] for summary in summaries] == [30, 20, 10, 0]
+    assert store._size == _held(store) == 0
+
+
+def test_running_total_follows_writes(run, app_harness, jobs):
+    tenant_id, first, second = jobs
+    store = SummaryStore()
+    run(store.job_candidates(app_harness.db, tenant_id, first))
+    run(store.job_candidates(app_harness.db, tenant_id, second))
+    candidate = app_harness.db.rows("candidates")[0]
+
+    store.remove(tenant_id, candidate["id"])
+    store.add(tenant_id, [candidate])
+    store.add(tenant_id, [candidate])
+    assert store._size == _held(store) == 8
+
+    store.drop_job(tenant_id, first)
+    assert store._size == _held(store) == 4
@@ -0,0 +1,83 @@
+"""
+Talent pool ranking (app.routers.talent_pool_search, app.utils.vectors)
+"""
+from app.services.vector_store import vector_store
+from app.utils.vectors import VectorSearchError, chunk_vector_id, rank_candidates
+
+
+def _chunks(candidates: int, chunks_each: int):
+    """Chunk matches, best first, each candidate's chunks adjacent"""
+    matches = []
+    for candidate_id in range(1, candidates + 1):
+        for chunk in range(chunks_each):
+            score = 1 - candidate_id / 100 - chunk / 10000
+            matches.append({"id": chunk_vector_id(candidate_id, chunk), "score": score, "metadata": {}})
+    return matches
+
+
+def _search(matches, requests):
+    def search_chunks(chunk_top_k):
+        requests.append(chunk_top_k)
+        return matches[:chunk_top_k]
+    return search_chunks
+
+
+def test_many_chunks_per_candidate_widen_the_search_and_stay_incomplete():
+    # 30 candidates with 8 matching chunks each: 20 chunks hold only 3 of them
+    requests = []
+    ranked, complete = rank_candidates(_search(_chunks(30, 8), requests), 5, "max", 3, 4, 1000)
+
+    assert requests == [20, 40]
+    assert [entry["candidate_id"] for entry in ranked] == [1, 2, 3, 4, 5]
+    assert not complete
+
+
+def test_exhausted_chunk_search_is_complete():
+    requests = []
+    ranked, complete = rank_candidates(_search(_chunks(3, 4), requests), 5, "max", 3, 4, 1000)
+
+    assert requests == [20]
+    assert len(ranked) == 3
+    assert complete
+
+
+def test_chunk_limit_stops_widening():
+    requests = []
+    ranked, complete = rank_candidates(_search(_chunks(30, 8), requests), 5, "max", 3, 4, 24)
+
+    assert requests == [20, 24]
+    assert len(ranked) == 3
+    assert not complete
+
+
+def _search_pool(run, app_harness, body):
+    return run(app_harness.http.post("/api/talent-pool/search", json=body, headers=app_harness.headers))
+
+
+def test_failed_vector_search_is_not_cached(run, app_harness, monkeypatch):
+    calls = []
+    search_resumes = vector_store.search_resumes
+
+    def failing_search(*args, **kwargs):
+        calls.append(args)
+        raise VectorSearchError("index unavailable")
+
+    monkeypatch.setattr(vector_store, "search_resumes", failing_search)
+    response = _search_pool(run, app_harness, {"query": "Python developer"})
+    assert response.status_code == 503
+
+    def recording_search(*args, **kwargs):
+        calls.append(args)
+        return search_resumes(*args, **kwargs)
+
+    monkeypatch.setattr(vector_store, "search_resumes", recording_search)
+    response = _search_pool(run, app_harness, {"query": "Python developer"})
+    assert response.status_code == 200
+    # Searched again rather than served from a cached empty ranking
+    assert len(calls) == 2
+
+
+def test_invalid_page_is_rejected(run, app_harness):
+    for body in ({"top_k": "twenty"}, {"offset": "x"}, {"top_k": None}):
+        response = _search_pool(run, app_harness, {"query": "Python developer", **body})
+        assert response.status_code == 400
@@ -0,0 +1,49 @@
+"""
+Section packing for prompts and embeddings (app.services.text_preparation)
+"""
+from app.config.settings import settings
+from app.services.text_preparation import (
+    chunk_sections, count_llm_tokens, fit_sections,
+    prepare_for_parsing, prepare_for_scoring, split_sections, truncate_to_tokens
+)
+
+SENTENCE = "Built and operated payment services on AWS with Python, PostgreSQL and Kafka for a fintech team."
+# One 9k+ character paragraph, no headings and no line breaks
+PARAGRAPH = " ".join([SENTENCE] * 100)
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def test_single_paragraph_resume_is_packed_not_dropped():
+    parsed = prepare_for_parsing(PARAGRAPH)
+    scored = prepare_for_scoring(PARAGRAPH)
+
+    assert parsed.startswith(SENTENCE)
+    assert scored.startswith(SENTENCE)
+    assert count_llm_tokens(parsed) <= settings.PARSE_PROMPT_TOKEN_BUDGET
+    assert count_llm_tokens(scored) <= settings.SCORE_PROMPT_TOKEN_BUDGET
+    # Cut at a sentence end
+    assert parsed.endswith(".") and scored.endswith(".")
+
+
+def test_long_experience_paragraph_is_cut_inside_the_line():
+    resume = f"Jane Doe\njane@example.com\n\nEXPERIENCE\n{PARAGRAPH}\n\nEDUCATION\nBSc Computer Science"
+    packed = fit_sections(split_sections(resume), "parse", 300, _words)
+
+    assert packed.startswith("Jane Doe\njane@example.com")
+    assert f"EXPERIENCE\n{SENTENCE}" in packed
+    assert _words(packed) <= 300
+
+
+def test_unsectioned_resume_embeds():
+    chunks = chunk_sections(PARAGRAPH, _words, 128, 12)
+    assert len(chunks) == 12
+    assert all(_words(chunk) <= 128 for chunk in chunks)
+
+
+def test_truncate_to_tokens_falls_back_to_words_and_characters():
+    assert truncate_to_tokens("alpha beta gamma delta", 2, _words) == "alpha beta"
+    assert truncate_to_tokens("x" * 50, 10, len) == "x" * 10
+    assert truncate_to_tokens("anything", 0, len) == ""
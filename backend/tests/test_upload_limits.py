@@ -0,0 +1,87 @@
+"""
+Upload size limits and spooling (app.middleware.upload_limits, app.utils.uploads)
+"""
+import pytest
+from starlette.formparsers import MultiPartParser
+
+from app.config.settings import settings
+from benchmarks.documents import make_corpus
+
+BOUNDARY = "test-boundary"
+
+
+def _multipart(filename: str, content: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="resumes"; filename="{filename}"\r\n'
+        "Content-Type: text/plain\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _upload(run, app_harness, body, headers=None):
+    return run(app_harness.http.post(
+        f"/api/candidates/jobs/{app_harness.job_id}/upload-resumes",
+        content=body,
+        headers={**app_harness.headers, "Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **(headers or {})}
+    ))
+
+
+@pytest.fixture
+def small_limit(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_REQUEST_BYTES", 4096)
+
+
+def test_declared_length_over_limit_is_rejected(run, app_harness, small_limit):
+    response = _upload(run, app_harness, _multipart("big.txt", b"x" * 8192))
+    assert response.status_code == 413
+    assert app_harness.db.rows("candidates") == []
+
+
+def test_chunked_body_over_limit_is_rejected_while_streaming(run, app_harness, small_limit):
+    sent = []
+
+    async def chunks():
+        body = _multipart("big.txt", b"x" * 65536)
+        for start in range(0, len(body), 1024):
+            sent.append(start)
+            yield body[start:start + 1024]
+
+    # A generator body goes out without Content-Length
+    response = _upload(run, app_harness, chunks())
+    assert response.status_code == 413
+    # Reading stopped soon after the limit, not at the end of the body
+    assert len(sent) < 16
+    assert app_harness.db.rows("candidates") == []
+
+
+def test_spool_size_is_set_per_request(run, app_harness, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_SPOOL_MAX_MEMORY_BYTES", 1024)
+    spool_sizes = []
+    parse = MultiPartParser.parse
+
+    async def recording_parse(self):
+        spool_sizes.append(self.max_file_size)
+        return await parse(self)
+
+    monkeypatch.setattr(MultiPartParser, "parse", recording_parse)
+    response = _upload(run, app_harness, _multipart("resume.txt", b"Jane Doe\nPython developer\n"))
+    assert response.status_code == 200
+    assert spool_sizes == [1024]
+    # Starlette's own default is left alone for everything else
+    assert MultiPartParser.max_file_size == 1024 * 1024
+
+
+def test_oversized_file_does_not_fail_the_rest_of_the_upload(run, app_harness, monkeypatch):
+    resumes = make_corpus(2, "text")
+    monkeypatch.setattr(settings, "UPLOAD_MAX_FILE_BYTES", max(len(data) for _, data in resumes))
+    monkeypatch.setattr(settings, "UPLOAD_MAX_REQUEST_BYTES", 1024 * 1024)
+    files = [("big.txt", b"x" * 4 * settings.UPLOAD_MAX_FILE_BYTES)] + resumes
+
+    response = run(app_harness.http.post(
+        f"/api/candidates/jobs/{app_harness.job_id}/upload-resumes",
+        files=[("resumes", (name, data, "text/plain")) for name, data in files],
+        headers=app_harness.headers
+    ))
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == ["error", "success", "success"]
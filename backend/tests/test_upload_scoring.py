@@ -0,0 +1,70 @@
+"""
+Scoring during uploads (app.routers.candidates, app.services.scoring_service)
+"""
+import asyncio
+
+from app.config.settings import settings
+from app.services.resume_parser import resume_parser
+from app.services.scoring_service import scoring_service
+from benchmarks.documents import make_corpus
+
+
+def test_upload_scores_groups_while_parsing(run, app_harness, monkeypatch):
+    monkeypatch.setattr(settings, "SCORE_BATCH_SIZE", 3)
+    events = []
+    parse_resume = resume_parser.parse_resume
+    score_candidates = scoring_service.score_candidates
+
+    async def recording_parse(resume_text):
+        events.append("parse")
+        return await parse_resume(resume_text)
+
+    async def recording_score(candidates, job_requirements, semaphore=None):
+        events.append(f"score {len(candidates)}")
+        return await score_candidates(candidates, job_requirements, semaphore)
+
+    monkeypatch.setattr(resume_parser, "parse_resume", recording_parse)
+    monkeypatch.setattr(scoring_service, "score_candidates", recording_score)
+
+    response = run(app_harness.http.post(
+        f"/api/candidates/jobs/{app_harness.job_id}/upload-resumes",
+        files=[("resumes", (name, data, "text/plain")) for name, data in make_corpus(7, "text")],
+        headers=app_harness.headers
+    ))
+
+    assert response.status_code == 200
+    assert response.json()["summary"]["success"] == 7
+    assert [event for event in events if event.startswith("score")] == ["score 3", "score 3", "score 1"]
+    # The first group was scored before the last files were parsed
+    assert events.index("score 3") < len(events) - 1 - events[::-1].index("parse")
+    assert len(app_harness.db.rows("candidates")) == 7
+
+
+def test_individual_fallback_runs_concurrently(run, monkeypatch):
+    monkeypatch.setattr(settings, "SCORE_BATCH_SIZE", 5)
+    monkeypatch.setattr(settings, "SCORE_BATCH_CONCURRENCY", 3)
+    in_flight, peak = 0, 0
+
+    async def no_batch(batch, job_requirements):
+        return [None] * len(batch)
+
+    async def score_candidate(resume_text, parsed_data, job_requirements):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if resume_text == "broken":
+            raise ValueError("no evaluation")
+        return {"overall_score": 50, "resume": resume_text}
+
+    monkeypatch.setattr(scoring_service, "_score_batch", no_batch)
+    monkeypatch.setattr(scoring_service, "score_candidate", score_candidate)
+
+    candidates = [(f"resume {i}", {}) for i in range(9)] + [("broken", {})]
+    evaluations = run(scoring_service.score_candidates(candidates, {}))
+
+    # Under the semaphore: concurrent, but never more than SCORE_BATCH_CONCURRENCY
+    assert peak == 3
+    assert [evaluation["resume"] for evaluation in evaluations[:9]] == [f"resume {i}" for i in range(9)]
+    assert isinstance(evaluations[9], ValueError)
@@ -65,6 +65,17 @@ const Candidates = () => {
         }
     }
 
+    const viewCandidate = async (candidateId) => {
+        try {
+            // List entries are summaries; the full record has the AI evaluation
+            const response = await api.get(`/candidates/${candidateId}`)
+            setSelectedCandidate(response.data)
+        } catch (error) {
+            console.error('Failed to fetch candidate', error)
+            alert('Failed to load candidate details')
+        }
+    }
+
     const getFilteredCandidates = () => {
         if (filter === 'all') return candidates
         return candidates.filter(c => c.status === filter)
@@ -238,7 +249,7 @@ const Candidates = () => {
                                         </div>
 
                                         {/* AI Evaluation Summary */}
-                                        {candidate.ai_evaluation && (
+                                        {(candidate.strengths?.length > 0 || candidate.concerns?.length > 0) && (
                                             <div className="bg-gray-50 p-4 rounded-lg mb-4">
                                                 <div className="grid grid-cols-2 gap-4">
                                                     {candidate.strengths && candidate.strengths.length > 0 && (
@@ -290,7 +301,7 @@ const Candidates = () => {
                                                 </button>
                                             )}
                                             <button
-                                                onClick={() => setSelectedCandidate(candidate)}
+                                                onClick={() => viewCandidate(candidate.id)}
                                                 className="bg-white border-2 border-primary-600 text-primary-600 px-4 py-2 rounded-lg font-semibold hover:bg-primary-50 transition"
                                             >
                                                 View Details
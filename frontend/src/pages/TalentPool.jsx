@@ -205,6 +205,11 @@ const TalentPool = () => {
                                                 {candidate.job_title && (
                                                     <div className="text-sm text-gray-600">
                                                         Applied for: <span className="font-semibold text-gray-900">{candidate.job_title}</span>
+                                                        {candidate.other_applications?.length > 0 && (
+                                                            <span className="ml-2 text-gray-500">
+                                                                (also: {candidate.other_applications.map(app => app.job_title || `Job ${app.job_posting_id}`).join(', ')})
+                                                            </span>
+                                                        )}
                                                     </div>
                                                 )}
                                             </div>
@@ -113,7 +113,7 @@ const UploadResumes = () => {
                             <input
                                 type="file"
                                 multiple
-                                accept=".pdf,.doc,.docx"
+                                accept=".pdf,.docx,.txt"
                                 onChange={handleFileChange}
                                 disabled={uploading}
                                 className="block w-full text-sm text-gray-500
@@ -126,7 +126,7 @@ const UploadResumes = () => {
                             />
                         </label>
                         <p className="mt-2 text-sm text-gray-500">
-                            PDF, DOC, or DOCX files only. You can select multiple files.
+                            PDF, DOCX, or plain text files only. You can select multiple files.
                         </p>
                     </div>
 
@@ -246,7 +246,9 @@ const UploadResumes = () => {
                                     key={idx}
                                     className={`p-3 rounded border ${result.status === 'success'
                                         ? 'bg-green-50 border-green-200'
-                                        : 'bg-red-50 border-red-200'
+                                        : result.status === 'duplicate'
+                                            ? 'bg-yellow-50 border-yellow-200'
+                                            : 'bg-red-50 border-red-200'
                                         }`}
                                 >
                                     <div className="flex justify-between items-center">
@@ -262,6 +264,10 @@ const UploadResumes = () => {
                                             <span className="text-green-600 font-bold">
                                                 Score: {result.score}/100
                                             </span>
+                                        ) : result.status === 'duplicate' ? (
+                                            <span className="text-yellow-700 text-sm">
+                                                Already uploaded for this job
+                                            </span>
                                         ) : (
                                             <span className="text-red-600 text-sm">
                                                 Error: {result.error}